@@ -1,7 +1,7 @@
 import numpy as np
 
 from alphazero.src.games.game import Game
-from alphazero.src.utils.hexboard import HexBoard
+from util.hexboard import HexBoard
 
 
 class Hex(Game):
@@ -12,6 +12,7 @@ class Hex(Game):
 		self.player = player
 		self.history = history or []
 		self.probs = probs or []
+		self.valids, self.valids_hash = None, None
 
 	def set_board(self, board):
 		self.board = board
@@ -36,13 +37,17 @@ class Hex(Game):
 		return 1
 
 	def get_possible_actions(self):
-		valids = np.zeros(self.get_action_size())
-		moves = self.board.get_possible_moves()
+		# The mask is cached per position (zobrist hash), so it is read-only
+		board_hash = self.board.hash_code()
+		if self.valids_hash != board_hash:
+			valids = np.zeros(self.get_action_size())
+			if self.board.get_winner() is None:
+				valids[[self.board_size[0] * x + y for x, y in self.board.get_empty_cells()]] = 1
 
-		for x, y in moves:
-			valids[self.board_size[0] * x + y] = 1
+			valids.flags.writeable = False
+			self.valids, self.valids_hash = valids, board_hash
 
-		return valids
+		return self.valids
 
 	def get_possible_actions_index(self):
 		return np.argwhere(self.get_possible_actions() != 0).flatten()
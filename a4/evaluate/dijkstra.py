@@ -32,4 +32,27 @@ class Dijkstra(HexEvalMethod):
                     dist[neighbor] = new_dist
                     heappush(q, (new_dist, neighbor))
 
-        return math.inf
\ No newline at end of file
+        return math.inf
+
+    def get_distances(self, board, source_coords, opposite_color):
+        """Runs Dijkstra's algorithm from all provided coords at once, returns the distance to every reachable hex including its own cost"""
+        q = []
+        dist = {}
+
+        for from_coord in source_coords:
+            from_dist = self.distance_to(board.get_color(from_coord), opposite_color)
+            if from_dist < dist.get(from_coord, math.inf):
+                dist[from_coord] = from_dist
+                heappush(q, (from_dist, from_coord))
+
+        while q:
+            node_dist, node = heappop(q)
+            if node_dist > dist[node]: continue
+
+            for neighbor in board.get_neighbors(node, board.size):
+                new_dist = node_dist + self.distance_to(board.get_color(neighbor), opposite_color)
+                if new_dist < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_dist
+                    heappush(q, (new_dist, neighbor))
+
+        return dist
@@ -4,7 +4,8 @@ import sys
 
 # from alphazero.play import play as play_alphazero
 from alphazero.train import train as train_alphazero
-from rating.benchmark import run_benchmark
+from rating import get_board_class
+from rating.benchmark import benchmarks, run_benchmark
 from rating.configs import configs
 from rating.trueskill import run_trueskill
 from tournament.configs import configs as tournament_configs
@@ -34,14 +35,33 @@ if __name__ == '__main__':
     minimax.add_argument('--depth', type=int, default=None, help='Set the search depth for Minimax')
     minimax.add_argument('--time-limit', type=float, default=None, help='Set the time limit for Minimax')
     minimax.add_argument('--eval', choices=['Dijkstra', 'random', 'AStar'], default='Dijkstra', help='Choose the evaluation method')
+    minimax.add_argument('--board', choices=['dict', 'bitboard'], default='dict', help='Choose the board engine')
+    minimax.add_argument('--mode', choices=['alphabeta', 'pvs'], default='alphabeta', help='Choose alpha-beta search or principal variation search with aspiration windows')
+    minimax.add_argument('--prune-dead', action='store_true', help='If added, never searches dead, captured or dominated hexes, which cannot improve the result')
+    minimax.add_argument('--workers', type=int, default=1, help='Set the number of worker processes for Lazy SMP minimax, which share one transposition table')
+    minimax.add_argument('--ordering', choices=['none', 'history', 'path'], default='history', help='Order the moves after the transposition table move by killer moves and history (history), and also shortest path hexes first (path)')
     
     mcts = search_sp.add_parser('mcts', help='Play against MCTS')
     mcts.add_argument('--num-iterations', type=int, default=None, help='Set the number of iterations for MCTS')
     mcts.add_argument('--cp', type=float, default=0.4, help='Set the exploration-exploitation tradeoff constant for MCTS')
     mcts.add_argument('--time-limit', type=float, default=None, help='Set the time limit for MCTS')
+    mcts.add_argument('--total-time', type=float, default=None, help='Set the time for all MCTS moves of a game, every move gets a share of what is left')
+    mcts.add_argument('--prune-dead', action='store_true', help='If added, never expands dead, captured or dominated hexes, which cannot improve the result')
+    mcts.add_argument('--early-stop', action='store_true', help='Stop a timed search once the best move is decided')
     mcts.add_argument('--size', type=int, default=4, help='Set the board size')
     mcts.add_argument('--eval', choices=['Dijkstra', 'random', 'AStar'], default='Dijkstra', help='Choose the evaluation method')
     mcts.add_argument('--rave-k', type=int, default=-1, help='Set the RAVE K value')
+    mcts.add_argument('--board', choices=['dict', 'bitboard'], default='dict', help='Choose the board engine')
+    mcts.add_argument('--playout', choices=['random', 'fill', 'bridge'], default='random', help='Choose the playout policy')
+    mcts.add_argument('--playouts-per-leaf', type=int, default=1, help='Set the number of batched playouts per leaf')
+    mcts.add_argument('--tree', choices=['objects', 'arrays', 'dag'], default='objects', help='Choose the MCTS tree storage')
+    mcts.add_argument('--solver', action='store_true', help='Propagate proven wins and losses in the object tree')
+    mcts.add_argument('--max-nodes', type=int, default=None, help='Set the node budget of the object tree or the dag')
+    mcts.add_argument('--prior', choices=['centre', 'dijkstra'], default=None, help='Set the order in which the untried moves of the object tree are expanded')
+    mcts.add_argument('--widening', type=float, default=None, help='Set the progressive widening exponent of the object tree, e.g. 0.5')
+    mcts.add_argument('--no-tree-reuse', dest='reuse_tree', action='store_false', help='Start every search from a fresh tree')
+    mcts.add_argument('--workers', type=int, default=1, help='Set the number of worker processes for parallel MCTS')
+    mcts.add_argument('--parallel', choices=['root', 'tree'], default='root', help='Choose between independent trees per worker or one shared tree')
 
     alphazero = search_sp.add_parser('alphazero', help='Play against AlphaZero')
 
@@ -70,6 +90,7 @@ if __name__ == '__main__':
     tune.add_argument('--plot-steps', type=int, default=10, help='Save plots every x%% of all configurations')
 
     benchmark = subparsers.add_parser('benchmark', help='Run a standardized benchmarking script')
+    benchmark.add_argument('--suite', choices=benchmarks.keys(), default='minimax', help='Choose the benchmark to run')
     plot = subparsers.add_parser('plot', help='Generate custom plots')
 
     args = parser.parse_args(sys.argv[1:])
@@ -88,17 +109,21 @@ if __name__ == '__main__':
                 logger.critical('--depth and --time-limit cannot both be set.')
                 exit()
         elif args.search == 'mcts':
-            if not (args.num_iterations or args.time_limit):
-                logger.critical('Either --num-iterations or --time-limit needs to be set when using MCTS search.')
+            if not (args.num_iterations or args.time_limit or args.total_time):
+                logger.critical('Either --num-iterations, --time-limit or --total-time needs to be set when using MCTS search.')
                 exit()
 
-            if args.num_iterations and args.time_limit:
-                logger.critical('--num-iterations and --time-limit cannot both be set.')
+            if args.num_iterations and (args.time_limit or args.total_time):
+                logger.critical('--num-iterations cannot be combined with --time-limit or --total-time.')
+                exit()
+
+            if args.tree == 'dag' and args.rave_k > 0:
+                logger.critical('--rave-k cannot be combined with --tree dag, the dag does not keep AMAF statistics.')
                 exit()
 
         logger.info('Booting gameplay script...')
         game = HexGame(args)
-        board = HexBoard(args.size)
+        board = get_board_class(args.board)(args.size)
         game.run_interactively(board)
 
     elif args.command == 'train' and args.train_model == 'alphazero':
@@ -131,4 +156,4 @@ if __name__ == '__main__':
     # Benchmark command
     elif args.command == 'benchmark':
         logger.info('Booting benchmark script...')
-        run_benchmark()
+        run_benchmark(args)
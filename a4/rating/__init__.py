@@ -4,13 +4,15 @@ from evaluate.random import RandomEval
 from search.alphazero import AlphaZero
 from search.mcts import MCTS
 from search.minimax import Minimax
+from util.bitboard import BitBoard
+from util.hexboard import HexBoard
 
 
 def get_search_class(player, disable_tt=False, board_size=5):
     if player['search'] == 'minimax':
-        return Minimax(player['depth'], player['time_limit'], get_eval_class(player['eval']), False, disable_tt)
+        return Minimax(player['depth'], player['time_limit'], get_eval_class(player['eval']), False, disable_tt, mode=player.get('mode', 'alphabeta'), ordering=player.get('ordering', 'history'), workers=player.get('workers', 1), prune_dead=player.get('prune_dead', False))
     elif player['search'] == 'mcts':
-        return MCTS(player['depth'], player['time_limit'], 0.4, False, player['rave_k'])
+        return MCTS(player['depth'], player['time_limit'], 0.4, False, player['rave_k'], playout=player.get('playout', 'random'), playouts_per_leaf=player.get('playouts_per_leaf', 1), tree=player.get('tree', 'objects'), reuse_tree=player.get('reuse_tree', True), workers=player.get('workers', 1), parallel=player.get('parallel', 'root'), max_nodes=player.get('max_nodes', None), solver=player.get('solver', False), prior=player.get('prior', None), widening=player.get('widening', None), total_time=player.get('total_time', None), early_stop=player.get('early_stop', False), prune_dead=player.get('prune_dead', False))
     elif player['search'] == 'alphazero':
         return AlphaZero(player['model_path'], player['id'], board_size, player['time_limit'])
 
@@ -21,3 +23,9 @@ def get_eval_class(eval_method):
         return AStar()
     elif eval_method == 'random':
         return RandomEval()
+
+def get_board_class(board_engine):
+    if board_engine == 'dict':
+        return HexBoard
+    elif board_engine == 'bitboard':
+        return BitBoard
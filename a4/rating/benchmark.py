@@ -1,36 +1,530 @@
 import unittest
 import time
+import timeit
+import random
 import statistics
 import logging
+import tracemalloc
+import multiprocessing
+
+import numpy as np
 
 from util import progressbar
 from util.hexboard import HexBoard
+from util.bitboard import BitBoard
 from search.minimax import Minimax
+from search.move_ordering import STAGES
+from search.inferior_cells import get_dead_cells, get_live_moves
+from search.mcts import MCTS
+from search.playouts import batch_fill_playout, playouts
+from search import selection_rules
+from search.debug import log_tree
 from evaluate.dijkstra import Dijkstra
+from rating import get_search_class
+from rating.configs import configs
 
 logger = logging.getLogger(__name__)
 
-def run_benchmark():
-    """Runs a certain amount of games to test performance. Afterwards the results will be printed"""
+def run_benchmark(args):
+    """Runs the benchmark suite selected in the provided args"""
+    benchmarks[args.suite]()
+
+def run_minimax_benchmark():
+    """Runs a certain amount of games to test performance for both minimax modes. Afterwards the results will be printed"""
     game_count = 1000
-    game_times = []
 
-    for i in progressbar(range(game_count), desc='Running benchmark'):
-        start_time = time.time()
+    for mode in ('alphabeta', 'pvs'):
+        game_times = []
+        stats = { 'nodes_searched': 0, 'cutoffs': 0, 'researches': 0 }
 
-        board_size = 3
-        board = HexBoard(board_size)
+        for i in progressbar(range(game_count), desc='Running benchmark'):
+            start_time = time.time()
 
-        evaluate = Dijkstra()
-        minimax = Minimax(3, None, evaluate, False)
+            board_size = 3
+            board = HexBoard(board_size)
 
-        next_color = HexBoard.RED
-        winner = board.get_winner()
-        while winner is None:
-            board.place(minimax.get_next_move(board, next_color), next_color)
-            next_color = HexBoard.BLUE if next_color == HexBoard.RED else HexBoard.RED
+            evaluate = Dijkstra()
+            minimax = Minimax(3, None, evaluate, False, mode=mode)
+
+            next_color = HexBoard.RED
             winner = board.get_winner()
-        
-        game_times.append(time.time() - start_time)
-    
-    logger.info('Benchmark %d games, mean=%.3fs, std-dev=%.5fs' % (game_count, statistics.mean(game_times), statistics.stdev(game_times)))
+            while winner is None:
+                board.place(minimax.get_next_move(board, next_color), next_color)
+                for name in stats: stats[name] += minimax.stats[name]
+                next_color = HexBoard.BLUE if next_color == HexBoard.RED else HexBoard.RED
+                winner = board.get_winner()
+
+            game_times.append(time.time() - start_time)
+
+        logger.info('Benchmark %s %d games, mean=%.3fs, std-dev=%.5fs, %s' % (mode, game_count, statistics.mean(game_times), statistics.stdev(game_times),
+            ', '.join('%d %s' % (stats[name] / game_count, name.replace('_', ' ')) for name in stats) + ' per game'))
+
+    # Iterative deepening with aspiration windows, on positions a few random moves into the game
+    time_limit = 0.5
+    for board_size in (5, 7):
+        random.seed(board_size)
+        positions = []
+        for _ in range(5):
+            board = HexBoard(board_size)
+            for color in (HexBoard.RED, HexBoard.BLUE) * 2: board.place(board.get_random_empty_cell(), color)
+            positions.append(board)
+
+        for mode in ('alphabeta', 'pvs'):
+            minimax = Minimax(None, time_limit, Dijkstra(), False, mode=mode)
+            depths, nodes = [], []
+            for board in positions:
+                minimax.get_next_move(board, HexBoard.RED)
+                depths.append(minimax.stats['depth'])
+                nodes.append(minimax.stats['nodes_searched'])
+            logger.info('Size %d, %-9s with %.1fs per move: depth %.1f on average, %.0f nodes searched' % (
+                board_size, mode, time_limit, statistics.mean(depths), statistics.mean(nodes)))
+
+def run_board_benchmark():
+    """Compares the copy and place throughput of the dict based HexBoard and the BitBoard for several board sizes"""
+    repeats = 10000
+
+    for board_size in range(3, 12):
+        results = {}
+        for board_class in (HexBoard, BitBoard):
+            board = board_class(board_size)
+            moves = board.get_possible_moves()
+            random.shuffle(moves)
+            for i, move in enumerate(moves[:board_size ** 2 // 2]):
+                board.place(move, HexBoard.RED if i % 2 == 0 else HexBoard.BLUE)
+
+            move = board.get_possible_moves()[0]
+            copy_rate = repeats / timeit.timeit(board.copy, number=repeats)
+            place_rate = repeats / timeit.timeit(lambda: board.make_move(move, HexBoard.RED).get_winner(), number=repeats)
+            results[board_class.__name__] = (copy_rate, place_rate)
+
+        logger.info('Size %2d: copy %9.0f/s (dict) vs %9.0f/s (bitboard), place+winner %9.0f/s (dict) vs %9.0f/s (bitboard)' % (
+            board_size, results['HexBoard'][0], results['BitBoard'][0], results['HexBoard'][1], results['BitBoard'][1]))
+
+def run_playout_benchmark():
+    """Compares the playouts per second of the playout policies, and the MCTS iterations they allow within the tournament time limit"""
+    playout_count = 2000
+
+    for board_size in (5, 7, 9, 11):
+        rates = {}
+        for name, playout in playouts.items():
+            board = HexBoard(board_size)
+            start_time = time.time()
+            for _ in range(playout_count):
+                playout(board, HexBoard.RED)
+            rates[name] = playout_count / (time.time() - start_time)
+
+        for batch_size in (16, 64):
+            start_time = time.time()
+            for _ in range(playout_count // batch_size):
+                batch_fill_playout(HexBoard(board_size), HexBoard.RED, HexBoard.RED, batch_size)
+            rates['batch x%d' % batch_size] = (playout_count // batch_size) * batch_size / (time.time() - start_time)
+
+        logger.info('Size %2d: %s' % (board_size, ', '.join('%s %.0f playouts/s' % (name, rate) for name, rate in rates.items())))
+
+    for name in playouts:
+        mcts = MCTS(None, 0.1, 0.4, False, playout=name)
+        mcts.get_next_move(HexBoard(7), HexBoard.RED)
+        logger.info('MCTS with %s playouts on 7x7 visited the root %d times in 0.1s' % (name, mcts.root.num_visits))
+
+def run_tree_benchmark():
+    """Compares the node throughput and the memory per node of the object based and the array based MCTS tree"""
+    num_iterations = 5000
+
+    for board_size in (7, 9):
+        for tree in ('objects', 'arrays'):
+            start_time = time.time()
+            MCTS(num_iterations, None, 0.4, False, playout='fill', tree=tree).get_next_move(HexBoard(board_size), HexBoard.RED)
+            elapsed_time = time.time() - start_time
+
+            # Measure the memory in a separate run, since tracing the allocations slows down the search
+            tracemalloc.start()
+            mcts = MCTS(num_iterations, None, 0.4, False, playout='fill', tree=tree)
+            mcts.get_next_move(HexBoard(board_size), HexBoard.RED)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            # Every iteration expands exactly one node, the array tree also allocates the not yet expanded siblings
+            logger.info('Size %2d, %-7s tree: %8.0f nodes/s, %6.0f bytes/node' % (board_size, tree, num_iterations / elapsed_time, memory / num_iterations))
+
+def run_selection_benchmark():
+    """Compares child selection with max() over per child score calls against one vectorized NumPy expression"""
+    repeats = 2000
+
+    class Child:
+        """Stand-in for an MCTSNode with random statistics"""
+        def __init__(self):
+            self.num_visits, self.num_amaf_visits = random.randint(1, 500), random.randint(1, 500)
+            self.reward, self.amaf_reward = random.uniform(-1, 1) * self.num_visits, random.uniform(-1, 1) * self.num_amaf_visits
+
+    for num_children in (25, 49, 121):
+        children = [Child() for _ in range(num_children)]
+        rewards, visits = np.array([c.reward for c in children]), np.array([c.num_visits for c in children], dtype=np.float64)
+        amaf_rewards, amaf_visits = np.array([c.amaf_reward for c in children]), np.array([c.num_amaf_visits for c in children], dtype=np.float64)
+        ln_N = selection_rules.log_n(int(visits.sum()))
+
+        timings = {
+            'uct max()': lambda: max(children, key=lambda c: selection_rules.uct_score(c.reward, c.num_visits, 0.4, ln_N)),
+            'uct numpy': lambda: np.argmax(selection_rules.uct_scores(rewards, visits, 0.4, ln_N)),
+            'rave max()': lambda: max(children, key=lambda c: selection_rules.rave_score(c, 1000, 0.4, ln_N)),
+            'rave numpy': lambda: np.argmax(selection_rules.rave_scores(rewards, visits, amaf_rewards, amaf_visits, 1000, 0.4, ln_N))
+        }
+        results = { name: timeit.timeit(select, number=repeats) / repeats * 1e6 for name, select in timings.items() }
+        logger.info('%3d children: %s' % (num_children, ', '.join('%s %.1fus' % (name, us) for name, us in results.items())))
+
+def run_rave_benchmark():
+    """Times a move of both players of the uct-vs-rave config, to show the overhead of the RAVE bookkeeping"""
+    config = configs['uct-vs-rave']
+    move_count = 10
+
+    for player in config['players']:
+        search = get_search_class(player, board_size=config['board_size'])
+        start_time = time.time()
+        for _ in range(move_count):
+            search.get_next_move(HexBoard(config['board_size']), HexBoard.RED)
+        logger.info('%s: %.3fs per move' % (search, (time.time() - start_time) / move_count))
+
+def run_reuse_benchmark():
+    """Plays time limited MCTS games with and without subtree reuse, and compares the visits at the root when a move is chosen"""
+    board_size = 7
+    game_count = 3
+
+    for reuse_tree in (False, True):
+        searches = { color: MCTS(None, 0.1, 0.4, False, playout='fill', reuse_tree=reuse_tree) for color in (HexBoard.RED, HexBoard.BLUE) }
+        root_visits = []
+
+        for _ in range(game_count):
+            board, color = HexBoard(board_size), HexBoard.RED
+            while board.get_winner() is None:
+                board.place(searches[color].get_next_move(board, color), color)
+                root_visits.append(searches[color].root.num_visits)
+                color = HexBoard.get_opposite_color(color)
+
+        stats = searches[HexBoard.RED].stats
+        logger.info('Reuse %-5s: %6.0f root visits per move, hit rate %3.0f%%, %6.0f reused visits per search' % (
+            reuse_tree, statistics.mean(root_visits), 100 * searches[HexBoard.RED].get_reuse_hit_rate(), stats['reused_visits'] / stats['searches']))
+
+def run_parallel_benchmark():
+    """Reports the MCTS iterations per second of root- and tree-parallel search with 1, 2, 4 and 8 workers"""
+    time_limit = 1.0
+    logger.info('Running on %d cores' % multiprocessing.cpu_count())
+
+    for board_size in (7, 9):
+        for parallel in ('root', 'tree'):
+            rates = []
+            for workers in (1, 2, 4, 8):
+                mcts = MCTS(None, time_limit, 0.4, False, playout='fill', tree='arrays', reuse_tree=False, workers=workers, parallel=parallel)
+                try:
+                    mcts.get_next_move(HexBoard(board_size), HexBoard.RED) # Spawns the workers
+
+                    start_time = time.time()
+                    mcts.get_next_move(HexBoard(board_size), HexBoard.RED)
+                    iterations = sum(visits for visits, _ in mcts.get_root_statistics().values())
+                    rates.append(iterations / (time.time() - start_time))
+                finally:
+                    mcts.close()
+
+            logger.info('Size %2d, %s-parallel: %s' % (board_size, parallel, ', '.join('%d workers %.0f it/s' % (workers, rate) for workers, rate in zip((1, 2, 4, 8), rates))))
+
+def run_dag_benchmark():
+    """Plays the transposition-aware dag MCTS against the regular tree with the same amount of iterations, and compares their sizes"""
+    board_size = 5
+    game_count = 20
+    num_iterations = 1000
+    dag_wins, dag_sizes = 0, []
+
+    for game in progressbar(range(game_count), desc='Running benchmark'):
+        dag_color = HexBoard.RED if game % 2 == 0 else HexBoard.BLUE
+        searches = {
+            dag_color: MCTS(num_iterations, None, 0.4, False, playout='fill', tree='dag', reuse_tree=False),
+            HexBoard.get_opposite_color(dag_color): MCTS(num_iterations, None, 0.4, False, playout='fill', reuse_tree=False)
+        }
+
+        board, color = HexBoard(board_size), HexBoard.RED
+        while board.get_winner() is None:
+            board.place(searches[color].get_next_move(board, color), color)
+            if color == dag_color: dag_sizes.append(len(searches[color].root.table))
+            color = HexBoard.get_opposite_color(color)
+
+        dag_wins += board.get_winner() == dag_color
+
+    # Every iteration of the regular tree adds exactly one node
+    logger.info('Dag won %d of %d games with %d iterations per move, %.0f positions per search vs %d tree nodes' % (
+        dag_wins, game_count, num_iterations, statistics.mean(dag_sizes), num_iterations))
+
+def run_node_budget_benchmark():
+    """Compares the peak memory and the time of a long MCTS search on 6x6 with and without a node budget"""
+    num_iterations = 5000
+
+    for max_nodes in (None, 2000, 500):
+        mcts = MCTS(num_iterations, None, 0.4, False, playout='fill', max_nodes=max_nodes)
+        tracemalloc.start()
+        start_time = time.time()
+        move = mcts.get_next_move(HexBoard(6), HexBoard.RED)
+        elapsed_time = time.time() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        logger.info('Node budget %5s: %5.1f MB peak, %.2fs, %d nodes left, %d pruned, move %s' % (
+            max_nodes, peak_memory / 2 ** 20, elapsed_time, len(mcts.root.get_subtree()), mcts.stats['pruned_nodes'], move))
+
+def run_solver_benchmark():
+    """Compares the time per move of MCTS with and without the solver in late game positions, where most lines are decided"""
+    time_limit = 1.0
+    position_count = 5
+
+    for board_size in (5, 6, 7):
+        positions = []
+        while len(positions) < position_count:
+            board, color = HexBoard(board_size), HexBoard.RED
+            while board.get_winner() is None and len(board.get_empty_cells()) > 2 * board_size:
+                board.place(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+            if board.get_winner() is None: positions.append((board, color))
+
+        times = {}
+        for solver in (False, True):
+            start_time = time.time()
+            for board, color in positions:
+                MCTS(None, time_limit, 0.4, False, playout='fill', solver=solver).get_next_move(board, color)
+            times[solver] = (time.time() - start_time) / position_count
+
+        logger.info('Size %d, %d empty hexes: %.2fs per move without solver, %.2fs with solver' % (board_size, 2 * board_size, times[False], times[True]))
+
+def run_depth_benchmark():
+    """Compares the depth MCTS reaches in the same wall time on larger boards with and without progressive widening and move priors"""
+    time_limit = 2.0
+    settings = (('no widening', None, None), ('widening + centre', 0.25, 'centre'), ('widening + dijkstra', 0.25, 'dijkstra'))
+
+    for board_size in (9, 11):
+        for name, widening, prior in settings:
+            mcts = MCTS(None, time_limit, 0.4, False, playout='fill', widening=widening, prior=prior)
+            move = mcts.get_next_move(HexBoard(board_size), HexBoard.RED)
+
+            # The principal variation follows the most visited child, the max depth is that of the deepest node
+            node, pv_depth = mcts.root, 0
+            while node.children:
+                node, pv_depth = max(node.children, key=lambda child: child.num_visits), pv_depth + 1
+
+            depths, max_depth = [(mcts.root, 0)], 0
+            while depths:
+                node, depth = depths.pop()
+                max_depth = max(max_depth, depth)
+                depths.extend((child, depth + 1) for child in node.children)
+
+            logger.info('Size %2d, %-19s: %5d iterations in %.1fs, principal variation depth %2d, max depth %2d, move %s' % (
+                board_size, name, mcts.root.num_visits, time_limit, pv_depth, max_depth, move))
+
+def run_clock_benchmark():
+    """
+    Plays MCTS with early stopping, and MCTS with a game clock, against MCTS that always uses its full time per move.
+    Compares the win rates and the thinking time per game, the game clock equals the average time per game of the full time player
+    """
+    board_size = 5
+    game_count = 12
+    time_limit = 0.5
+    settings = (('early stop', { 'time_limit': time_limit }), ('game clock', { 'total_time': 2.5 }))
+
+    for name, setting in settings:
+        wins, times, full_times, early_stops = 0, [], [], 0
+
+        for game in progressbar(range(game_count), desc='Running benchmark'):
+            managed_color = HexBoard.RED if game % 2 == 0 else HexBoard.BLUE
+            searches = {
+                managed_color: MCTS(None, setting.get('time_limit'), 0.4, False, playout='fill', total_time=setting.get('total_time'), early_stop=True),
+                HexBoard.get_opposite_color(managed_color): MCTS(None, time_limit, 0.4, False, playout='fill')
+            }
+            used_times = { HexBoard.RED: 0.0, HexBoard.BLUE: 0.0 }
+
+            board, color = HexBoard(board_size), HexBoard.RED
+            while board.get_winner() is None:
+                start_time = time.time()
+                board.place(searches[color].get_next_move(board, color), color)
+                used_times[color] += time.time() - start_time
+                color = HexBoard.get_opposite_color(color)
+
+            wins += board.get_winner() == managed_color
+            times.append(used_times[managed_color])
+            full_times.append(used_times[HexBoard.get_opposite_color(managed_color)])
+            early_stops += searches[managed_color].time_manager.stats['early_stops']
+
+        logger.info('%s won %d of %d games against %.1fs per move, %.2fs vs %.2fs thinking per game, %d early stops' % (
+            name.capitalize(), wins, game_count, time_limit, statistics.mean(times), statistics.mean(full_times), early_stops))
+
+def run_pattern_benchmark():
+    """Compares the playouts per second of the bridge pattern playouts and the plain fill playouts, and plays MCTS with both against each other"""
+    playout_count = 2000
+    game_count = 12
+    time_limit = 0.3
+
+    for board_size in (5, 7, 9):
+        rates = {}
+        for name in ('fill', 'bridge'):
+            board = HexBoard(board_size)
+            start_time = time.time()
+            for _ in range(playout_count):
+                playouts[name](board, HexBoard.RED)
+            rates[name] = playout_count / (time.time() - start_time)
+
+        bridge_wins = 0
+        for game in progressbar(range(game_count), desc='Running benchmark'):
+            bridge_color = HexBoard.RED if game % 2 == 0 else HexBoard.BLUE
+            searches = {
+                bridge_color: MCTS(None, time_limit, 0.4, False, playout='bridge'),
+                HexBoard.get_opposite_color(bridge_color): MCTS(None, time_limit, 0.4, False, playout='fill')
+            }
+
+            board, color = HexBoard(board_size), HexBoard.RED
+            while board.get_winner() is None:
+                board.place(searches[color].get_next_move(board, color), color)
+                color = HexBoard.get_opposite_color(color)
+            bridge_wins += board.get_winner() == bridge_color
+
+        logger.info('Size %d: bridge %.0f playouts/s vs fill %.0f playouts/s, bridge playouts won %d of %d games at %.1fs per move' % (
+            board_size, rates['bridge'], rates['fill'], bridge_wins, game_count, time_limit))
+
+def run_tree_dump_benchmark():
+    """Compares the time of dumping a 10k iteration tree on 7x7 in both formats and with filters to the time of the search itself"""
+    mcts = MCTS(10000, None, 0.4, False, playout='fill', rave_k=5000)
+    start_time = time.time()
+    mcts.get_next_move(HexBoard(7), HexBoard.RED)
+    logger.info('Search of %d nodes took %.2fs' % (len(mcts.root.get_subtree()), time.time() - start_time))
+
+    for output_format, max_depth, min_visits in (('text', None, 0), ('jsonl', None, 0), ('jsonl', 3, 0), ('jsonl', None, 10)):
+        start_time = time.time()
+        num_nodes = log_tree(mcts.root, 'output/mcts-debug.%s' % ('txt' if output_format == 'text' else output_format), max_depth, min_visits, output_format)
+        logger.info('Dump as %-5s (max depth %s, min visits %2d) wrote %5d nodes in %.2fs' % (
+            output_format, max_depth, min_visits, num_nodes, time.time() - start_time))
+
+def run_transposition_table_benchmark():
+    """Plays a series of time-limited minimax games with the same searches, and tracks the transposition table hit rate and the memory in use"""
+    board_size = 5
+    game_count = 10
+    time_limit = 0.1
+
+    tracemalloc.start()
+    searches = { color: Minimax(None, time_limit, Dijkstra(), False) for color in (HexBoard.RED, HexBoard.BLUE) }
+    for game in range(game_count):
+        hit_rates, cutoff_rates, nodes = [], [], []
+        board, color = HexBoard(board_size), HexBoard.RED
+        while board.get_winner() is None:
+            board.place(searches[color].get_next_move(board, color), color)
+            hit_rates.append(searches[color].get_tt_hit_rate())
+            cutoff_rates.append(searches[color].stats['tt_lookups'] / max(searches[color].stats['tt_probes'], 1))
+            nodes.append(searches[color].stats['nodes_searched'])
+            color = HexBoard.get_opposite_color(color)
+
+        logger.info('Game %2d: %.1f%% tt hit rate, %.1f%% tt cutoffs, %.0f nodes per move, %.1f MB in use, %d tt entries' % (
+            game + 1, 100 * statistics.mean(hit_rates), 100 * statistics.mean(cutoff_rates), statistics.mean(nodes), tracemalloc.get_traced_memory()[0] / 2 ** 20,
+            sum(len(search.tp_table) for search in searches.values())))
+    tracemalloc.stop()
+
+def run_move_ordering_benchmark():
+    """Searches the same positions with every move ordering of minimax, and compares the depth reached and the cutoff rate of every stage"""
+    for board_size in (5, 6, 7):
+        random.seed(board_size)
+        positions = []
+        for _ in range(5):
+            board = HexBoard(board_size)
+            for color in (HexBoard.RED, HexBoard.BLUE) * 2: board.place(board.get_random_empty_cell(), color)
+            positions.append(board)
+
+        for time_limit in (0.1, 0.5):
+            for ordering in ('none', 'history', 'path'):
+                minimax = Minimax(None, time_limit, Dijkstra(), False, ordering=ordering)
+                depths, nodes, cutoff_rates = [], [], { stage: [] for stage in STAGES }
+                for board in positions:
+                    minimax.get_next_move(board, HexBoard.RED)
+                    depths.append(minimax.stats['depth'])
+                    nodes.append(minimax.stats['nodes_searched'])
+                    for stage, rate in minimax.get_cutoff_rates().items(): cutoff_rates[stage].append(rate)
+
+                logger.info('Size %d, %-7s with %.1fs per move: depth %.1f on average, %.0f nodes searched, cutoff rate %s' % (
+                    board_size, ordering, time_limit, statistics.mean(depths), statistics.mean(nodes),
+                    ', '.join('%s %.0f%%' % (stage, 100 * statistics.mean(rates)) for stage, rates in cutoff_rates.items())))
+
+def run_lazy_smp_benchmark():
+    """Reports the depth and the nodes per second of time-limited Lazy SMP minimax with 1, 2, 4 and 8 workers"""
+    time_limit = 1.0
+    logger.info('Running on %d cores' % multiprocessing.cpu_count())
+
+    for board_size in (5, 7):
+        random.seed(board_size)
+        positions = []
+        for _ in range(3):
+            board = HexBoard(board_size)
+            for color in (HexBoard.RED, HexBoard.BLUE) * 2: board.place(board.get_random_empty_cell(), color)
+            positions.append(board)
+
+        results = []
+        for workers in (1, 2, 4, 8):
+            minimax = Minimax(None, time_limit, Dijkstra(), False, workers=workers)
+            try:
+                if workers > 1: minimax.get_next_move(positions[0], HexBoard.RED) # Spawns the workers
+
+                depths, rates = [], []
+                for board in positions:
+                    start_time = time.time()
+                    minimax.get_next_move(board, HexBoard.RED)
+                    depths.append(minimax.stats['depth'])
+                    rates.append(minimax.stats['nodes_searched'] / (time.time() - start_time))
+                results.append((workers, statistics.mean(depths), statistics.mean(rates)))
+            finally:
+                minimax.close()
+
+        logger.info('Size %d with %.1fs per move: %s' % (board_size, time_limit, ', '.join('%d workers depth %.1f %.0f nodes/s' % result for result in results)))
+
+def run_dead_cell_benchmark():
+    """
+    Compares the branching factor with and without inferior hex pruning halfway through random games, and the time minimax needs to reach a fixed depth.
+    The branching factor is reported without the dead hexes only, and without the dead, captured and dominated hexes
+    """
+    for board_size in (5, 7, 9):
+        random.seed(board_size)
+        positions = []
+        while len(positions) < 20:
+            board, color = HexBoard(board_size), HexBoard.RED
+            for _ in range(random.randrange(board_size ** 2 // 4, board_size ** 2 // 2)):
+                board.place(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+            if board.get_winner() is None: positions.append((board, color))
+
+        branching = statistics.mean(len(board.get_possible_moves()) for board, _ in positions)
+        dead_branching = statistics.mean(len(board.get_possible_moves()) - len(get_dead_cells(board)) for board, _ in positions)
+        pruned_branching = statistics.mean(len(get_live_moves(board, color)) for board, color in positions)
+        pruning_time = timeit.timeit(lambda: [get_live_moves(board, color) for board, color in positions], number=10) / (10 * len(positions))
+        logger.info('Size %d: branching factor %.1f, %.1f without dead hexes, %.1f without inferior hexes, %.2fms to find them' % (
+            board_size, branching, dead_branching, pruned_branching, 1000 * pruning_time))
+
+        depth = 3 if board_size < 9 else 2
+        for prune_dead in (False, True):
+            minimax = Minimax(depth, None, Dijkstra(), False, disable_tt=True, prune_dead=prune_dead)
+            times, nodes = [], []
+            for board, color in positions[:5]:
+                start_time = time.time()
+                minimax.get_next_move(board, color)
+                times.append(time.time() - start_time)
+                nodes.append(minimax.stats['nodes_searched'])
+            logger.info('Size %d, %-21s: %.2fs to depth %d, %.0f nodes searched' % (
+                board_size, 'inferior hexes pruned' if prune_dead else 'all moves', statistics.mean(times), depth, statistics.mean(nodes)))
+
+benchmarks = {
+    'minimax': run_minimax_benchmark,
+    'board': run_board_benchmark,
+    'playouts': run_playout_benchmark,
+    'tree': run_tree_benchmark,
+    'selection': run_selection_benchmark,
+    'rave': run_rave_benchmark,
+    'reuse': run_reuse_benchmark,
+    'parallel': run_parallel_benchmark,
+    'dag': run_dag_benchmark,
+    'budget': run_node_budget_benchmark,
+    'solver': run_solver_benchmark,
+    'depth': run_depth_benchmark,
+    'clock': run_clock_benchmark,
+    'patterns': run_pattern_benchmark,
+    'dump': run_tree_dump_benchmark,
+    'tt': run_transposition_table_benchmark,
+    'ordering': run_move_ordering_benchmark,
+    'smp': run_lazy_smp_benchmark,
+    'dead': run_dead_cell_benchmark
+}
@@ -37,4 +37,6 @@ def save_plots(args, player_permutations):
         
         fn = 'output/%s_%s.png' % (args.config, i+1)
         ax.get_figure().savefig(fn)
-        logger.info('Saved %s' % fn)
\ No newline at end of file
+        logger.info('Saved %s' % fn)
+        m1.close()
+        m2.close()
\ No newline at end of file
@@ -8,7 +8,7 @@ from util.hexboard import HexBoard
 from rating.configs import configs
 from rating.export import save_result, save_plots
 from rating.simulate import simulate_single_game_winner
-from . import get_search_class
+from . import get_board_class, get_search_class
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +29,7 @@ def run_trueskill(args):
     permutations = list(itertools.chain.from_iterable(itertools.repeat(x, config['game_count']) for x in unique_permutations))
 
     # Create inputs and default ratings
-    game_inputs = [(config['board_size'], config['game_count'], args.config, p1_id, p2_id, p1, p2, args.disable_tt) for (p1_id, p2_id, p1, p2) in permutations]
+    game_inputs = [(config['board_size'], config['game_count'], args.config, p1_id, p2_id, p1, p2, args.disable_tt, config.get('board', 'dict')) for (p1_id, p2_id, p1, p2) in permutations]
     ratings = { player_id: Rating() for player_id in range(len((config['players']))) }
 
     save_result(args.config, ('p1', 'p2', 'game_id', 'r1_mu', 'r1_sigma', 'r2_mu', 'r2_sigma'), clear=True)
@@ -63,6 +63,8 @@ def run_trueskill(args):
 
         m1, m2 = get_search_class(config['players'][player_id], args.disable_tt), get_search_class(config['players'][opponent_id], args.disable_tt)
         save_result(args.config, (str(m1), str(m2), completed_permutations, r1.mu, r1.sigma, r2.mu, r2.sigma))
+        m1.close()
+        m2.close()
 
     fn = 'output/%s.csv' % args.config
     logger.info('Saved %s' % fn)
@@ -72,13 +74,19 @@ def run_trueskill(args):
 
 def play_game(game_input):
     """Plays a series of games according to the provided game input object which packs all the settings into one object"""
-    board_size, game_cnt, config, p1_id, p2_id, p1, p2, disable_tt = game_input
+    board_size, game_cnt, config, p1_id, p2_id, p1, p2, disable_tt, board_engine = game_input
 
     m1, m2 = get_search_class(p1, disable_tt), get_search_class(p2, disable_tt)
     r1_color, r2_color = HexBoard.RED, HexBoard.BLUE
     r1_first = bool(random.getrandbits(1))
     
-    winner, r1_first = simulate_single_game_winner(board_size, m1, m2, r1_first, r1_color, r2_color)
+    # The games run in daemonic pool workers, where a parallel search falls back to one worker (see HexSearchMethod.use_workers), so there
+    # is no worker pool to keep alive between games. On Windows the games run on threads instead, and a parallel search starts its pool per game
+    try:
+        winner, r1_first = simulate_single_game_winner(board_size, m1, m2, r1_first, r1_color, r2_color, get_board_class(board_engine))
+    finally:
+        m1.close()
+        m2.close()
 
     if winner == HexBoard.EMPTY:
         return (-1, p1_id, p2_id)
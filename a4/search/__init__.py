@@ -1,5 +1,10 @@
+import logging
+import multiprocessing
+
 from util.hexboard import HexBoard
 
+logger = logging.getLogger(__name__)
+
 class HexSearchMethod:
     """TODO: This class is probably not used anymore. Should be removed?"""
 
@@ -8,6 +13,20 @@ class HexSearchMethod:
         """This should not be used and thus raises an error"""
         raise NotImplementedError
     
+    def use_workers(self):
+        """
+        Returns whether the search runs on its pool of worker processes. Daemonic processes, like the game workers of the rating and
+        tournament runners, cannot start processes, and threads would only take turns on the GIL. There the search warns and runs on one worker
+        """
+        if self.workers > 1 and multiprocessing.current_process().daemon:
+            logger.warning('%s runs in a daemonic process, which cannot start worker processes, so it searches on a single worker' % self)
+            self.workers = 1
+        return self.workers > 1
+
+    def close(self):
+        """Frees the resources of the search, like worker pools. Every caller that is done with a search should call this"""
+        pass
+
     def get_possible_moves(self, board):
         """Compiles a list of all empty hexes in the current hexboard"""
         raise DeprecationWarning
@@ -0,0 +1,235 @@
+import numpy as np
+
+from util.hexboard import HexBoard
+from util.bitboard import BitBoard
+from search import selection_rules
+from search.playouts import batch_fill_playout, playouts
+
+
+class ArrayTree:
+    """
+    Struct-of-arrays MCTS tree, every statistic of every node lives in a preallocated NumPy array indexed by node number.
+    Node 0 is the root. The children of a node are allocated as one contiguous block the first time it is expanded,
+    so a node only stores the index of its first child and the amount of children. Boards are not stored per node,
+    a single board is rebuilt along the selection path with push/pop instead.
+    """
+
+    # (name, dtype, initial value) of every per node array, ordered by item size so they can be packed into one aligned buffer
+    FIELDS = (
+        ('reward', np.float64, 0), ('amaf_visits', np.float64, 0), ('amaf_reward', np.float64, 0),
+        ('visits', np.int32, 0), ('parent', np.int32, -1), ('first_child', np.int32, -1),
+        ('move', np.int16, -1), ('child_count', np.int16, 0), ('num_expanded', np.int16, 0)
+    )
+
+    def __init__(self, board, player, Cp=0.4, rave_k=-1, playout='random', playouts_per_leaf=1, capacity=4096):
+        """Creates a tree with only a root node for the provided board, where the provided player is to move"""
+        self.board = board
+        self.player = player
+        self.Cp = Cp
+        self.rave_k = rave_k
+        self.playout = playout
+        self.playouts_per_leaf = playouts_per_leaf
+        self.coordinates = BitBoard.get_coordinates(board.size)
+        self.signs = np.resize(np.array([-1.0, 1.0]), board.size ** 2 + 1) # the root is 'moved into' by the opponent
+
+        self.min_capacity = capacity
+        self.create_arrays(capacity)
+        self.root = 0
+
+    def create_arrays(self, capacity):
+        """Allocates all per node arrays with the provided capacity, with only the root in use"""
+        for name, dtype, fill in ArrayTree.FIELDS:
+            setattr(self, name, np.full(capacity, fill, dtype=dtype))
+        self.num_nodes = 1
+
+    @property
+    def num_visits(self):
+        """Returns the amount of visits of the root, like MCTSNode.num_visits"""
+        return int(self.visits[self.root])
+
+    def get_arrays(self):
+        """Returns all per node arrays"""
+        return tuple(getattr(self, name) for name, _, _ in ArrayTree.FIELDS)
+
+    def get_bytes_per_node(self):
+        """Returns the amount of bytes every node takes up in the arrays"""
+        return sum(array.itemsize for array in self.get_arrays())
+
+    def get_memory_usage(self):
+        """Returns the amount of bytes allocated for all nodes, including the spare capacity"""
+        return sum(array.nbytes for array in self.get_arrays())
+
+    def grow(self, required):
+        """Doubles the capacity of all arrays until at least the required amount of nodes fits"""
+        capacity = len(self.visits)
+        while capacity < required: capacity *= 2
+        if capacity == len(self.visits): return
+
+        for name, dtype, fill in ArrayTree.FIELDS:
+            array = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def allocate_children(self, node, moves):
+        """Allocates one contiguous block of children for the provided node, one for every move"""
+        first, count = self.num_nodes, len(moves)
+        self.grow(first + count)
+        self.parent[first:first + count] = node
+        self.move[first:first + count] = [x * self.board.size + y for x, y in moves]
+        self.first_child[node] = first
+        self.child_count[node] = count
+        self.num_nodes += count
+
+    def best_child(self, node):
+        """Returns the index of the best child of the provided node using UCT, or the RAVE blend if rave_k > 0"""
+        first = self.first_child[node]
+        children = slice(first, first + self.child_count[node])
+        ln_N = selection_rules.log_n(int(self.visits[node]))
+
+        if self.rave_k > 0:
+            scores = selection_rules.rave_scores(self.reward[children], self.visits[children], self.amaf_reward[children], self.amaf_visits[children], self.rave_k, self.Cp, ln_N)
+        else:
+            scores = selection_rules.uct_scores(self.reward[children], self.visits[children], self.Cp, ln_N)
+
+        return first + int(np.argmax(scores))
+
+    def run_iteration(self):
+        """Runs a single select, expand, simulate and backpropagate iteration, leaving the board as it was"""
+        board, node, turn = self.board, self.root, self.player
+        path = [self.root]
+
+        winner = board.get_winner()
+        while winner is None:
+            if self.first_child[node] < 0:
+                self.allocate_children(node, board.get_possible_moves())
+
+            if self.num_expanded[node] < self.child_count[node]:
+                node = self.first_child[node] + self.num_expanded[node]
+                self.num_expanded[self.parent[node]] += 1
+                board.push(self.coordinates[self.move[node]], turn)
+                turn = HexBoard.get_opposite_color(turn)
+                path.append(node)
+                break
+
+            node = self.best_child(node)
+            board.push(self.coordinates[self.move[node]], turn)
+            turn = HexBoard.get_opposite_color(turn)
+            path.append(node)
+            winner = board.get_winner()
+
+        reward, amaf_stats = self.simulate(turn)
+        self.backpropagate(path, reward, amaf_stats)
+
+        for _ in range(len(path) - 1): board.pop()
+
+    def simulate(self, turn):
+        """Runs the configured playouts from the current board, returns the reward for the root player and the moves per color"""
+        if self.playouts_per_leaf > 1:
+            return batch_fill_playout(self.board, turn, self.player, self.playouts_per_leaf)
+
+        played_masks = { HexBoard.BLUE: 0, HexBoard.RED: 0 } if self.rave_k > 0 else None
+        winner = playouts[self.playout](self.board, turn, played_masks)
+        reward = HexBoard.get_reward(self.player, winner)
+        if played_masks is None: return reward, None
+
+        amaf_stats = {}
+        for color, mask in played_masks.items():
+            visits = BitBoard.unpack_mask(mask, self.board.size).astype(np.float64)
+            amaf_stats[color] = (visits, visits * reward)
+        return reward, amaf_stats
+
+    def backpropagate(self, path, reward, amaf_stats):
+        """
+        Adds the reward for the root player to all nodes on the path. Every node stores its reward from the view of the player
+        that made the move into it, which alternates along the path, so selection can always maximize.
+        """
+        signs = self.signs[:len(path)]
+        self.visits[path] += 1
+        self.reward[path] += signs * reward
+        if amaf_stats is not None: self.update_amaf(path, amaf_stats)
+
+    def update_amaf(self, path, amaf_stats):
+        """Adds the all-moves-as-first statistics of the playouts to the expanded children of every node on the path"""
+        signs = self.signs[:len(path)]
+        turn = self.player
+        for node, sign in zip(path, signs):
+            first = self.first_child[node]
+            if first >= 0:
+                children = slice(first, first + self.num_expanded[node])
+                visits, reward_sums = amaf_stats[turn]
+                moves = self.move[children]
+                self.amaf_visits[children] += visits[moves]
+                self.amaf_reward[children] -= sign * reward_sums[moves]
+            turn = HexBoard.get_opposite_color(turn)
+
+    def child_with_most_visits(self):
+        """Returns the move of the root child with the most visits"""
+        first = self.first_child[self.root]
+        child = first + int(np.argmax(self.visits[first:first + self.num_expanded[self.root]]))
+        return self.coordinates[self.move[child]]
+
+    def get_child_statistics(self):
+        """Returns the visits and the reward of every expanded root child, keyed by move"""
+        first = self.first_child[self.root]
+        children = range(first, first + self.num_expanded[self.root])
+        return { self.coordinates[self.move[child]]: (int(self.visits[child]), float(self.reward[child])) for child in children }
+
+    def find_node(self, board, color):
+        """
+        Returns the node at most two moves below the root that matches the provided board with color to move, or None.
+        The moves are found by comparing the stones on both boards, and verified by comparing the hash codes.
+        """
+        if board.size != self.board.size: return None
+
+        new_stones = [(coordinates, board.get_color(coordinates)) for coordinates in self.board.get_empty_cells() if not board.is_empty(coordinates)]
+        new_stones.sort(key=lambda stone: stone[1] != self.player) # the root player moved first
+        if len(new_stones) > 2 or (len(new_stones) % 2 == 0) != (color == self.player): return None
+
+        node, turn, expected_board = self.root, self.player, self.board.copy()
+        for coordinates, stone_color in new_stones:
+            first = self.first_child[node]
+            if stone_color != turn or first < 0: return None
+
+            moves = self.move[first:first + self.num_expanded[node]]
+            matches = np.flatnonzero(moves == coordinates[0] * self.board.size + coordinates[1])
+            if len(matches) == 0: return None
+
+            node, turn = first + int(matches[0]), HexBoard.get_opposite_color(turn)
+            expected_board.place(coordinates, stone_color)
+
+        if board.hash_code() != expected_board.hash_code(): return None
+        return node
+
+    def reroot(self, node, board, color):
+        """
+        Makes the provided node the root for the provided board and color to move. Its subtree is copied to the front of new arrays,
+        level by level so every block of children stays contiguous, and the rest of the tree is freed.
+        """
+        order = self.get_subtree(node)
+        new_index = np.full(self.num_nodes, -1, dtype=np.int32)
+        new_index[order] = np.arange(len(order), dtype=np.int32)
+
+        old_arrays = { name: getattr(self, name)[order] for name, _, _ in ArrayTree.FIELDS }
+        self.create_arrays(max(self.min_capacity, 2 * len(order)))
+        for name, array in old_arrays.items():
+            if name in ('parent', 'first_child'): array = np.where(array >= 0, new_index[array], -1)
+            getattr(self, name)[:len(order)] = array
+        self.parent[0] = -1
+        self.num_nodes = len(order)
+
+        self.root = 0
+        self.board = board.copy()
+        self.player = color
+
+    def get_subtree(self, node):
+        """Returns the indices of all nodes below and including the provided node, in breadth-first order"""
+        levels = [np.array([node], dtype=np.int64)]
+        while True:
+            parents = levels[-1][self.first_child[levels[-1]] >= 0]
+            if len(parents) == 0: break
+
+            counts = self.child_count[parents].astype(np.int64)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            levels.append(np.repeat(self.first_child[parents].astype(np.int64), counts) + offsets)
+        return np.concatenate(levels)
@@ -0,0 +1,152 @@
+import numpy as np
+
+from util.hexboard import HexBoard
+from search import selection_rules
+from search.playouts import batch_fill_playout, playouts
+
+
+class DAGNode:
+    """The statistics of a single position in the DAG, shared by every move order that leads to it"""
+
+    def __init__(self):
+        """Creates an unvisited node, its moves are generated on the first visit"""
+        self.num_visits = 0
+        self.reward = 0.0
+        self.moves = None
+        self.child_hashes = None
+
+
+class DAGTree:
+    """
+    Transposition-aware MCTS, every position is stored once in a table keyed by its zobrist hash (including the player to move),
+    so all move orders that lead to the same position share its statistics. Hex positions can never repeat within a game,
+    so the graph is acyclic. Backpropagation only updates the nodes on the path that was selected, and selection uses the
+    sum of the child visits instead of the visits of the node itself, since children can also be visited through other parents.
+    When the table holds more than max_nodes positions, the least visited half is evicted, evicted children simply count as unvisited.
+    The root, its children and the selected path are never evicted, so max_nodes is raised to at least twice the root and its children.
+    RAVE is not supported, since AMAF statistics belong to moves and not to positions.
+    """
+
+    def __init__(self, board, player, Cp=0.4, playout='random', playouts_per_leaf=1, max_nodes=1 << 18):
+        """Creates a table with only the root position of the provided board, where the provided player is to move"""
+        self.board = board
+        self.player = player
+        self.Cp = Cp
+        self.playout = playout
+        self.playouts_per_leaf = playouts_per_leaf
+        self.max_nodes = max(max_nodes, 2 * (len(board.get_possible_moves()) + 1))
+        self.signs = np.resize(np.array([-1.0, 1.0]), board.size ** 2 + 1) # the root is 'moved into' by the opponent
+
+        self.table = {}
+        self.root_hash = board.hash_code(player)
+        self.table[self.root_hash] = DAGNode()
+        self.stats = { 'evictions': 0 }
+
+    @property
+    def num_visits(self):
+        """Returns the amount of visits of the root, like MCTSNode.num_visits"""
+        return self.table[self.root_hash].num_visits
+
+    def generate_moves(self, node, board, turn):
+        """Stores the moves of the position in the node, and the hashes of the positions they lead to"""
+        piece_keys = HexBoard.get_zobrist_keys(board.size)[turn]
+        color_keys = HexBoard.get_zobrist_color_keys()
+        child_zobrist = board.zobrist ^ color_keys[HexBoard.get_opposite_color(turn)]
+
+        node.moves = board.get_possible_moves()
+        node.child_hashes = [child_zobrist ^ piece_keys[x * board.size + y] for x, y in node.moves]
+
+    def select_child(self, node):
+        """Returns the index of the move to play from the provided node, unvisited children are always tried first"""
+        children = [self.table.get(child_hash) for child_hash in node.child_hashes]
+        for i, child in enumerate(children):
+            if child is None or child.num_visits == 0: return i
+
+        rewards = np.array([child.reward for child in children])
+        visits = np.array([child.num_visits for child in children], dtype=np.float64)
+        ln_N = selection_rules.log_n(int(visits.sum()))
+        return int(np.argmax(selection_rules.uct_scores(rewards, visits, self.Cp, ln_N)))
+
+    def run_iteration(self):
+        """Runs a single select, expand, simulate and backpropagate iteration, leaving the board as it was"""
+        board, turn = self.board, self.player
+        node = self.table[self.root_hash]
+        path, path_hashes = [node], [self.root_hash]
+
+        winner = board.get_winner()
+        while winner is None:
+            if node.moves is None: self.generate_moves(node, board, turn)
+
+            i = self.select_child(node)
+            child_hash = node.child_hashes[i]
+            board.push(node.moves[i], turn)
+            turn = HexBoard.get_opposite_color(turn)
+
+            child = self.table.get(child_hash)
+            if child is None or child.num_visits == 0:
+                if child is None:
+                    child = self.table[child_hash] = DAGNode()
+                path.append(child)
+                path_hashes.append(child_hash)
+                break
+
+            node = child
+            path.append(node)
+            path_hashes.append(child_hash)
+            winner = board.get_winner()
+
+        reward = self.simulate(turn)
+        for node, sign in zip(path, self.signs[:len(path)]):
+            node.num_visits += 1
+            node.reward += sign * reward
+
+        for _ in range(len(path) - 1): board.pop()
+        if len(self.table) > self.max_nodes: self.evict(path_hashes)
+
+    def simulate(self, turn):
+        """Runs the configured playouts from the current board, returns the reward for the root player"""
+        if self.playouts_per_leaf > 1:
+            return batch_fill_playout(self.board, turn, self.player, self.playouts_per_leaf)[0]
+        return HexBoard.get_reward(self.player, playouts[self.playout](self.board, turn))
+
+    def evict(self, path_hashes=()):
+        """
+        Removes the least visited positions from the table until it is half full. The root and its children are always kept,
+        since the move is picked from their statistics, and so are the positions on the provided path
+        """
+        root = self.table[self.root_hash]
+        pinned = set(path_hashes) | set(root.child_hashes or []) | { self.root_hash }
+        kept = { position_hash: self.table[position_hash] for position_hash in pinned if position_hash in self.table }
+        ordered = sorted((item for item in self.table.items() if item[0] not in pinned), key=lambda item: item[1].num_visits, reverse=True)
+        kept.update(ordered[:max(0, self.max_nodes // 2 - len(kept))])
+
+        self.stats['evictions'] += len(self.table) - len(kept)
+        self.table = kept
+
+    def get_child_statistics(self):
+        """Returns the visits and the reward of every visited root child, keyed by move"""
+        root = self.table[self.root_hash]
+        statistics = {}
+        for move, child_hash in zip(root.moves or [], root.child_hashes or []):
+            child = self.table.get(child_hash)
+            if child is not None and child.num_visits > 0: statistics[move] = (child.num_visits, child.reward)
+        return statistics
+
+    def child_with_most_visits(self):
+        """Returns the move of the root child with the most visits, or the first possible move if no child was visited yet"""
+        statistics = self.get_child_statistics()
+        if not statistics: return self.board.get_possible_moves()[0]
+        return max(statistics, key=lambda move: statistics[move][0])
+
+    def find_node(self, board, color):
+        """Returns the hash of the provided position if it is still in the table, or None"""
+        if board.size != self.board.size: return None
+
+        position_hash = board.hash_code(color)
+        return position_hash if position_hash in self.table else None
+
+    def reroot(self, position_hash, board, color):
+        """Makes the provided position the root for the provided board and color to move. All other positions stay in the table"""
+        self.root_hash = position_hash
+        self.board = board.copy()
+        self.player = color
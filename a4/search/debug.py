@@ -1,29 +1,57 @@
+import json
 import logging
 
 from util.hexboard import HexBoard
 
 logger = logging.getLogger(__name__)
 
-player_names = ['']
-
-def log_tree(node, level=0):
-    """This function takes the root node and tries to log a debug output to a file. This is used to visualize the tree."""
-    output = []
-    output.append((level, str(node.reward) + '/' + str(node.num_visits) + ' | ' + str(node.amaf_reward) + '/' + str(node.num_amaf_visits) + ' ' + str(node.board) + ' turn=' + HexBoard.PLAYER_ID_TO_NAME[node.turn]))
-
-    for child in node.children:
-        output = output + log_tree(child, level + 1)
-
-    if level == 0:
-        fn = 'output/mcts-debug.txt'
-        with open(fn, 'w+', encoding='utf8') as output_file:
-            for log in output:
-                if log[0] is None:
-                    output_file.write('\n')
-                else:
-                    out = ('\t' * log[0]) + log[1] + '\n'
-                    output_file.write(out)
-        
-        logger.info('Saved %s' % fn)
-
-    return output
\ No newline at end of file
+def log_tree(node, fn='output/mcts-debug.txt', max_depth=None, min_visits=0, output_format='text'):
+    """
+    Streams the tree below the provided node to a file while walking it, this is used to visualize the tree.
+    Only nodes up to max_depth below the root with at least min_visits visits are written, the root is always written.
+    The 'text' format writes one tab indented line per node, only the root includes its board. The 'jsonl' format writes one
+    JSON object per line, with the id of the node and of its parent, so the tree can be loaded by other tools. Returns the amount of nodes written.
+    """
+    write_node = writers[output_format]
+    num_nodes = 0
+
+    with open(fn, 'w', encoding='utf8') as output_file:
+        for node_id, parent_id, depth, tree_node in walk_tree(node, max_depth, min_visits):
+            output_file.write(write_node(node_id, parent_id, depth, tree_node))
+            num_nodes += 1
+
+    logger.info('Saved %s' % fn)
+    return num_nodes
+
+def walk_tree(node, max_depth=None, min_visits=0):
+    """Yields the id, the parent id, the depth and the node of every node that passes the filters, depth-first with an explicit stack"""
+    stack = [(None, 0, node)]
+    node_id = 0
+
+    while stack:
+        parent_id, depth, node = stack.pop()
+        yield node_id, parent_id, depth, node
+
+        if max_depth is None or depth < max_depth:
+            # Reversed, so the children come off the stack in their original order
+            stack.extend((node_id, depth + 1, child) for child in reversed(node.children) if child.num_visits >= min_visits)
+        node_id += 1
+
+def format_text(node_id, parent_id, depth, node):
+    """Returns the tab indented text line of a node"""
+    position = str(node.board) if parent_id is None else 'move=%s' % (node.move,)
+    return '%s%s/%s | %s/%s %s turn=%s\n' % (
+        '\t' * depth, node.reward, node.num_visits, node.amaf_reward, node.num_amaf_visits, position, HexBoard.PLAYER_ID_TO_NAME[node.turn])
+
+def format_jsonl(node_id, parent_id, depth, node):
+    """Returns the JSON line of a node"""
+    return json.dumps({
+        'id': node_id, 'parent': parent_id, 'depth': depth, 'move': node.move, 'turn': node.turn,
+        'visits': int(node.num_visits), 'reward': float(node.reward), 'amaf_visits': float(node.num_amaf_visits), 'amaf_reward': float(node.amaf_reward),
+        'proven': node.proven
+    }) + '\n'
+
+writers = {
+    'text': format_text,
+    'jsonl': format_jsonl
+}
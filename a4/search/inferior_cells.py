@@ -0,0 +1,150 @@
+from functools import lru_cache
+
+from util.hexboard import HexBoard
+
+# The offsets of HexBoard.POSSIBLE_NEIGHBORS in ring order, every offset is adjacent to the one before and after it
+RING = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+# The state of a neighbor in a pattern code, EMPTY also stands for an off-board corner that belongs to neither edge
+STATES = { HexBoard.EMPTY: 0, HexBoard.BLUE: 1, HexBoard.RED: 2 }
+
+def get_dead_cells(board):
+    """
+    Returns the set of empty hexes that are dead: whichever color fills them, the winner of every continuation stays the same,
+    so playing one is never better than any other move. A hex is dead if its six neighbors match a dead pattern (see get_dead_patterns).
+    """
+    patterns = get_dead_patterns()
+    neighborhoods = get_neighborhoods(board.size)
+    colors = board.board
+
+    dead_cells = set()
+    for move in board.get_empty_cells():
+        if patterns[get_code(neighborhoods[move[0] * board.size + move[1]], colors)]: dead_cells.add(move)
+    return dead_cells
+
+def get_captured_cells(board):
+    """Returns the empty hexes that are captured after the fill-in of the provided board, with the color that captured them (see fill_in)"""
+    return fill_in(board)[1]
+
+def get_dominated_cells(board, color, colors=None):
+    """
+    Returns the empty hexes left after the fill-in of the provided board that are dominated for the provided color to move. A hex is dominated
+    by a neighbor if a stone of that color on the neighbor kills the hex. The hex can then be filled with the same color, so the neighbor is at
+    least as good a move, since an extra stone never hurts in Hex. When hexes dominate each other only the first one is dominated.
+    The colors after the fill-in are computed if they are not provided.
+    """
+    if colors is None: colors = fill_in(board)[0]
+    patterns = get_dead_patterns()
+    neighborhoods = get_neighborhoods(board.size)
+    state = STATES[color]
+
+    dominated_cells = set()
+    for move in [move for move, move_color in colors.items() if move_color == HexBoard.EMPTY]:
+        neighborhood = neighborhoods[move[0] * board.size + move[1]]
+        code = get_code(neighborhood, colors)
+        for weight, neighbor in neighborhood[1]:
+            if colors[neighbor] == HexBoard.EMPTY and neighbor not in dominated_cells and patterns[code + weight * state]:
+                dominated_cells.add(move)
+                break
+    return dominated_cells
+
+def get_live_moves(board, color=None):
+    """
+    Returns the possible moves without the hexes that fill_in fills, and without the dominated hexes if the color to move is provided.
+    If no move is left the game is decided anyway, so only one of the possible moves is returned.
+    """
+    moves = board.get_possible_moves()
+    if not moves: return moves
+
+    colors = fill_in(board)[0]
+    dominated_cells = get_dominated_cells(board, color, colors) if color is not None else set()
+    return [move for move in moves if colors[move] == HexBoard.EMPTY and move not in dominated_cells] or moves[:1]
+
+def fill_in(board):
+    """
+    Returns the colors of the provided board after the fill-in of its inferior hexes, and the captured hexes with the color that captured them.
+    Neither changes the winner under perfect play. Dead hexes are filled with blue, since either color will do. Two neighboring empty hexes
+    are captured by a color if a stone of that color on either one kills the other: the color answers a move on one with the other, after which
+    the stone of the opponent is dead. Captured hexes are filled with their color. Every fill-in can complete new patterns, so the fill-in repeats
+    until nothing changes.
+    """
+    patterns = get_dead_patterns()
+    neighborhoods = get_neighborhoods(board.size)
+    colors = dict(board.board)
+    empty_cells = [move for move, color in colors.items() if color == HexBoard.EMPTY]
+    captured_cells = {}
+
+    changed = True
+    while changed:
+        changed = False
+        for move in empty_cells:
+            if colors[move] != HexBoard.EMPTY: continue
+
+            neighborhood = neighborhoods[move[0] * board.size + move[1]]
+            code = get_code(neighborhood, colors)
+            if patterns[code]:
+                colors[move] = HexBoard.BLUE
+                changed = True
+                continue
+
+            for weight, neighbor in neighborhood[1]:
+                if colors[neighbor] != HexBoard.EMPTY: continue
+
+                neighbor_neighborhood = neighborhoods[neighbor[0] * board.size + neighbor[1]]
+                neighbor_weight = next(weight for weight, cell in neighbor_neighborhood[1] if cell == move)
+                for color in (HexBoard.BLUE, HexBoard.RED):
+                    if patterns[code + weight * STATES[color]] and patterns[get_code(neighbor_neighborhood, colors) + neighbor_weight * STATES[color]]:
+                        colors[move] = colors[neighbor] = captured_cells[move] = captured_cells[neighbor] = color
+                        changed = True
+                        break
+                if colors[move] != HexBoard.EMPTY: break
+    return colors, captured_cells
+
+def get_code(neighborhood, colors):
+    """Returns the pattern code of the provided neighborhood (see get_neighborhoods) with the provided colors"""
+    code, neighbors = neighborhood
+    for weight, neighbor in neighbors: code += weight * STATES[colors[neighbor]]
+    return code
+
+def is_useless(ring, color):
+    """
+    Returns whether a stone of the provided color on a hex with the provided neighbor states (in ring order) adds no connection.
+    That is the case if every two neighbors the color can still use are adjacent, or linked by a run of its own stones around the hex.
+    """
+    opposite_state = STATES[HexBoard.get_opposite_color(color)]
+    own_state = STATES[color]
+    usable = [i for i, state in enumerate(ring) if state != opposite_state]
+
+    for a, i in enumerate(usable):
+        for j in usable[a + 1:]:
+            clockwise = all(ring[k] == own_state for k in range(i + 1, j))
+            counter_clockwise = all(ring[k % 6] == own_state for k in range(j + 1, i + 6))
+            if not clockwise and not counter_clockwise: return False
+    return True
+
+@lru_cache(maxsize=1)
+def get_dead_patterns():
+    """Returns for every code of six neighbor states whether the hex is dead, which is the case if a stone of either color is useless there"""
+    patterns = []
+    for code in range(3 ** 6):
+        ring = [code // 3 ** i % 3 for i in range(6)]
+        patterns.append(is_useless(ring, HexBoard.BLUE) and is_useless(ring, HexBoard.RED))
+    return tuple(patterns)
+
+@lru_cache(maxsize=32)
+def get_neighborhoods(size):
+    """
+    Returns the precomputed neighborhood of every hex, indexed by x * size + y: the pattern code of its off-board neighbors, and the weight
+    and coordinates of every neighbor on the board (see HexBoard.get_neighbors). Off-board neighbors are stones of the color that owns that edge.
+    """
+    neighborhoods = []
+    for x in range(size):
+        for y in range(size):
+            neighbors = set(HexBoard.get_neighbors((x, y), size))
+            code, weights = 0, []
+            for i, (dx, dy) in enumerate(RING):
+                nx, ny = x + dx, y + dy
+                if (nx, ny) in neighbors: weights.append((3 ** i, (nx, ny)))
+                elif 0 <= ny < size: code += 3 ** i * STATES[HexBoard.BLUE] # past the left or right edge
+                elif 0 <= nx < size: code += 3 ** i * STATES[HexBoard.RED] # past the top or bottom edge
+            neighborhoods.append((code, tuple(weights)))
+    return tuple(neighborhoods)
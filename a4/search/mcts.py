@@ -2,162 +2,479 @@ import logging
 import random
 import math
 import time
+import multiprocessing
+from multiprocessing import Pool
 from collections import defaultdict
 from operator import attrgetter
 
+import numpy as np
+
 from util import cls
 from util.hexboard import HexBoard
 from search import HexSearchMethod
 from search.debug import log_tree
 from search import selection_rules
+from search.playouts import batch_fill_playout, playouts
+from search.priors import priors
+from search.inferior_cells import get_live_moves
+from search.time_manager import TimeManager
+from search.array_tree import ArrayTree
+from search.dag_tree import DAGTree
+from search.shared_tree import SharedArrayTree, NUM_STRIPES, init_worker, run_tree_search
 
 logger = logging.getLogger(__name__)
 
+WIDENING_BASE = 2
+
 class MCTS(HexSearchMethod):
     """This object houses all the code necessary for the MCTS implementation"""
 
-    def __init__(self, num_iterations, time_limit = None, Cp = 0.4, live_play=True, rave_k=-1, debug=False):
-        """Initializes MCTS search object with the provided settings"""
+    def __init__(self, num_iterations, time_limit = None, Cp = 0.4, live_play=True, rave_k=-1, debug=False, playout='random', playouts_per_leaf=1, tree='objects', reuse_tree=True, workers=1, parallel='root', max_nodes=None, solver=False, prior=None, widening=None, total_time=None, early_stop=False, prune_dead=False):
+        """
+        Initializes MCTS search object with the provided settings. The playout can be 'random' (check for a winner after every move) or 'fill'.
+        With playouts_per_leaf > 1 every leaf is evaluated by that many fill playouts at once, using the batched NumPy playout engine.
+        The tree is either stored as 'objects' (one MCTSNode per node), as 'arrays' (see search.array_tree.ArrayTree)
+        or as a 'dag' that shares the statistics of transpositions (see search.dag_tree.DAGTree). The dag does not support RAVE (rave_k > 0).
+        With max_nodes the object tree and the dag stay within that many nodes, the object tree by collapsing its least visited subtrees.
+        The object tree always keeps the root and its children, so its budget is raised to at least twice their number (see get_node_budget).
+        With reuse_tree the subtree of the previous search that matches the next board is kept as the new root.
+        With workers > 1 the search runs in a pool of worker processes. With parallel='root' every worker grows an independent tree
+        with the full budget, with parallel='tree' all workers grow one shared tree (see search.shared_tree.SharedArrayTree).
+        With solver the object tree propagates proven wins and losses, stops sampling solved subtrees and stops once the root is solved.
+        With a prior ('centre' or 'dijkstra', see search.priors) the object tree expands the untried moves of a node in that order.
+        With widening (progressive widening) a node of the object tree only gets a new child while it has fewer than
+        ceil(WIDENING_BASE * (visits + 1) ** widening) children, so the search goes deeper instead of trying every move first.
+        With total_time every move gets a share of the remaining game clock, capped by time_limit if that is set as well.
+        With early_stop the search stops once the most visited root move can no longer be overtaken (see search.time_manager.TimeManager).
+        With prune_dead the object tree never expands dead, captured or dominated hexes, which cannot improve the result (see search.inferior_cells).
+        """
+        assert tree != 'dag' or rave_k <= 0, 'RAVE is not supported by the dag tree'
+
         self.num_iterations = num_iterations
         self.time_limit = time_limit
         self.Cp = Cp
         self.live_play = live_play
         self.rave_k = rave_k
         self.debug = debug
+        self.playout = playout
+        self.playouts_per_leaf = playouts_per_leaf
+        self.tree = tree
+        self.reuse_tree = reuse_tree
+        self.workers = workers
+        self.parallel = parallel
+        self.max_nodes = max_nodes
+        self.num_nodes = 0
+        self.node_budget = max_nodes
+        self.solver = solver and tree == 'objects'
+        self.prior = prior
+        self.widening = widening
+        self.prune_dead = prune_dead
+        self.time_manager = TimeManager(num_iterations, time_limit, total_time, early_stop=early_stop)
+
+        self.root = None
+        self.pool = None
+        self.stats = { 'searches': 0, 'reuse_hits': 0, 'reused_visits': 0, 'prunes': 0, 'pruned_nodes': 0 }
         
     def get_next_move(self, board, color):
         """Returns the best next move using the MCTS search algorithm. This will run untill either the time limit or 
         the amount of allowed iterations has passed"""
-        start_time = time.time()
-        self.root = MCTSNode(board.copy(), parent=None, player=color, turn=color, rave_k=self.rave_k)
+        if self.use_workers() and self.parallel == 'tree': return self.get_next_move_tree_parallel(board, color)
+        if self.use_workers(): return self.get_next_move_parallel(board, color)
 
-        # Run the main MCTS loop num_iterations times
+        self.time_manager.start_move(board)
+        self.root = self.get_root(board, color)
+        if self.tree == 'objects' and self.max_nodes:
+            self.num_nodes = len(self.root.get_subtree())
+            self.node_budget = self.get_node_budget()
+
+        # Run the main MCTS loop until the time manager runs out of iterations or time, or the best move is decided
         i = 0
-        if self.num_iterations:
-            for _ in range(self.num_iterations):
-                self.run_iteration(i)
-                i += 1
-        else:
-            while (time.time() - start_time) < self.time_limit:
-                self.run_iteration(i)
-                i += 1
+        while not self.time_manager.should_stop(i, self.get_root_visits):
+            if self.solver and self.root.proven is not None: break
+            self.run_iteration(i)
+            i += 1
+        elapsed_time = self.time_manager.end_move()
                 
         if self.live_play:
-            elapsed_time = time.time() - start_time
             cls()
             print("Generation of this next move took %.2f seconds, ran %d iterations." % (elapsed_time, i))
+            print("Reused the previous tree in %d of %d searches (%.0f%%), %d visits in total." % (
+                self.stats['reuse_hits'], self.stats['searches'], 100 * self.get_reuse_hit_rate(), self.stats['reused_visits']))
+
+        if self.tree != 'objects': return self.root.child_with_most_visits()
 
         if self.debug: log_tree(self.root)
 
-        next_board = self.root.child_with_most_visits(self.num_iterations).board
+        next_board = self.root.child_with_most_visits(self.num_iterations, self.solver).board
         return HexBoard.get_move_between_boards(self.root.board, next_board)
     
+    def get_next_move_parallel(self, board, color):
+        """Runs an independent search in every worker, and returns a move that any worker proved to win, or the root move with the most visits summed over all trees"""
+        settings = self.get_worker_settings(self.time_manager.start_move(board))
+        tasks = [(settings, board, color, random.getrandbits(32)) for _ in range(self.workers)]
+
+        self.parallel_statistics = {}
+        proven_move = None
+        for statistics, worker_proven_move in self.get_pool().starmap(run_root_search, tasks):
+            proven_move = proven_move or worker_proven_move
+            for move, (visits, reward) in statistics.items():
+                total_visits, total_reward = self.parallel_statistics.get(move, (0, 0.0))
+                self.parallel_statistics[move] = (total_visits + visits, total_reward + reward)
+        elapsed_time = self.time_manager.end_move()
+
+        if self.live_play:
+            cls()
+            print("Generation of this next move took %.2f seconds, %d workers visited the root %d times." % (
+                elapsed_time, self.workers, sum(visits for visits, _ in self.parallel_statistics.values())))
+
+        if proven_move is not None: return proven_move
+        return max(self.parallel_statistics, key=lambda move: self.parallel_statistics[move][0])
+
+    def get_next_move_tree_parallel(self, board, color):
+        """Lets all workers grow one tree in shared memory, and returns the root move with the most visits"""
+        end_time = time.time() + (self.time_manager.start_move(board) or 0)
+        settings = { 'Cp': self.Cp, 'rave_k': self.rave_k, 'playout': self.playout, 'playouts_per_leaf': self.playouts_per_leaf }
+        tree = SharedArrayTree(board.copy(), color, capacity=self.get_shared_capacity(board), **settings)
+
+        try:
+            tasks = [(tree.name, tree.capacity, settings, board, color, random.getrandbits(32), self.num_iterations, end_time) for _ in range(self.workers)]
+            self.stats['iterations'] = sum(self.get_pool().starmap(run_tree_search, tasks))
+            self.parallel_statistics = tree.get_child_statistics()
+            move = tree.child_with_most_visits()
+        finally:
+            tree.close()
+        elapsed_time = self.time_manager.end_move()
+
+        if self.live_play:
+            cls()
+            print("Generation of this next move took %.2f seconds, %d workers ran %d iterations." % (elapsed_time, self.workers, self.stats['iterations']))
+
+        return move
+
+    def get_shared_capacity(self, board):
+        """Returns the amount of nodes to reserve for a shared tree, every iteration allocates at most one block of children"""
+        if self.num_iterations: return (self.num_iterations + self.workers + 1) * board.size ** 2
+        return 1 << 20
+
+    def get_worker_settings(self, time_limit):
+        """Returns the arguments for the single process MCTS that runs in every worker, which searches for the provided time limit"""
+        return {
+            'num_iterations': self.num_iterations, 'time_limit': time_limit, 'Cp': self.Cp, 'live_play': False, 'rave_k': self.rave_k,
+            'playout': self.playout, 'playouts_per_leaf': self.playouts_per_leaf, 'tree': self.tree, 'reuse_tree': False,
+            'max_nodes': self.max_nodes, 'solver': self.solver, 'prior': self.prior, 'widening': self.widening,
+            'early_stop': self.time_manager.early_stop, 'prune_dead': self.prune_dead
+        }
+
+    def get_pool(self):
+        """Returns the worker pool, which is created once and kept alive between moves so we only pay the spawn cost once"""
+        if self.pool is None:
+            locks = (multiprocessing.Lock(), [multiprocessing.Lock() for _ in range(NUM_STRIPES)])
+            self.pool = Pool(self.workers, init_worker, locks)
+        return self.pool
+
+    def close(self):
+        """Shuts down the worker pool, if there is one"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def __getstate__(self):
+        """Pickles everything except the worker pool"""
+        state = self.__dict__.copy()
+        state['pool'] = None
+        return state
+
+    def get_root_statistics(self):
+        """Returns the visits and the reward of every expanded root child, keyed by move. These are summed over all workers if root-parallel"""
+        if self.workers > 1: return self.parallel_statistics
+        if self.tree != 'objects': return self.root.get_child_statistics()
+        return { child.move: (child.num_visits, child.reward) for child in self.root.children }
+
+    def get_root(self, board, color):
+        """Returns the subtree of the previous search that matches the provided board with color to move, or a fresh root if there is none"""
+        self.stats['searches'] += 1
+
+        if self.reuse_tree and self.root is not None:
+            node = self.root.find_node(board, color)
+            if node is not None:
+                self.stats['reuse_hits'] += 1
+                if self.tree != 'objects':
+                    self.root.reroot(node, board, color)
+                    self.stats['reused_visits'] += self.root.num_visits
+                    return self.root
+
+                node.parent = None
+                self.stats['reused_visits'] += node.num_visits
+                return node
+
+        if self.tree == 'arrays':
+            return ArrayTree(board.copy(), color, self.Cp, self.rave_k, self.playout, self.playouts_per_leaf)
+        if self.tree == 'dag':
+            return DAGTree(board.copy(), color, self.Cp, self.playout, self.playouts_per_leaf, self.max_nodes or 1 << 18)
+        return MCTSNode(board.copy(), parent=None, player=color, turn=color, rave_k=self.rave_k, playout=self.playout, prior=priors.get(self.prior), prune_dead=self.prune_dead)
+
+    def get_root_visits(self):
+        """Returns the visits of every expanded root child"""
+        if self.tree == 'objects': return [child.num_visits for child in self.root.children]
+        return [visits for visits, _ in self.root.get_child_statistics().values()]
+
+    def get_reuse_hit_rate(self):
+        """Returns the fraction of searches that started from a reused subtree"""
+        return self.stats['reuse_hits'] / self.stats['searches'] if self.stats['searches'] else 0.0
+
     def run_iteration(self, iteration_idx):
         """Runs a single iteration of the MCTS search algorithm"""
+        if self.tree != 'objects': return self.root.run_iteration()
+
         node = self.select_and_expand(iteration_idx)
-        reward = node.simulate()
-        node.backpropagate(reward, node.player)
+
+        if self.solver and node.proven is not None:
+            # The outcome of a solved node is known, so there is no need to simulate it
+            reward = -node.proven if node.turn == node.player else node.proven
+            node.backpropagate(reward, node.player)
+        elif self.playouts_per_leaf > 1:
+            reward, amaf_stats = batch_fill_playout(node.board, node.turn, node.player, self.playouts_per_leaf)
+            node.backpropagate(reward, node.player, amaf_stats)
+        else:
+            reward, played_masks = node.simulate()
+            node.backpropagate(reward, node.player, played_masks=played_masks)
+
+        if self.max_nodes and self.num_nodes > self.node_budget: self.prune()
+
+    def get_node_budget(self):
+        """
+        Returns the node budget of the object tree for the current root. The root and its children are never pruned, so the budget is
+        at least twice their number, which leaves room for a deeper tree and lets every prune free a quarter of the budget
+        """
+        return max(self.max_nodes, 2 * (len(self.root.children) + len(self.root.untried_moves) + 1))
+
+    def prune(self):
+        """
+        Collapses the least visited subtrees into their parents, until at most 3/4 of the node budget is in use.
+        The visits of a node never exceed those of its parent, so keeping every node above a visit threshold keeps a connected tree.
+        The root and its children are always kept, since the move is picked from their statistics, so only the deeper nodes are pruned.
+        """
+        nodes = self.root.get_subtree()
+        deeper = sorted((node.num_visits for node in nodes if node.parent is not None and node.parent is not self.root), reverse=True)
+        keep = max(0, self.node_budget * 3 // 4 - len(self.root.children) - 1)
+        if keep >= len(deeper): return
+        for child in self.root.children: child.prune(deeper[keep])
+
+        self.num_nodes = len(self.root.get_subtree())
+        self.stats['prunes'] += 1
+        self.stats['pruned_nodes'] += len(nodes) - self.num_nodes
 
     def select_and_expand(self, iteration_idx):
         """Expands child nodes and handles UCT selection"""
         current_node = self.root
         winner = current_node.board.get_winner()
         while winner is None:
-            if len(current_node.untried_moves) > 0:
+            if self.solver and current_node.proven is not None: break
+
+            if self.can_expand(current_node):
+                self.num_nodes += 1
                 return current_node.expand()
             else:
-                current_node = current_node.best_child(self.Cp) # UCT select
+                current_node = current_node.best_child(self.Cp, self.solver) # UCT select
             winner = current_node.board.get_winner()
         return current_node
 
+    def can_expand(self, node):
+        """
+        Returns whether the provided node should get a new child instead of selecting one of its children.
+        With the solver a node whose children are all proven losses is always widened, since they can never be selected.
+        """
+        if not node.untried_moves: return False
+        if self.widening is None: return True
+
+        if len(node.children) < math.ceil(WIDENING_BASE * (node.num_visits + 1) ** self.widening): return True
+        return self.solver and all(child.proven == -1 for child in node.children)
+
     def __str__(self):
         """"Simple toString implementation, useful for debugging only"""
-        return 'MCTS(%d, %.2fs, %.2f, %d)' % (
+        return 'MCTS(%d, %.2fs, %.2f, %d, %s, %s%s)' % (
             self.num_iterations if self.num_iterations is not None else 0,
             self.time_limit if self.time_limit is not None else 0,
             self.Cp,
-            self.rave_k
+            self.rave_k,
+            self.playout if self.playouts_per_leaf == 1 else 'batch x%d' % self.playouts_per_leaf,
+            self.tree,
+            ', %d workers (%s)' % (self.workers, self.parallel) if self.workers > 1 else ''
         )
         
+def run_root_search(settings, board, color, seed):
+    """Grows one independent tree of a root-parallel search in a worker, returns the statistics of the root children and the move if it is a proven win"""
+    random.seed(seed)
+    np.random.seed(seed)
+
+    mcts = MCTS(**settings)
+    move = mcts.get_next_move(board, color)
+    proven_move = move if mcts.solver and mcts.root.proven == -1 else None
+    return mcts.get_root_statistics(), proven_move
+
 class MCTSNode:
     """A single MCTS node in the search tree"""
 
-    def __init__(self, board, player, parent=None, turn=None, rave_k=0.0):
+    def __init__(self, board, player, parent=None, turn=None, rave_k=0.0, playout='random', prior=None, prune_dead=False):
         """Creates a single node using the provided arguments"""
         self.board = board
         self.player = player
         self.parent = parent
         self.turn = turn
+        self.move = None
+        self.move_bit = 0
         
         self.children = []
-        self.untried_moves = self.board.get_possible_moves()
+        self.prune_dead = prune_dead
+        self.untried_moves = get_live_moves(self.board, turn) if prune_dead else self.board.get_possible_moves()
+        self.prior = prior # orders the untried moves on the first expansion, the move to try first last
 
-        self.simulated_moves_by_player = { 1: [], 2: [] }
+        # 1 if this node is a proven win for the player that moved into it, -1 if it is a proven loss, None if unknown
+        winner = self.board.get_winner()
+        self.proven = None if winner is None else (1 if winner != turn else -1)
 
         self.num_visits, self.num_amaf_visits = 0, 0
         self.reward, self.amaf_reward = 0, 0
+        self.collapsed = {} # the statistics of pruned children by move, restored when they are expanded again
 
         self.rave_k = rave_k
+        self.playout = playout
 
     def expand(self):
         """Expands one of the possible child moves"""
+        if self.prior is not None and not self.children:
+            self.untried_moves = self.prior(self.board, self.untried_moves, self.turn)
+
         move = self.untried_moves.pop() 
-        next_board = self.board.make_move(move, self.player)
-        child_node = MCTSNode(next_board, parent=self, player=self.player, turn=HexBoard.get_opposite_color(self.turn), rave_k=self.rave_k)
+        next_board = self.board.make_move(move, self.turn)
+        child_node = MCTSNode(next_board, parent=self, player=self.player, turn=HexBoard.get_opposite_color(self.turn), rave_k=self.rave_k, playout=self.playout, prior=self.prior, prune_dead=self.prune_dead)
+        child_node.move = move
+        child_node.move_bit = 1 << (move[0] * self.board.size + move[1])
+        if move in self.collapsed:
+            child_node.num_visits, child_node.reward, child_node.num_amaf_visits, child_node.amaf_reward = self.collapsed.pop(move)
         self.children.append(child_node)
         return child_node
     
     def simulate(self):
-        """Runs the game simulation playing random moves untill a terminal condition (win/loss/draw) is found"""
-        if self.rave_k > 0.0: self.simulated_moves_by_player = { 1: [], 2: [] }
+        """
+        Runs a game simulation from this node using the configured playout policy, and returns the reward for the root player.
+        If we are using RAVE also returns the bitmask of the moves played by each color, otherwise None.
+        """
+        played_masks = { HexBoard.BLUE: 0, HexBoard.RED: 0 } if self.rave_k > 0 else None
 
-        current_board = self.board.copy()
-        all_moves = current_board.get_possible_moves()
-        random.shuffle(all_moves)
+        winner = playouts[self.playout](self.board, self.turn, played_masks)
+        return HexBoard.get_reward(self.player, winner), played_masks
 
-        current_turn = self.player
-        winner = current_board.get_winner()
+    def backpropagate(self, reward, turn=None, amaf_stats=None, played_masks=None, proven_child=None):
+        """
+        Propagates the reward for the root player back through the tree. If we are using RAVE also tries to update siblings.
+        Every node stores its reward from the view of the player that made the move into it, so selection can always maximize.
+        The amaf_stats of a batch of playouts, or the played_masks of a single one, are applied to the children of every node
+        on the way up, using the move of each child. Proofs are propagated up as long as the child we came from is proven.
+        """
+        if proven_child is not None and self.proven is None: self.update_proof()
+        proven_self = self if self.proven is not None else None
 
-        while winner is None:
-            move = all_moves.pop()
+        self.num_visits += 1
+        self.reward += -reward if self.turn == self.player else reward
+        child_reward = reward if self.turn == self.player else -reward # children are created by a move of self.turn
 
+        if amaf_stats is not None:
             if self.rave_k > 0:
-                self.simulated_moves_by_player[current_turn].append(move) # Store a list of all simulated moves
-
-            current_board.place(move, current_turn)
-            current_turn = HexBoard.RED if current_turn == HexBoard.BLUE else HexBoard.BLUE
-            winner = current_board.get_winner()
-
-        return HexBoard.get_reward(self.player, winner)
+                visits, reward_sums = amaf_stats[self.turn]
+                for child in self.children:
+                    index = child.move[0] * self.board.size + child.move[1]
+                    child.num_amaf_visits += visits[index]
+                    child.amaf_reward += reward_sums[index] if self.turn == self.player else -reward_sums[index]
 
-    def backpropagate(self, reward, turn=None):
-        """Propagates the reward back through the tree. If we are using RAVE also tries to update siblings"""
-        self.num_visits += 1
-        self.reward += reward
+            if self.parent is not None: self.parent.backpropagate(reward, HexBoard.get_opposite_color(turn), amaf_stats, proven_child=proven_self)
 
-        if self.parent is not None:
-            if self.rave_k > 0:
+        else:
+            if played_masks is not None:
                 # Run All-Moves-As-First
-                simulated_boards = [self.board.make_move(move, self.turn).hash_code() for move in self.simulated_moves_by_player[self.turn]]
-
+                played = played_masks[self.turn]
                 for child in self.children:
-                    if child.board.hash_code() in simulated_boards:
+                    if played & child.move_bit:
                         child.num_amaf_visits += 1
-                        child.amaf_reward += reward
+                        child.amaf_reward += child_reward
 
             # Backpropagate further up
-            self.parent.backpropagate(reward, HexBoard.get_opposite_color(turn))
+            if self.parent is not None: self.parent.backpropagate(reward, HexBoard.get_opposite_color(turn), played_masks=played_masks, proven_child=proven_self)
     
-    def child_with_most_visits(self, num_iterations):
-        """Returns the child with the visits, since that should be the best action, according to the book"""
+    def update_proof(self):
+        """
+        Marks this node as a proven loss for the player that moved into it if the player to move has a winning child,
+        or as a proven win if every move of the player to move has been tried and is a proven loss.
+        """
+        if any(child.proven == 1 for child in self.children):
+            self.proven = -1
+        elif not self.untried_moves and all(child.proven == -1 for child in self.children):
+            self.proven = 1
+
+    def get_subtree(self):
+        """Returns a list of this node and all of its descendants"""
+        nodes, i = [self], 0
+        while i < len(nodes):
+            nodes.extend(nodes[i].children)
+            i += 1
+        return nodes
+
+    def prune(self, threshold):
+        """
+        Removes all descendants with at most threshold visits. Their statistics are already part of their parent, and their moves
+        are put back at the front of the untried moves, so they are only expanded again after all other untried moves.
+        A pruned child keeps its own statistics in the collapsed moves of its parent, so it comes back with them when expanded again.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            pruned = [child for child in node.children if child.num_visits <= threshold]
+            if pruned:
+                node.children = [child for child in node.children if child.num_visits > threshold]
+                node.untried_moves = [child.move for child in pruned] + node.untried_moves
+                for child in pruned: node.collapsed[child.move] = (child.num_visits, child.reward, child.num_amaf_visits, child.amaf_reward)
+            stack.extend(node.children)
+
+    def find_node(self, board, color):
+        """Returns the node at most two moves below this one that matches the provided board with color to move, or None"""
+        if board.size != self.board.size: return None
+
+        hash_code = board.hash_code()
+        grandchildren = [grandchild for child in self.children for grandchild in child.children]
+        for node in [self] + self.children + grandchildren:
+            if node.turn == color and node.board.hash_code() == hash_code: return node
+        return None
+
+    def child_with_most_visits(self, num_iterations, solver=False):
+        """
+        Returns the child with the visits, since that should be the best action, according to the book.
+        With the solver a proven win is returned at once, and proven losses are only returned if there is nothing else.
+        """
         # return self.best_child(0.0)
+        if solver:
+            proven_wins = [child for child in self.children if child.proven == 1]
+            if proven_wins: return proven_wins[0]
+
+            unproven = [child for child in self.children if child.proven != -1]
+            if unproven: return max(unproven, key=attrgetter('num_visits'))
+
         return max(self.children, key=attrgetter('num_visits'))
 
-    def best_child(self, Cp):
+    def best_child(self, Cp, solver=False):
         """Returns the best child using the provided Cp score. Cp of zero just exploitation, thus returning the best found so far"""
         ln_N = selection_rules.log_n(self.num_visits)
+        rewards = np.array([child.reward for child in self.children], dtype=np.float64)
+        visits = np.array([child.num_visits for child in self.children], dtype=np.float64)
 
         if self.rave_k > 0:
-            return max(self.children, key=lambda child: selection_rules.rave_score(child, self.rave_k, Cp, ln_N))
+            amaf_rewards = np.array([child.amaf_reward for child in self.children], dtype=np.float64)
+            amaf_visits = np.array([child.num_amaf_visits for child in self.children], dtype=np.float64)
+            scores = selection_rules.rave_scores(rewards, visits, amaf_rewards, amaf_visits, self.rave_k, Cp, ln_N)
         else:
-            return max(self.children, key=lambda child: selection_rules.uct_score(child.reward, child.num_visits, Cp, ln_N))
\ No newline at end of file
+            scores = selection_rules.uct_scores(rewards, visits, Cp, ln_N)
+
+        if solver:
+            # Never walk into a proven loss, a node that still has unproven children always has one left to select
+            scores[[child.proven == -1 for child in self.children]] = -math.inf
+
+        return self.children[int(np.argmax(scores))]
\ No newline at end of file
@@ -1,16 +1,36 @@
 import math
 import time
 import random
+from multiprocessing import Pool
 
 from util import cls
 from util.hexboard import HexBoard
 from . import HexSearchMethod
+from .transposition_table import TranspositionTable, EXACT, LOWER, UPPER
+from .move_ordering import MoveOrdering, STAGES
+from .shared_table import SharedTranspositionTable
+
+# Wider than 1, the amount the depth bonus of a decided line grows with every iteration, so those lines never fail the window
+ASPIRATION_WINDOW = 2
+
+# The minimax search of every Lazy SMP worker is kept between moves, so its killer moves and history carry over like in a single process
+worker_searches = {}
 
 class Minimax(HexSearchMethod):
     """This object houses all the code necessary for the minimax implementation"""
 
-    def __init__(self, depth, time_limit, evaluate_class, live_play = True, disable_tt = False):
-        """Initializes a new minimax object that is either depth-bound or time-limit bound"""
+    def __init__(self, depth, time_limit, evaluate_class, live_play = True, disable_tt = False, tt_size = 1 << 18, mode = 'alphabeta', ordering = 'history', workers = 1, prune_dead = False):
+        """
+        Initializes a new minimax object that is either depth-bound or time-limit bound, with a transposition table of tt_size entries.
+        The mode is either 'alphabeta' (minimax with alpha-beta pruning) or 'pvs' (negamax principal variation search,
+        where iterative deepening searches every depth with an aspiration window around the score of the previous one).
+        The ordering of the moves after the transposition table move is either 'none' (board order), 'history' (killer moves and
+        the history heuristic, the default) or 'path' (killer moves, then the hexes on a shortest path, then the history heuristic), see search.move_ordering.
+        With workers > 1 the search runs Lazy SMP in a pool of worker processes: every worker runs the same iterative deepening on one
+        transposition table in shared memory (see search.shared_table.SharedTranspositionTable), and the deepest completed result is played.
+        In a daemonic process, which cannot start workers, it warns and searches on one worker (see HexSearchMethod.use_workers).
+        With prune_dead the dead, captured and dominated hexes, which cannot improve the result, are never searched (see search.inferior_cells).
+        """
         assert depth is not None or time_limit is not None
 
         self.depth = depth
@@ -18,44 +38,196 @@ class Minimax(HexSearchMethod):
         self.evaluate = evaluate_class
         self.live_play = live_play
         self.disable_tt = disable_tt
+        self.mode = mode
+        self.ordering = ordering
+        self.prune_dead = prune_dead
+        self.move_ordering = MoveOrdering(heuristics=ordering != 'none', shortest_path=ordering == 'path', prune_dead=prune_dead)
+        self.workers = workers
+        self.tt_size = tt_size
+        self.pool = None
         self.start_time = 0
 
-        self.tp_table = {}
-        self.stats = { 'nodes_searched': 0, 'cutoffs': 0, 'tt_lookups': 0 }
+        self.tp_table = TranspositionTable(tt_size) if workers == 1 else None
+        self.reset_stats()
 
     def get_next_move(self, board, color):
-        """Returns the best next move for the provided color on the provided board/state"""
+        """Returns the best next move for the provided color on the provided board/state, the stats of the search are kept until the next move"""
         self.start_time = time.time()
-        alpha = -math.inf
-        beta = math.inf
-        opposite_color = HexBoard.get_opposite_color(color)
+        self.reset_stats()
 
-        max_depth = self.depth or 1
-        if self.depth:
-            best_move, _ = self.alpha_beta_search(board.copy(), self.depth, color, opposite_color, alpha, beta, True)
-        elif self.time_limit:
-            best_move = random.choice(board.get_possible_moves()) # Initialize with a random move, if not even one level of alpha-beta search can run in the allotted time limit
-            new_board = board.copy()
-            while (time.time() - self.start_time) < self.time_limit:
-                new_move, new_score = self.alpha_beta_search(new_board, max_depth, color, opposite_color, alpha, beta, True)
-                if new_move is not None and new_score is not None:
-                    best_move = new_move
-                max_depth += 1
+        if self.use_workers():
+            best_move = self.get_next_move_parallel(board, color)
+        else:
+            if self.tp_table is None: self.tp_table = TranspositionTable(self.tt_size) # a parallel search that fell back to one worker
+            self.tp_table.new_search()
+            self.move_ordering.new_search()
+            best_move = self.iterative_deepening(board, color)
         
         if self.live_play:
             elapsed_time = time.time() - self.start_time
 
             cls()
-            print("Searched to depth %d, evaluated %d nodes, experienced %d cutoffs, and used %d TT lookups." % (max_depth, self.stats['nodes_searched'], self.stats['cutoffs'], self.stats['tt_lookups']))
+            print("Searched to depth %d, evaluated %d nodes, experienced %d cutoffs, and used %d TT lookups." % (self.stats['depth'], self.stats['nodes_searched'], self.stats['cutoffs'], self.stats['tt_lookups']))
             print("Generation of this next move took %.2f seconds." % elapsed_time)
-        
-        self.stats = { 'nodes_searched': 0, 'cutoffs': 0, 'tt_lookups': 0 }
 
         return best_move
 
+    def iterative_deepening(self, board, color, start_depth=1):
+        """Searches to the fixed depth, or to increasing depths from start_depth until the time limit has passed, and returns the best move"""
+        if self.depth:
+            best_move, _ = self.search(board.copy(), self.depth, color, None)
+            self.stats['depth'] = self.depth
+            return best_move
+
+        best_move = random.choice(board.get_possible_moves()) # Initialize with a random move, if not even one level of alpha-beta search can run in the allotted time limit
+        new_board = board.copy()
+        previous_score = None
+        max_depth = start_depth
+        # Searching deeper than the amount of empty hexes cannot change the result anymore
+        while (time.time() - self.start_time) < self.time_limit and max_depth <= len(board.get_empty_cells()):
+            new_move, new_score = self.search(new_board, max_depth, color, previous_score)
+            if new_move is not None and new_score is not None:
+                best_move, previous_score = new_move, new_score
+                self.stats['depth'] = max_depth
+            max_depth += 1
+        return best_move
+
+    def get_next_move_parallel(self, board, color):
+        """Runs Lazy SMP, every worker searches the same position on the shared transposition table, and returns the move of the deepest search"""
+        if self.tp_table is None: self.tp_table = SharedTranspositionTable(self.tt_size)
+        self.tp_table.new_search()
+
+        settings = { 'depth': self.depth, 'time_limit': self.time_limit, 'evaluate_class': self.evaluate, 'disable_tt': self.disable_tt, 'mode': self.mode, 'ordering': self.ordering, 'prune_dead': self.prune_dead }
+        end_time = self.start_time + self.time_limit if self.time_limit is not None and not self.depth else None
+        tasks = [(self.tp_table.name, self.tt_size, self.tp_table.current_age, settings, board, color, worker_id, random.getrandbits(32), end_time) for worker_id in range(self.workers)]
+
+        best_move, best_depth = None, -1
+        for move, stats in self.get_pool().starmap(run_lazy_smp_search, tasks):
+            for name, value in stats.items():
+                if name != 'depth': self.stats[name] += value
+            if stats['depth'] > best_depth: best_move, best_depth = move, stats['depth']
+        self.stats['depth'] = best_depth
+        return best_move
+
+    def get_pool(self):
+        """Returns the worker pool, which is created once and kept alive between moves"""
+        if self.pool is None: self.pool = Pool(self.workers)
+        return self.pool
+
+    def close(self):
+        """Shuts down the worker pool and frees the shared transposition table, if there are any"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+        if self.workers > 1 and self.tp_table is not None:
+            self.tp_table.close()
+            self.tp_table = None
+
+    def __getstate__(self):
+        """Pickles everything except the worker pool and the shared transposition table"""
+        state = self.__dict__.copy()
+        state['pool'] = None
+        if self.workers > 1: state['tp_table'] = None
+        return state
+
+    def reset_stats(self):
+        """Resets the stats, which are kept for one move"""
+        self.stats = { 'nodes_searched': 0, 'cutoffs': 0, 'tt_probes': 0, 'tt_hits': 0, 'tt_lookups': 0, 'researches': 0, 'aspiration_fails': 0, 'depth': 0 }
+        for stage in STAGES: self.stats[stage + '_searched'], self.stats[stage + '_cutoffs'] = 0, 0
+
+    def get_cutoff_rates(self):
+        """Returns for every move ordering stage the fraction of its moves of the last move that caused a cutoff"""
+        return { stage: self.stats[stage + '_cutoffs'] / self.stats[stage + '_searched'] if self.stats[stage + '_searched'] else 0.0 for stage in STAGES }
+
+    def get_tt_hit_rate(self):
+        """Returns the fraction of transposition table probes of the last move that found the position, tt_lookups counts those that also ended its search"""
+        return self.stats['tt_hits'] / self.stats['tt_probes'] if self.stats['tt_probes'] else 0.0
+
+    def search(self, board, depth, color, previous_score):
+        """Searches the root to the provided depth with the selected mode, previous_score is the score of the previous depth or None"""
+        if self.mode == 'pvs': return self.aspiration_search(board, depth, color, previous_score)
+        return self.alpha_beta_search(board, depth, color, HexBoard.get_opposite_color(color), -math.inf, math.inf, True)
+
+    def aspiration_search(self, board, depth, color, previous_score):
+        """
+        Searches the root with a window of ASPIRATION_WINDOW around the score of the previous depth, most scores hardly change between depths.
+        If the score falls outside the window the root is searched again, with the window opened on the side that failed.
+        """
+        if previous_score is None: return self.pvs_search(board, depth, color, color, -math.inf, math.inf)
+
+        alpha, beta = previous_score - ASPIRATION_WINDOW, previous_score + ASPIRATION_WINDOW
+        while True:
+            move, score = self.pvs_search(board, depth, color, color, alpha, beta)
+            if score is None: return (None, None)
+
+            if score <= alpha and alpha > -math.inf: alpha = -math.inf
+            elif score >= beta and beta < math.inf: beta = math.inf
+            else: return (move, score)
+            self.stats['aspiration_fails'] += 1
+
+    def pvs_search(self, board, depth, color, turn, alpha, beta):
+        """
+        Negamax principal variation search, returns the best move and its score from the view of the player to move (turn).
+        Only the first move, the best one according to the transposition table, is searched with the full window. All other moves
+        are searched with a null window that can only prove they are not better, and are searched again if they turn out to be better.
+        """
+        original_alpha, original_beta = alpha, beta
+
+        # stop handling any code and immediately drop all your responsibilities if times has passed
+        if self.time_limit is not None and (time.time() - self.start_time) >= self.time_limit: 
+            return (None, None)
+
+        cached_best_move = None
+        if not self.disable_tt:
+            hash_code = board.hash_code(turn)
+            cached_best_move, alpha, beta, tt_score = self.probe(board, hash_code, depth, alpha, beta)
+            if tt_score is not None: return (cached_best_move, tt_score)
+
+        winner = board.get_winner()
+        if depth == 0 or winner is not None:
+            score = self.evaluate.evaluate_board(board, color)
+            if winner is not None: score += depth * HexBoard.get_reward(color, winner) # prefer quick wins and slow losses
+            self.stats['nodes_searched'] += 1
+            return (None, score if turn == color else -score)
+
+        opposite_turn = HexBoard.get_opposite_color(turn)
+        best_score = -math.inf
+        best_move = None
+
+        for i, (move, stage) in enumerate(self.move_ordering.order_moves(board, turn, cached_best_move, depth)):
+            self.stats[stage + '_searched'] += 1
+            board.push(move, turn)
+            if i == 0:
+                _, score = self.pvs_search(board, depth - 1, color, opposite_turn, -beta, -alpha)
+            else:
+                _, score = self.pvs_search(board, depth - 1, color, opposite_turn, -alpha - 1, -alpha)
+                if score is not None and alpha < -score < beta:
+                    self.stats['researches'] += 1
+                    _, score = self.pvs_search(board, depth - 1, color, opposite_turn, -beta, -alpha)
+            board.pop()
+
+            if score == None:
+                return (None, None)
+
+            if -score > best_score:
+                best_score = -score
+                best_move = move
+
+                alpha = max(best_score, alpha)
+                if alpha >= beta:
+                    self.record_cutoff(board, move, stage, turn, depth)
+                    break
+
+        if not self.disable_tt: self.store(hash_code, board, depth, best_move, best_score, original_alpha, original_beta)
+        return (best_move, best_score)
+
     def alpha_beta_search(self, board, depth, color, opposite_color, alpha, beta, maximizing):
-        """Handles minimax search using alpha beta pruning and good use of move-ordering and transposition tables"""
+        """
+        Handles minimax search using alpha beta pruning and good use of move-ordering and transposition tables.
+        Entries of a search at least as deep end the search if they are exact, or if their bound falls outside the window.
+        """
         cached_best_move = None
+        original_alpha, original_beta = alpha, beta
 
         # stop handling any code and immediately drop all your responsibilities if times has passed
         if self.time_limit is not None and (time.time() - self.start_time) >= self.time_limit: 
@@ -63,32 +235,25 @@ class Minimax(HexSearchMethod):
         
         if not self.disable_tt:
             hash_code = board.hash_code(color if maximizing else opposite_color)
-
-            if hash_code in self.tp_table:
-                if self.tp_table[hash_code][0] == depth:
-                    self.stats['tt_lookups'] += 1
-                    return (self.tp_table[hash_code][1], self.tp_table[hash_code][2])
-                else:
-                    cached_best_move = self.tp_table[hash_code][1]
+            cached_best_move, alpha, beta, tt_score = self.probe(board, hash_code, depth, alpha, beta)
+            if tt_score is not None: return (cached_best_move, tt_score)
         
-        if depth == 0 or board.get_winner() is not None:
+        winner = board.get_winner()
+        if depth == 0 or winner is not None:
             score = self.evaluate.evaluate_board(board, color)
+            if winner is not None: score += depth * HexBoard.get_reward(color, winner) # prefer quick wins and slow losses
             self.stats['nodes_searched'] += 1
             return (None, score)
 
-        moves = board.get_possible_moves()
-        
-        if cached_best_move is not None:
-            moves.insert(0, cached_best_move)
-
         if maximizing:
             best_score = -math.inf
             best_move = None
 
-            for move in moves:
-                board.place(move, color)
+            for move, stage in self.move_ordering.order_moves(board, color, cached_best_move, depth):
+                self.stats[stage + '_searched'] += 1
+                board.push(move, color)
                 _, score = self.alpha_beta_search(board, depth - 1, color, opposite_color, alpha, beta, False)
-                board.place(move, HexBoard.EMPTY)
+                board.pop()
 
                 if score == None:
                     return (None, None)
@@ -99,20 +264,21 @@ class Minimax(HexSearchMethod):
 
                     alpha = max(best_score, alpha)
                     if alpha >= beta:
-                        self.stats['cutoffs'] += 1
+                        self.record_cutoff(board, move, stage, color, depth)
                         break
 
-            if not self.disable_tt: self.tp_table[board.hash_code(color)] = (depth, best_move, best_score)
+            if not self.disable_tt: self.store(hash_code, board, depth, best_move, best_score, original_alpha, original_beta)
             return (best_move, best_score)
             
         else:
             best_score = math.inf
             best_move = None
 
-            for move in moves:
-                board.place(move, opposite_color)
+            for move, stage in self.move_ordering.order_moves(board, opposite_color, cached_best_move, depth):
+                self.stats[stage + '_searched'] += 1
+                board.push(move, opposite_color)
                 _, score = self.alpha_beta_search(board, depth - 1, color, opposite_color, alpha, beta, True)
-                board.place(move, HexBoard.EMPTY)
+                board.pop()
 
                 if score == None:
                     return (None, None)
@@ -123,12 +289,74 @@ class Minimax(HexSearchMethod):
                     
                     beta = min(best_score, beta)
                     if alpha >= beta:
-                        self.stats['cutoffs'] += 1
+                        self.record_cutoff(board, move, stage, opposite_color, depth)
                         break
                     
-            if not self.disable_tt: self.tp_table[board.hash_code(opposite_color)] = (depth, best_move, best_score)
+            if not self.disable_tt: self.store(hash_code, board, depth, best_move, best_score, original_alpha, original_beta)
             return (best_move, best_score)
+
+    def record_cutoff(self, board, move, stage, turn, depth):
+        """Counts a cutoff by a move of the provided move ordering stage, and lets the move ordering learn from it"""
+        self.stats['cutoffs'] += 1
+        self.stats[stage + '_cutoffs'] += 1
+        self.move_ordering.record_cutoff(board, move, turn, depth)
+
+    def probe(self, board, hash_code, depth, alpha, beta):
+        """
+        Looks up the position in the transposition table, returns the stored best move, the alpha-beta window narrowed by a stored bound,
+        and the stored score if it ends the search: if it comes from a search at least as deep and is exact, or its bound falls outside the window.
+        """
+        entry = self.tp_table.probe(hash_code)
+        self.stats['tt_probes'] += 1
+        if entry is None: return (None, alpha, beta, None)
+
+        self.stats['tt_hits'] += 1
+        entry_depth, entry_move, entry_score, flag = entry
+        cached_best_move = divmod(entry_move, board.size) if entry_move >= 0 else None
+
+        if entry_depth >= depth:
+            if flag == LOWER: alpha = max(alpha, entry_score)
+            elif flag == UPPER: beta = min(beta, entry_score)
+
+            if flag == EXACT or alpha >= beta:
+                self.stats['tt_lookups'] += 1
+                return (cached_best_move, alpha, beta, entry_score)
+
+        return (cached_best_move, alpha, beta, None)
+
+    def store(self, hash_code, board, depth, best_move, best_score, alpha, beta):
+        """Stores a search result in the transposition table, as an upper or lower bound if it fell outside the original alpha-beta window"""
+        flag = UPPER if best_score <= alpha else LOWER if best_score >= beta else EXACT
+        move = best_move[0] * board.size + best_move[1] if best_move is not None else -1
+        self.tp_table.store(hash_code, depth, move, best_score, flag)
     
     def __str__(self):
         """To string implementation, only used for debugging purposes"""
-        return 'Minimax(%d, %.2fs, %s)' % (self.depth if self.depth is not None else 0, self.time_limit if self.time_limit is not None else 0, self.evaluate.__class__.__name__)
\ No newline at end of file
+        return 'Minimax(%d, %.2fs, %s%s%s)' % (self.depth if self.depth is not None else 0, self.time_limit if self.time_limit is not None else 0, self.evaluate.__class__.__name__, ', pvs' if self.mode == 'pvs' else '', ', %d workers' % self.workers if self.workers > 1 else '')
+
+
+def run_lazy_smp_search(name, tt_size, age, settings, board, color, worker_id, seed, end_time):
+    """
+    Runs the iterative deepening of one Lazy SMP worker on the shared transposition table until the end time, returns its best move and stats.
+    Odd workers start one depth deeper, and all workers but the first break ties in the move ordering randomly, so they spread out over the tree.
+    """
+    random.seed(seed)
+    if worker_searches.get(worker_id, (None, None))[0] != name:
+        # The private table of the worker search is replaced by the shared one for every move, so it only gets the smallest size
+        worker_searches[worker_id] = (name, Minimax(live_play=False, tt_size=2, **settings))
+    minimax = worker_searches[worker_id][1]
+    minimax.move_ordering.shuffle = worker_id > 0
+
+    minimax.tp_table = SharedTranspositionTable(tt_size, name=name)
+    minimax.tp_table.current_age = age
+    try:
+        minimax.start_time = time.time()
+        if end_time is not None: minimax.time_limit = max(end_time - minimax.start_time, 0.0)
+        minimax.reset_stats()
+        minimax.move_ordering.new_search()
+        move = minimax.iterative_deepening(board, color, start_depth=1 + worker_id % 2)
+    finally:
+        minimax.tp_table.close()
+        minimax.tp_table = None
+
+    return move, minimax.stats
@@ -0,0 +1,89 @@
+import random
+
+from util.hexboard import HexBoard
+from search.priors import get_path_lengths
+from search.inferior_cells import get_live_moves
+
+# The stages in which moves are ordered, every move is searched once, in the first stage it belongs to
+STAGES = ('tt', 'killer', 'path', 'other')
+NUM_KILLERS = 2
+# Finding the shortest paths costs more than it saves right above the leaves, there only the other heuristics are used
+PATH_MIN_DEPTH = 2
+
+
+class MoveOrdering:
+    """
+    Orders the moves of a minimax node in stages. First the best move stored in the transposition table, then the killer moves
+    of the ply (moves that caused a cutoff in a sibling position), then the hexes on a shortest path of either color, and finally
+    all other moves by their history score, the summed squared depth of all cutoffs they caused for the player to move.
+    With heuristics disabled there are no killer moves and no history scores, and without shortest_path there is no path stage.
+    With shuffle, moves with the same history score are ordered randomly instead of in board order.
+    With prune_dead the dead, captured and dominated hexes are left out, see search.inferior_cells.
+    """
+
+    def __init__(self, heuristics=True, shortest_path=True, shuffle=False, prune_dead=False):
+        """Creates a move ordering without any killer moves or history"""
+        self.heuristics = heuristics
+        self.shortest_path = shortest_path
+        self.shuffle = shuffle
+        self.prune_dead = prune_dead
+        self.killers = []
+        self.history = { HexBoard.BLUE: {}, HexBoard.RED: {} }
+
+    def new_search(self):
+        """Forgets the killer moves, and halves all history scores so the cutoffs of earlier moves weigh less"""
+        self.killers = []
+        for scores in self.history.values():
+            for move in scores: scores[move] //= 2
+
+    def order_moves(self, board, turn, tt_move, depth):
+        """Returns the moves of the player to move (turn) at the provided remaining depth in the order they should be searched, each with the stage that ordered it"""
+        ply = len(board.move_stack)
+        moves = get_live_moves(board, turn) if self.prune_dead else board.get_possible_moves()
+        ordered = []
+
+        if tt_move is not None and board.is_empty(tt_move): ordered.append((tt_move, 'tt'))
+        if self.heuristics and ply < len(self.killers):
+            ordered.extend((move, 'killer') for move in self.killers[ply] if move != tt_move and move in moves)
+
+        taken = { move for move, _ in ordered }
+        moves = sorted(move for move in moves if move not in taken) # HexBoard keeps its empty hexes in no particular order
+        if self.shuffle: random.shuffle(moves)
+        if self.heuristics:
+            history = self.history[turn]
+            moves.sort(key=lambda move: history.get(move, 0), reverse=True)
+
+        if self.shortest_path and depth >= PATH_MIN_DEPTH:
+            path_cells = get_shortest_path_cells(board)
+            ordered.extend((move, 'path') for move in moves if move in path_cells)
+            ordered.extend((move, 'other') for move in moves if move not in path_cells)
+        else:
+            ordered.extend((move, 'other') for move in moves)
+
+        return ordered
+
+    def record_cutoff(self, board, move, turn, depth):
+        """Remembers the provided move as a killer move of its ply, and adds the squared depth to its history score"""
+        if not self.heuristics: return
+
+        ply = len(board.move_stack)
+        while len(self.killers) <= ply: self.killers.append([])
+
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[NUM_KILLERS:]
+
+        history = self.history[turn]
+        history[move] = history.get(move, 0) + depth * depth
+
+def get_shortest_path_cells(board):
+    """Returns the set of empty hexes that lie on a shortest path of either color"""
+    path_cells = set()
+    for color in (HexBoard.BLUE, HexBoard.RED):
+        path_lengths = get_path_lengths(board, color)
+        if not path_lengths: continue
+
+        shortest = min(path_lengths.values())
+        path_cells.update(move for move, length in path_lengths.items() if length == shortest)
+    return path_cells
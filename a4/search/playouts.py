@@ -0,0 +1,182 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from util.bitboard import BitBoard
+from util.hexboard import HexBoard
+
+
+def random_playout(board, turn, played_masks=None):
+    """
+    Plays random moves on a copy of the board untill a terminal condition (win/loss/draw) is found, checking for a winner after every move.
+    If played_masks is provided, the bits of all moves are or-ed into the mask of the color that played them, used for all-moves-as-first.
+    """
+    current_board = board.copy()
+    all_moves = current_board.get_possible_moves()
+    random.shuffle(all_moves)
+
+    current_turn = turn
+    winner = current_board.get_winner()
+
+    while winner is None:
+        move = all_moves.pop()
+
+        if played_masks is not None:
+            played_masks[current_turn] |= 1 << (move[0] * current_board.size + move[1])
+
+        current_board.place(move, current_turn)
+        current_turn = HexBoard.RED if current_turn == HexBoard.BLUE else HexBoard.BLUE
+        winner = current_board.get_winner()
+
+    return winner
+
+def fill_playout(board, turn, played_masks=None):
+    """
+    Fills all remaining hexes at once, alternating colors in a random order, and checks for a winner only once.
+    A completely filled Hex board always has exactly one winner, so checking one color is enough.
+    """
+    winner = board.get_winner()
+    if winner is not None: return winner
+
+    moves = list(board.get_empty_cells())
+    random.shuffle(moves)
+    own_moves, opponent_moves = moves[0::2], moves[1::2]
+    red_moves = own_moves if turn == HexBoard.RED else opponent_moves
+
+    size = board.size
+    red_filled = 0
+    for x, y in red_moves:
+        red_filled |= 1 << (x * size + y)
+
+    if played_masks is not None:
+        empty = BitBoard.get_full_mask(size) & ~(board.get_stone_mask(HexBoard.BLUE) | board.get_stone_mask(HexBoard.RED))
+        played_masks[HexBoard.RED] |= red_filled
+        played_masks[HexBoard.BLUE] |= empty & ~red_filled
+
+    red_stones = board.get_stone_mask(HexBoard.RED) | red_filled
+    return HexBoard.RED if BitBoard.connects(red_stones, HexBoard.RED, size) else HexBoard.BLUE
+
+def bridge_playout(board, turn, played_masks=None):
+    """
+    Fills all remaining hexes like fill_playout, but in turn order and with one pattern: when a move intrudes into a two-bridge of
+    the player to move, that player saves the bridge by playing its other carrier hex. Otherwise the next hex of a random order is played.
+    """
+    winner = board.get_winner()
+    if winner is not None: return winner
+
+    size = board.size
+    patterns = get_bridge_patterns(size)
+    stones = { HexBoard.RED: board.get_stone_mask(HexBoard.RED), HexBoard.BLUE: board.get_stone_mask(HexBoard.BLUE) }
+    empty = BitBoard.get_full_mask(size) & ~(stones[HexBoard.RED] | stones[HexBoard.BLUE])
+
+    moves = [x * size + y for x, y in board.get_empty_cells()]
+    random.shuffle(moves)
+
+    current_turn, last_move = turn, None
+    while empty:
+        move = None
+        if last_move is not None:
+            own_stones = stones[current_turn]
+            for endpoints, carrier in patterns[last_move]:
+                if own_stones & endpoints == endpoints and empty >> carrier & 1:
+                    move = carrier
+                    break
+
+        if move is None:
+            move = moves.pop()
+            while not empty >> move & 1: move = moves.pop() # skip the hexes that were already played as a response
+
+        stones[current_turn] |= 1 << move
+        empty &= ~(1 << move)
+        current_turn, last_move = HexBoard.get_opposite_color(current_turn), move
+
+    if played_masks is not None:
+        for color, mask in played_masks.items():
+            played_masks[color] = mask | (stones[color] & ~board.get_stone_mask(color))
+
+    return HexBoard.RED if BitBoard.connects(stones[HexBoard.RED], HexBoard.RED, size) else HexBoard.BLUE
+
+@lru_cache(maxsize=32)
+def get_bridge_patterns(size):
+    """
+    Returns for every hex the two-bridges it is a carrier of, as tuples of the mask of both bridge stones and the index of the other carrier.
+    The two carriers of a bridge are adjacent neighbors of both of its stones, a hex is a carrier of at most six bridges.
+    """
+    # The neighbor offsets in clockwise order, so consecutive offsets are the carriers of the bridge to their sum
+    ring = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+    patterns = [[] for _ in range(size ** 2)]
+
+    for x in range(size):
+        for y in range(size):
+            for (dx1, dy1), (dx2, dy2) in zip(ring, ring[1:] + ring[:1]):
+                carriers = ((x + dx1, y + dy1), (x + dx2, y + dy2))
+                other = (x + dx1 + dx2, y + dy1 + dy2)
+                if not all(HexBoard.in_bounds(cx, cy, size) for cx, cy in carriers + (other,)): continue
+
+                # Every bridge is found from both of its stones, only keep it once
+                if (other[0], other[1]) < (x, y): continue
+
+                endpoints = (1 << (x * size + y)) | (1 << (other[0] * size + other[1]))
+                first, second = [cx * size + cy for cx, cy in carriers]
+                patterns[first].append((endpoints, second))
+                patterns[second].append((endpoints, first))
+
+    return tuple(tuple(cell_patterns) for cell_patterns in patterns)
+
+def batch_fill_playout(board, turn, player, num_playouts):
+    """
+    Runs num_playouts fill playouts of the same board at once, as a (num_playouts, size, size) int8 tensor, with turn moving first.
+    Returns the mean reward for the provided player, and the all-moves-as-first statistics per color:
+    for every hex the amount of playouts in which that color filled it, and the summed reward of those playouts.
+    """
+    size = board.size
+    amaf_stats = { color: (np.zeros(size ** 2), np.zeros(size ** 2)) for color in (HexBoard.BLUE, HexBoard.RED) }
+
+    winner = board.get_winner()
+    if winner is not None: return HexBoard.get_reward(player, winner), amaf_stats
+
+    cells = board.as_np().astype(np.int8).flatten()
+    empty = np.flatnonzero(cells == HexBoard.EMPTY)
+
+    # Every playout is a random permutation of the same alternating sequence of colors
+    colors = np.resize(np.array([turn, HexBoard.get_opposite_color(turn)], dtype=np.int8), len(empty))
+    order = np.argsort(np.random.random((num_playouts, len(empty))), axis=1)
+    boards = np.tile(cells, (num_playouts, 1))
+    boards[:, empty] = colors[order]
+
+    red_wins = connects_batch(boards.reshape((num_playouts, size, size)) == HexBoard.RED)
+    rewards = np.where(red_wins, 1, -1) if player == HexBoard.RED else np.where(red_wins, -1, 1)
+
+    for color, (visits, reward_sums) in amaf_stats.items():
+        played = boards[:, empty] == color
+        visits[empty] = played.sum(axis=0)
+        reward_sums[empty] = (played * rewards[:, None]).sum(axis=0)
+
+    return rewards.mean(), amaf_stats
+
+def connects_batch(stones):
+    """Vectorized flood fill over a (K, size, size) boolean tensor of red stones, returns per board if red connects y = 0 to y = size - 1"""
+    reached = np.zeros_like(stones)
+    reached[:, :, 0] = stones[:, :, 0]
+
+    while True:
+        grown = reached.copy()
+        grown[:, 1:, :] |= reached[:, :-1, :]     # (1, 0)
+        grown[:, :-1, :] |= reached[:, 1:, :]     # (-1, 0)
+        grown[:, :, 1:] |= reached[:, :, :-1]     # (0, 1)
+        grown[:, :, :-1] |= reached[:, :, 1:]     # (0, -1)
+        grown[:, :-1, 1:] |= reached[:, 1:, :-1]  # (-1, 1)
+        grown[:, 1:, :-1] |= reached[:, :-1, 1:]  # (1, -1)
+        grown &= stones
+
+        if np.array_equal(grown, reached): break
+        reached = grown
+
+    return reached[:, :, -1].any(axis=1)
+
+playouts = {
+    'random': random_playout,
+    'fill': fill_playout,
+    'bridge': bridge_playout
+}
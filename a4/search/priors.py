@@ -0,0 +1,56 @@
+from functools import lru_cache
+
+from util.hexboard import HexBoard
+from evaluate.dijkstra import Dijkstra
+
+dijkstra = Dijkstra()
+
+def centre_prior(board, moves, turn):
+    """Orders the moves by their distance to the centre of the board, the closest move last since untried moves are popped from the end"""
+    distances = get_centre_distances(board.size)
+    return sorted(moves, key=lambda move: -distances[move[0] * board.size + move[1]])
+
+def dijkstra_prior(board, moves, turn):
+    """
+    Orders the moves by the length of the shortest path through them for either color, so the hexes that matter most for
+    connecting or blocking are expanded first (last in the list). Ties are broken by the distance to the centre.
+    """
+    centre_distances = get_centre_distances(board.size)
+    path_lengths = {}
+
+    for color in (HexBoard.BLUE, HexBoard.RED):
+        for move, length in get_path_lengths(board, color).items():
+            path_lengths[move] = min(length, path_lengths.get(move, length))
+
+    unreachable = board.size ** 2
+    return sorted(moves, key=lambda move: (-path_lengths.get(move, unreachable), -centre_distances[move[0] * board.size + move[1]]))
+
+def get_path_lengths(board, color):
+    """
+    Returns the length of the shortest path of the provided color through every empty hex it can reach. A hex lies on a shortest path
+    of the color if the distances from both of its edges add up to the shortest path length.
+    """
+    opposite_color = HexBoard.get_opposite_color(color)
+    from_source = dijkstra.get_distances(board, board.source_coords[color], opposite_color)
+    from_target = dijkstra.get_distances(board, board.target_coords[color], opposite_color)
+
+    return {
+        move: from_source[move] + from_target[move] - 1 # the empty hex itself is counted from both sides
+        for move in board.get_empty_cells() if move in from_source and move in from_target
+    }
+
+@lru_cache(maxsize=32)
+def get_centre_distances(size):
+    """Returns the hex distance of every hex to the centre of the board, indexed by x * size + y"""
+    centre = (size - 1) / 2
+    distances = []
+    for x in range(size):
+        for y in range(size):
+            dx, dy = x - centre, y - centre
+            distances.append(max(abs(dx), abs(dy), abs(dx + dy)))
+    return tuple(distances)
+
+priors = {
+    'centre': centre_prior,
+    'dijkstra': dijkstra_prior
+}
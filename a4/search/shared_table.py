@@ -0,0 +1,69 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from search.transposition_table import TranspositionTable
+
+def get_checksum(depth, move, score_bits, flag):
+    """Returns the checksum of the data of an entry, which is stored XORed into its key"""
+    return score_bits ^ (move << 40) ^ (depth << 24) ^ (flag << 16)
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    TranspositionTable whose arrays live in one multiprocessing.shared_memory block, so the workers of a Lazy SMP search share their results.
+    Entries are read and written without locks. Every key is stored XORed with a checksum of the data of its entry, so an entry that is
+    half overwritten by another worker no longer matches its key, and is treated as missing instead of returning a mix of two searches.
+    """
+
+    def __init__(self, size=1 << 18, name=None):
+        """Creates a new shared table, or attaches to the existing one with the provided shared memory name"""
+        self.name = name
+        super().__init__(size)
+
+    def create_arrays(self, capacity):
+        """Creates all per entry arrays as views on one shared memory block"""
+        size = capacity * sum(np.dtype(dtype).itemsize for _, dtype, _ in TranspositionTable.FIELDS)
+        self.created = self.name is None
+        self.shared_memory = shared_memory.SharedMemory(name=self.name, create=self.created, size=size)
+        self.name = self.shared_memory.name
+
+        offset = 0
+        for name, dtype, fill in TranspositionTable.FIELDS:
+            array = np.ndarray(capacity, dtype=dtype, buffer=self.shared_memory.buf, offset=offset)
+            if self.created: array.fill(fill)
+            setattr(self, name, array)
+            offset += array.nbytes
+
+    def close(self):
+        """Detaches from the shared memory, the process that created the table also frees it"""
+        for name, _, _ in TranspositionTable.FIELDS: setattr(self, name, None)
+        self.shared_memory.close()
+        if self.created: self.shared_memory.unlink()
+
+    def get_entry(self, slot):
+        """Returns the key, the depth, the move index, the score and the flag of the entry in the provided slot, the key is None if the slot is empty"""
+        depth, move, score, flag = int(self.depth[slot]), int(self.move[slot]), self.score[slot], int(self.flag[slot])
+        key = int(self.key[slot]) ^ get_checksum(depth, move, int(score.view(np.int64)), flag)
+        return key if depth >= 0 else None, depth, move, float(score), flag
+
+    def probe(self, hash_code):
+        """Returns the depth, the move index, the score and the flag of the entry of the provided hash, or None if it is not stored intact"""
+        slot, key = self.get_slot(hash_code)
+        for slot in (slot, slot + 1):
+            entry = self.get_entry(slot)
+            if entry[0] == key: return entry[1:]
+        return None
+
+    def store(self, hash_code, depth, move, score, flag):
+        """Stores a search result like TranspositionTable.store, the data is written before the key that validates it"""
+        slot, key = self.get_slot(hash_code)
+        if self.depth[slot] > depth and self.age[slot] == self.current_age and self.get_entry(slot)[0] != key: slot += 1
+
+        self.depth[slot] = depth
+        self.move[slot] = move
+        self.score[slot] = score
+        self.flag[slot] = flag
+        self.age[slot] = self.current_age
+        self.key[slot] = key ^ get_checksum(depth, move, int(self.score[slot].view(np.int64)), flag)
+
@@ -0,0 +1,160 @@
+import time
+import random
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from util.hexboard import HexBoard
+from search import selection_rules
+from search.array_tree import ArrayTree
+
+VIRTUAL_LOSS = 1.0
+NUM_STRIPES = 64
+
+# Set once per worker by init_worker, locks can only be handed to processes when they are created
+allocation_lock = None
+stripe_locks = None
+
+def init_worker(shared_allocation_lock, shared_stripe_locks):
+    """Stores the locks of the tree-parallel search in the worker"""
+    global allocation_lock, stripe_locks
+    allocation_lock = shared_allocation_lock
+    stripe_locks = shared_stripe_locks
+
+
+class SharedArrayTree(ArrayTree):
+    """
+    ArrayTree whose arrays live in one multiprocessing.shared_memory block, so several worker processes can grow the same tree.
+    The capacity is fixed, a node that does not fit anymore is simply simulated without being expanded.
+    Expansions and backpropagation lock the stripe of the node (node % NUM_STRIPES), node allocation takes a global lock.
+    Selection applies a virtual loss to every node on its path, so concurrent workers spread out over different children.
+    The AMAF statistics are updated without locks, a lost update only makes them slightly less accurate.
+    """
+
+    def __init__(self, board, player, Cp=0.4, rave_k=-1, playout='random', playouts_per_leaf=1, capacity=1 << 18, name=None):
+        """Creates a new shared tree with only a root node, or attaches to the existing one with the provided shared memory name"""
+        self.name = name
+        super().__init__(board, player, Cp, rave_k, playout, playouts_per_leaf, capacity)
+
+    def create_arrays(self, capacity):
+        """Creates all per node arrays as views on one shared memory block, behind a header that holds the amount of nodes"""
+        size = 8 + capacity * sum(np.dtype(dtype).itemsize for _, dtype, _ in ArrayTree.FIELDS)
+        self.created = self.name is None
+        self.shared_memory = shared_memory.SharedMemory(name=self.name, create=self.created, size=size)
+        self.name = self.shared_memory.name
+        self.capacity = capacity
+
+        self.header = np.ndarray(1, dtype=np.int64, buffer=self.shared_memory.buf)
+        offset = 8
+        for name, dtype, fill in ArrayTree.FIELDS:
+            array = np.ndarray(capacity, dtype=dtype, buffer=self.shared_memory.buf, offset=offset)
+            if self.created: array.fill(fill)
+            setattr(self, name, array)
+            offset += array.nbytes
+
+        if self.created: self.num_nodes = 1
+
+    @property
+    def num_nodes(self):
+        """Returns the amount of allocated nodes, shared by all workers"""
+        return int(self.header[0])
+
+    @num_nodes.setter
+    def num_nodes(self, num_nodes):
+        """Sets the amount of allocated nodes, shared by all workers"""
+        self.header[0] = num_nodes
+
+    def close(self):
+        """Detaches from the shared memory, the process that created the tree also frees it"""
+        for name, _, _ in ArrayTree.FIELDS: setattr(self, name, None)
+        self.header = None
+        self.shared_memory.close()
+        if self.created: self.shared_memory.unlink()
+
+    def allocate_children(self, node, moves):
+        """Allocates a block of children under the global lock, returns False if the tree is full"""
+        with allocation_lock:
+            first, count = self.num_nodes, len(moves)
+            if first + count > self.capacity: return False
+            self.num_nodes = first + count
+
+        self.parent[first:first + count] = node
+        self.move[first:first + count] = [x * self.board.size + y for x, y in moves]
+        self.child_count[node] = count
+        self.first_child[node] = first
+        return True
+
+    def best_child(self, node):
+        """Returns the best child like ArrayTree.best_child, children that are being expanded by another worker count as one visit"""
+        first = self.first_child[node]
+        children = slice(first, first + self.child_count[node])
+        visits = np.maximum(self.visits[children], 1)
+        ln_N = selection_rules.log_n(int(self.visits[node]))
+
+        if self.rave_k > 0:
+            scores = selection_rules.rave_scores(self.reward[children], visits, self.amaf_reward[children], self.amaf_visits[children], self.rave_k, self.Cp, ln_N)
+        else:
+            scores = selection_rules.uct_scores(self.reward[children], visits, self.Cp, ln_N)
+
+        return first + int(np.argmax(scores))
+
+    def add_virtual_loss(self, node):
+        """Counts a visit that lost for the player moving into the node, until backpropagation replaces it by the real reward"""
+        with stripe_locks[node % NUM_STRIPES]:
+            self.visits[node] += 1
+            self.reward[node] -= VIRTUAL_LOSS
+
+    def run_iteration(self):
+        """Runs a single iteration like ArrayTree.run_iteration, but with locked expansions and virtual loss"""
+        board, node, turn = self.board, self.root, self.player
+        path = [self.root]
+        self.add_virtual_loss(node)
+
+        winner = board.get_winner()
+        while winner is None:
+            child = None
+            with stripe_locks[node % NUM_STRIPES]:
+                if self.first_child[node] < 0 and not self.allocate_children(node, board.get_possible_moves()): break
+
+                if self.num_expanded[node] < self.child_count[node]:
+                    child = self.first_child[node] + self.num_expanded[node]
+                    self.num_expanded[node] += 1
+
+            expanded = child is not None
+            node = child if expanded else self.best_child(node)
+            self.add_virtual_loss(node)
+            board.push(self.coordinates[self.move[node]], turn)
+            turn = HexBoard.get_opposite_color(turn)
+            path.append(node)
+            if expanded: break
+            winner = board.get_winner()
+
+        reward, amaf_stats = self.simulate(turn)
+        self.backpropagate(path, reward, amaf_stats)
+
+        for _ in range(len(path) - 1): board.pop()
+
+    def backpropagate(self, path, reward, amaf_stats):
+        """Replaces the virtual loss on every node of the path by the real reward, the visits were already counted during selection"""
+        for node, sign in zip(path, self.signs[:len(path)]):
+            with stripe_locks[node % NUM_STRIPES]:
+                self.reward[node] += sign * reward + VIRTUAL_LOSS
+
+        if amaf_stats is not None: self.update_amaf(path, amaf_stats)
+
+
+def run_tree_search(name, capacity, settings, board, color, seed, num_iterations, end_time):
+    """Grows the shared tree in a worker until the root has num_iterations visits or the end time has passed, returns the iterations"""
+    random.seed(seed)
+    np.random.seed(seed)
+    tree = SharedArrayTree(board.copy(), color, capacity=capacity, name=name, **settings) # the tree pushes and pops on its board
+
+    iterations = 0
+    try:
+        while (num_iterations and tree.num_visits < num_iterations) or (not num_iterations and time.time() < end_time):
+            tree.run_iteration()
+            iterations += 1
+    finally:
+        tree.close()
+
+    return iterations
@@ -1,13 +1,37 @@
 import unittest
 import random
 import time
+import math
+import json
+import tempfile
+import os
+from multiprocessing import Pool
+
+import numpy as np
 
 from util.hexboard import HexBoard
+from util.bitboard import BitBoard
 from search.minimax import Minimax
-from search.mcts import MCTS
+from search.transposition_table import TranspositionTable, EXACT, LOWER
+from search.shared_table import SharedTranspositionTable
+from search.mcts import MCTS, MCTSNode
+from search.dag_tree import DAGTree
+from search import selection_rules
+from search.playouts import playouts
+from search.priors import centre_prior, dijkstra_prior
+from search.time_manager import TimeManager
+from search.move_ordering import MoveOrdering, get_shortest_path_cells
+from search.inferior_cells import get_dead_cells, get_captured_cells, get_dominated_cells, get_live_moves
+from search.debug import log_tree
 from evaluate.dijkstra import Dijkstra
 from evaluate.astar import AStar
 
+def search_in_worker(search, board, color):
+    """Runs the search in the calling pool worker, which is daemonic like the game workers of the rating runners, returns the move and the workers used"""
+    move = search.get_next_move(board, color)
+    search.close()
+    return move, search.workers
+
 class TestSearch(unittest.TestCase):
     """All unit tests for search used to determine if the code we wrote is still running as intended"""
 
@@ -34,14 +58,19 @@ class TestSearch(unittest.TestCase):
 
         self.assertEquals(board.get_winner(), None)
 
+        # The debug tree dump goes to output/ of the working directory, so run the search from a temporary one
         mcts = MCTS(10000, None, 0.4, False, rave_k=5000, debug=True)
-        move = mcts.get_next_move(board, HexBoard.RED)
-        new_board = board.make_move(move, HexBoard.RED)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'output'))
+            os.chdir(directory)
+            try: move = mcts.get_next_move(board, HexBoard.RED)
+            finally: os.chdir(cwd)
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'output', 'mcts-debug.txt')))
         self.assertEqual(move, (2, 1))
         
-    def test_minimax_top_left(self):
-        """"Another scenario which tests a specific minimax scenario"""
-        dijkstra = Dijkstra()
+    def get_top_left_board(self):
+        """Returns the 4x4 board of the top left scenarios, red wins at (1, 3) and that is also the only move that keeps blue in the game"""
         board = HexBoard(4)
 
         board.place((1, 0), HexBoard.RED)
@@ -50,25 +79,371 @@ class TestSearch(unittest.TestCase):
         board.place((0, 1), HexBoard.BLUE)
         board.place((0, 2), HexBoard.BLUE)
         board.place((0, 3), HexBoard.BLUE)
+        return board
+
+    def test_minimax_top_left(self):
+        """"Another scenario which tests a specific minimax scenario"""
+        dijkstra = Dijkstra()
+        board = self.get_top_left_board()
 
         minimax = Minimax(3, None, dijkstra, False)
         move = minimax.get_next_move(board, HexBoard.RED)
         self.assertEqual(move, (1, 3))
 
-    def test_mcts_top_left(self):
-        """"Another scenario which tests a specific MCTS scenario"""
+    def test_minimax_win_speed(self):
+        """Checks that minimax plays the quickest win when every move wins within its depth"""
         board = HexBoard(4)
 
         board.place((1, 0), HexBoard.RED)
         board.place((1, 1), HexBoard.RED)
         board.place((1, 2), HexBoard.RED)
+        board.place((3, 0), HexBoard.BLUE)
+        board.place((3, 1), HexBoard.BLUE)
+        board.place((2, 0), HexBoard.BLUE)
+
+        # Red wins at once at (0, 3) or (1, 3), and two moves later after any other move, since blue cannot block both
+        for disable_tt in (False, True):
+            minimax = Minimax(3, None, Dijkstra(), False, disable_tt=disable_tt)
+            self.assertIn(minimax.get_next_move(board, HexBoard.RED), [(0, 3), (1, 3)])
+
+        # The bonus of a decided line grows by one with every deeper iteration, which stays inside the aspiration window
+        minimax = Minimax(None, 0.5, Dijkstra(), False, mode='pvs')
+        self.assertIn(minimax.get_next_move(board, HexBoard.RED), [(0, 3), (1, 3)])
+        self.assertGreaterEqual(minimax.stats['depth'], 3)
+        self.assertEqual(minimax.stats['aspiration_fails'], 0)
+
+    def test_mcts_top_left(self):
+        """Checks that MCTS finds the winning move of red, and the block of blue, with every playout policy, tree backend and tree option"""
+        board = self.get_top_left_board()
+
+        scenarios = [
+            (5000, HexBoard.RED, {}),
+            (2000, HexBoard.BLUE, {}),
+            (5000, HexBoard.RED, { 'rave_k': 250, 'playout': 'fill' }),
+            (300, HexBoard.RED, { 'rave_k': 250, 'playouts_per_leaf': 32 }),
+            (2000, HexBoard.RED, { 'rave_k': 250, 'playout': 'fill', 'tree': 'arrays' }),
+            (2000, HexBoard.BLUE, { 'playout': 'fill', 'tree': 'arrays' }),
+            (2000, HexBoard.BLUE, { 'playout': 'fill', 'tree': 'dag' }),
+            (2000, HexBoard.RED, { 'playout': 'fill', 'max_nodes': 100 }),
+            (5000, HexBoard.RED, { 'solver': True }),
+        ]
+        for num_iterations, color, options in scenarios:
+            with self.subTest(num_iterations=num_iterations, color=color, **options):
+                mcts = MCTS(num_iterations, None, 0.4, False, **options)
+                self.assertEqual(mcts.get_next_move(board, color), (1, 3))
+
+    def test_mcts_turns(self):
+        """Checks that the object tree alternates the colors of its moves"""
+        mcts = MCTS(2000, None, 0.4, False)
+        mcts.get_next_move(self.get_top_left_board(), HexBoard.BLUE)
+
+        for child in mcts.root.children:
+            self.assertEqual(child.board.get_color(child.move), HexBoard.BLUE)
+            for grandchild in child.children:
+                self.assertEqual(grandchild.board.get_color(grandchild.move), HexBoard.RED)
+
+    def test_mcts_array_tree(self):
+        """Checks that the array based tree runs every iteration and leaves the board untouched"""
+        board = self.get_top_left_board()
+
+        mcts = MCTS(2000, None, 0.4, False, rave_k=250, playout='fill', tree='arrays')
+        mcts.get_next_move(board, HexBoard.RED)
+        self.assertEqual(mcts.root.num_visits, 2000)
+        self.assertEqual(mcts.root.board.hash_code(), board.hash_code())
+
+    def test_mcts_tree_reuse(self):
+        """Checks that both tree backends continue from the subtree of the previous search after our move and the reply"""
+        for tree in ('objects', 'arrays'):
+            mcts = MCTS(500, None, 0.4, False, playout='fill', tree=tree)
+            board = HexBoard(4)
+
+            for _ in range(3):
+                board.place(mcts.get_next_move(board, HexBoard.RED), HexBoard.RED)
+                board.place(board.get_empty_cells()[0], HexBoard.BLUE)
+
+            self.assertEqual(mcts.stats['searches'], 3)
+            self.assertEqual(mcts.stats['reuse_hits'], 2)
+            self.assertGreater(mcts.stats['reused_visits'], 0)
+
+            if tree == 'arrays':
+                # Rerooting compacts the kept subtree, every node is still reachable from the root and its visits add up
+                self.assertEqual(len(mcts.root.get_subtree(mcts.root.root)), mcts.root.num_nodes)
+                first = mcts.root.first_child[0]
+                self.assertEqual(mcts.root.visits[first:first + mcts.root.num_expanded[0]].sum(), mcts.root.num_visits - 1)
+
+            # A board that is not below the previous root starts a fresh tree
+            mcts.get_next_move(HexBoard(4), HexBoard.RED)
+            self.assertEqual(mcts.stats['reuse_hits'], 2)
+            self.assertEqual(mcts.root.num_visits, 500)
+
+    def test_mcts_root_parallel(self):
+        """Checks that root-parallel MCTS sums the root statistics of all workers and finds the winning move"""
+        board = self.get_top_left_board()
+
+        mcts = MCTS(500, None, 0.4, False, playout='fill', workers=2, solver=False)
+        try:
+            self.assertEqual(mcts.get_next_move(board, HexBoard.RED), (1, 3))
+            self.assertEqual(sum(visits for visits, _ in mcts.get_root_statistics().values()), 2 * 500)
+
+            pool = mcts.pool
+            mcts.get_next_move(board, HexBoard.RED)
+            self.assertIs(mcts.pool, pool)
+        finally:
+            mcts.close()
+        self.assertIsNone(mcts.pool)
+
+    def test_daemonic_workers(self):
+        """Checks that parallel searches in a daemonic process, like the game workers of the rating runners, fall back to one worker"""
+        searches = [MCTS(2000, None, 0.4, False, playout='fill', workers=2), MCTS(2000, None, 0.4, False, playout='fill', workers=2, parallel='tree'),
+                    Minimax(3, None, Dijkstra(), False, workers=2), Minimax(None, 0.2, Dijkstra(), False, workers=2)]
+        with Pool(1) as pool:
+            for search in searches:
+                with self.subTest(search=str(search)):
+                    self.assertEqual(pool.apply(search_in_worker, (search, self.get_top_left_board(), HexBoard.RED)), ((1, 3), 1))
+
+    def test_mcts_tree_parallel(self):
+        """Checks that tree-parallel MCTS grows one shared tree with all workers and finds the winning move"""
+        board = self.get_top_left_board()
+
+        mcts = MCTS(1000, None, 0.4, False, playout='fill', workers=2, parallel='tree')
+        try:
+            self.assertEqual(mcts.get_next_move(board, HexBoard.RED), (1, 3))
+            self.assertGreaterEqual(mcts.stats['iterations'], 1000)
+            self.assertGreaterEqual(sum(visits for visits, _ in mcts.get_root_statistics().values()), 1000 - 1)
+        finally:
+            mcts.close()
+
+    def test_mcts_dag(self):
+        """Checks that the dag shares transpositions and respects its size cap"""
+        mcts = MCTS(2000, None, 0.4, False, playout='fill', tree='dag')
+        mcts.get_next_move(self.get_top_left_board(), HexBoard.BLUE)
+        self.assertLess(len(mcts.root.table), 2000)
+        with self.assertRaises(AssertionError): MCTS(2000, None, 0.4, False, rave_k=250, tree='dag')
+
+        # Select red (0, 0), blue (1, 1), red (2, 2) and then the other way around, both orders reach one shared node
+        tree = DAGTree(HexBoard(3), HexBoard.RED)
+        selections = iter([(0, 0), (0, 0), (1, 1), (0, 0), (1, 1), (2, 2), (2, 2), (2, 2), (1, 1), (2, 2), (1, 1), (0, 0), (0, 2)])
+        tree.select_child = lambda node: node.moves.index(next(selections))
+        for _ in range(6): tree.run_iteration()
+
+        def follow(moves):
+            """Returns the node reached by following the provided moves from the root"""
+            node = tree.table[tree.root_hash]
+            for move in moves: node = tree.table[node.child_hashes[node.moves.index(move)]]
+            return node
+
+        shared = follow([(0, 0), (1, 1), (2, 2)])
+        self.assertIs(shared, follow([(2, 2), (1, 1), (0, 0)]))
+        self.assertEqual(shared.num_visits, 2) # once through every move order
+        self.assertEqual(follow([(0, 0), (1, 1)]).num_visits, 2)
+        self.assertEqual(follow([(2, 2), (1, 1)]).num_visits, 2)
+        self.assertEqual(tree.num_visits, 6)
+
+        mcts = MCTS(2000, None, 0.4, False, playout='fill', tree='dag', max_nodes=100)
+        mcts.get_next_move(HexBoard(5), HexBoard.RED)
+        self.assertLessEqual(len(mcts.root.table), 100)
+        self.assertGreater(mcts.root.stats['evictions'], 0)
+
+        # A budget below the root fan-out is raised, and the root children survive every eviction
+        mcts = MCTS(2000, None, 0.4, False, playout='fill', tree='dag', max_nodes=10)
+        mcts.get_next_move(HexBoard(5), HexBoard.RED)
+        self.assertEqual(mcts.root.max_nodes, 52)
+        self.assertEqual(len(mcts.root.get_child_statistics()), 25)
+        self.assertGreater(mcts.root.stats['evictions'], 0)
+        self.assertEqual(DAGTree(HexBoard(3), HexBoard.RED).child_with_most_visits(), (0, 0))
+
+    def test_mcts_node_budget(self):
+        """Checks that the node budget keeps the tree small without stopping the search"""
+        mcts = MCTS(2000, None, 0.4, False, playout='fill', max_nodes=100)
+        mcts.get_next_move(HexBoard(5), HexBoard.RED)
+        self.assertEqual(mcts.root.num_visits, 2000)
+        self.assertLessEqual(len(mcts.root.get_subtree()), 100)
+        self.assertEqual(len(mcts.root.get_subtree()), mcts.num_nodes)
+        self.assertGreater(mcts.stats['pruned_nodes'], 0)
+
+    def test_mcts_small_node_budget(self):
+        """Checks that a node budget below the root fan-out is raised, so the tree still grows below the root children"""
+        mcts = MCTS(500, None, 0.4, False, playout='fill', max_nodes=20)
+        mcts.get_next_move(HexBoard(7), HexBoard.RED)
+        self.assertEqual(mcts.node_budget, 100)
+        self.assertLessEqual(len(mcts.root.get_subtree()), 100)
+        self.assertTrue(any(child.children for child in mcts.root.children))
+        self.assertLessEqual(mcts.stats['prunes'], (500 - 100) // 25 + 1) # every prune frees a quarter of the budget
+
+    def test_mcts_prune_keeps_statistics(self):
+        """Checks that a pruned child comes back with its visits and reward when it is expanded again"""
+        mcts = MCTS(300, None, 0.4, False, playout='fill')
+        mcts.get_next_move(HexBoard(3), HexBoard.RED)
+        child = max(mcts.root.children, key=lambda node: node.num_visits)
+        grandchild = max(child.children, key=lambda node: node.num_visits)
+        child.prune(grandchild.num_visits)
+        self.assertEqual(child.children, [])
+
+        while grandchild.move not in [node.move for node in child.children]: child.expand()
+        regrown = next(node for node in child.children if node.move == grandchild.move)
+        self.assertEqual((regrown.num_visits, regrown.reward), (grandchild.num_visits, grandchild.reward))
+
+    def test_mcts_solver(self):
+        """Checks that the solver proves an immediate win and a forced loss, and stops searching once the root is solved"""
+        mcts = MCTS(5000, None, 0.4, False, solver=True)
+        mcts.get_next_move(self.get_top_left_board(), HexBoard.RED)
+        self.assertEqual(mcts.root.proven, -1) # a loss for blue, who moved into the root
+        self.assertLess(mcts.root.num_visits, 5000)
+
+        # Red threatens to win at both (1, 2) and (0, 2), so every blue move loses
+        board = HexBoard(3)
+        board.place((1, 0), HexBoard.RED)
+        board.place((1, 1), HexBoard.RED)
         board.place((0, 1), HexBoard.BLUE)
-        board.place((0, 2), HexBoard.BLUE)
-        board.place((0, 3), HexBoard.BLUE)
 
-        mcts = MCTS(5000, None, 0.4, False)
-        move = mcts.get_next_move(board, HexBoard.RED)
-        self.assertEqual(move, (1, 3))
+        mcts = MCTS(5000, None, 0.4, False, solver=True)
+        mcts.get_next_move(board, HexBoard.BLUE)
+        self.assertEqual(mcts.root.proven, 1)
+        self.assertTrue(all(child.proven == -1 for child in mcts.root.children))
+
+    def test_mcts_solver_reward(self):
+        """Checks that a visit to a proven loss of a move by the root player lowers its reward, while the root is not solved yet"""
+        # Every blue move but (1, 3) lets red win, so iterate until the first of them is proven
+        mcts = MCTS(1, None, 0.4, False, solver=True)
+        mcts.get_next_move(self.get_top_left_board(), HexBoard.BLUE)
+        i = 1
+        while not any(child.proven == -1 for child in mcts.root.children):
+            mcts.run_iteration(i)
+            i += 1
+        self.assertIsNone(mcts.root.proven)
+
+        child = next(child for child in mcts.root.children if child.proven == -1)
+        reward = child.reward
+        mcts.select_and_expand = lambda iteration_idx: child
+        mcts.run_iteration(i)
+        self.assertEqual(child.reward, reward - 1)
+
+    def test_mcts_widening(self):
+        """Checks that the priors put the most promising move last, and that progressive widening caps the children by their visits"""
+        board = HexBoard(5)
+        self.assertEqual(centre_prior(board, board.get_possible_moves(), HexBoard.RED)[-1], (2, 2))
+
+        for y in range(4): board.place((2, y), HexBoard.RED)
+        self.assertEqual(dijkstra_prior(board, board.get_possible_moves(), HexBoard.BLUE)[-1], (2, 4))
+
+        mcts = MCTS(100, None, 0.4, False, solver=False, prior='dijkstra', widening=0.5)
+        mcts.get_next_move(HexBoard(5), HexBoard.RED)
+        self.assertEqual(mcts.root.children[0].move, (2, 2))
+        for node in mcts.root.get_subtree():
+            self.assertLessEqual(len(node.children), math.ceil(2 * node.num_visits ** 0.5))
+        self.assertLess(len(mcts.root.children), 25)
+
+    def test_time_manager(self):
+        """Checks that the game clock is split over the expected moves and reset for a new game, and that a decided search stops early"""
+        board = HexBoard(5)
+        time_manager = TimeManager(total_time=12.0)
+        self.assertAlmostEqual(time_manager.start_move(board), 2.0) # 25 empty hexes, so 6 moves left
+        time_manager.start_time -= 2.0
+        time_manager.end_move()
+        self.assertAlmostEqual(time_manager.remaining_time, 10.0, places=2)
+
+        board.place((2, 2), HexBoard.RED)
+        board.place((1, 1), HexBoard.BLUE)
+        self.assertAlmostEqual(time_manager.start_move(board), 10.0 / 5, places=2)
+        self.assertAlmostEqual(time_manager.start_move(HexBoard(5)), 2.0) # a new game
+
+        time_manager = TimeManager(time_limit=10.0, early_stop=True)
+        time_manager.start_move(board)
+        self.assertFalse(time_manager.should_stop(64, lambda: [40, 24]))
+        self.assertFalse(time_manager.should_stop(65, lambda: [65, 0])) # only checked every 64 iterations
+        time_manager.start_time -= 5.0
+        self.assertTrue(time_manager.should_stop(128, lambda: [128, 0])) # 128 iterations left at the same speed
+        self.assertEqual(time_manager.stats['early_stops'], 1)
+
+        time_manager = TimeManager(time_limit=10.0)
+        time_manager.start_move(board)
+        time_manager.start_time -= 5.0
+        self.assertFalse(time_manager.should_stop(128, lambda: [128, 0])) # early stopping is opt-in
+
+        mcts = MCTS(300, None, 0.4, False, early_stop=True)
+        mcts.get_next_move(board, HexBoard.RED)
+        self.assertEqual(mcts.root.num_visits, 300) # searches by iterations never stop early
+
+    def test_log_tree(self):
+        """Checks that the tree dump writes every node once in both formats, and that the depth and visit filters work"""
+        mcts = MCTS(500, None, 0.4, False)
+        mcts.get_next_move(HexBoard(4), HexBoard.RED)
+        nodes = mcts.root.get_subtree()
+
+        with tempfile.TemporaryDirectory() as directory:
+            fn = os.path.join(directory, 'tree.txt')
+            self.assertEqual(log_tree(mcts.root, fn), len(nodes))
+            with open(fn, encoding='utf8') as tree_file: self.assertEqual(len(tree_file.readlines()), len(nodes))
+
+            fn = os.path.join(directory, 'tree.jsonl')
+            self.assertEqual(log_tree(mcts.root, fn, output_format='jsonl'), len(nodes))
+            with open(fn, encoding='utf8') as tree_file: rows = [json.loads(line) for line in tree_file]
+            self.assertEqual(sum(row['visits'] for row in rows if row['parent'] == 0), mcts.root.num_visits)
+            self.assertTrue(all(rows[row['parent']]['depth'] == row['depth'] - 1 for row in rows[1:]))
+
+            self.assertEqual(log_tree(mcts.root, fn, max_depth=1), len(mcts.root.children) + 1)
+            self.assertEqual(log_tree(mcts.root, fn, min_visits=10), 1 + sum(
+                1 for node in nodes[1:] if all(ancestor.num_visits >= 10 for ancestor in self.get_ancestors(node))))
+
+    def get_ancestors(self, node):
+        """Returns the node and all of its ancestors below the root"""
+        ancestors = []
+        while node.parent is not None:
+            ancestors.append(node)
+            node = node.parent
+        return ancestors
+
+    def test_played_masks(self):
+        """Checks that the playouts record the moves of both colors as disjoint bitmasks of the empty hexes"""
+        board = HexBoard(5)
+        board.place((2, 2), HexBoard.RED)
+        board.place((1, 3), HexBoard.BLUE)
+        empty = sum(1 << (x * 5 + y) for x, y in board.get_empty_cells())
+
+        for playout in playouts.values():
+            played_masks = { HexBoard.BLUE: 0, HexBoard.RED: 0 }
+            playout(board, HexBoard.RED, played_masks)
+            self.assertEqual(played_masks[HexBoard.BLUE] & played_masks[HexBoard.RED], 0)
+            self.assertEqual((played_masks[HexBoard.BLUE] | played_masks[HexBoard.RED]) & ~empty, 0)
+
+        played_masks = { HexBoard.BLUE: 0, HexBoard.RED: 0 }
+        playouts['fill'](board, HexBoard.RED, played_masks)
+        self.assertEqual(played_masks[HexBoard.BLUE] | played_masks[HexBoard.RED], empty)
+        self.assertEqual(bin(played_masks[HexBoard.RED]).count('1'), 12)
+
+    def test_bridge_playout(self):
+        """Checks that the bridge playout always saves an intruded two-bridge, and fills the whole board"""
+        board = HexBoard(3)
+        for coordinates in ((1, 0), (0, 2), (1, 2)): board.place(coordinates, HexBoard.RED)
+        for coordinates in ((0, 0), (2, 0), (2, 1)): board.place(coordinates, HexBoard.BLUE)
+        empty = sum(1 << (x * 3 + y) for x, y in board.get_empty_cells())
+
+        # The two-bridge from (1, 0) to (0, 2) over (0, 1) and (1, 1) connects both red edges, blue only wins by taking both
+
+        for _ in range(50):
+            played_masks = { HexBoard.BLUE: 0, HexBoard.RED: 0 }
+            self.assertEqual(playouts['bridge'](board, HexBoard.BLUE, played_masks), HexBoard.RED)
+            self.assertEqual(played_masks[HexBoard.BLUE] | played_masks[HexBoard.RED], empty)
+            self.assertEqual(bin(played_masks[HexBoard.BLUE]).count('1'), 2)
+
+    def test_vectorized_selection(self):
+        """Checks that the vectorized UCT and RAVE scores match the per child scores"""
+        children = [MCTSNode(HexBoard(3), HexBoard.RED) for _ in range(25)]
+        for child in children:
+            child.num_visits, child.num_amaf_visits = random.randint(1, 100), random.randint(0, 100)
+            child.reward, child.amaf_reward = random.uniform(-1, 1) * child.num_visits, random.uniform(-1, 1) * child.num_amaf_visits
+
+        ln_N = selection_rules.log_n(1000)
+        self.assertAlmostEqual(ln_N, math.log(1000))
+
+        rewards, visits = np.array([c.reward for c in children]), np.array([c.num_visits for c in children])
+        amaf_rewards, amaf_visits = np.array([c.amaf_reward for c in children]), np.array([c.num_amaf_visits for c in children])
+        uct = selection_rules.uct_scores(rewards, visits, 0.4, ln_N)
+        rave = selection_rules.rave_scores(rewards, visits, amaf_rewards, amaf_visits, 500, 0.4, ln_N)
+
+        for i, child in enumerate(children):
+            self.assertAlmostEqual(uct[i], selection_rules.uct_score(child.reward, child.num_visits, 0.4, ln_N))
+            self.assertAlmostEqual(rave[i], selection_rules.rave_score(child, 500, 0.4, ln_N))
 
     def test_tp_table(self):
         """Tests if the transposition table is working as intended"""
@@ -78,10 +453,196 @@ class TestSearch(unittest.TestCase):
 
         board.place((0, 0), HexBoard.RED)
         board.place((0, 1), HexBoard.RED)
-        self.assertEqual(minimax.tp_table, {})
+        self.assertEqual(len(minimax.tp_table), 0)
         
         move = minimax.get_next_move(board, HexBoard.RED)
         self.assertTrue(len(minimax.tp_table) > 0)
+        self.assertGreater(minimax.stats['tt_probes'], 0)
+
+    def test_pvs(self):
+        """Checks that principal variation search finds the same scores as alpha-beta search, and the same moves in the minimax scenarios"""
+        random.seed(1)
+        for _ in range(10):
+            board, color = HexBoard(4), HexBoard.RED
+            for _ in range(random.randrange(6)):
+                board.place(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+
+            alpha_beta = Minimax(3, None, Dijkstra(), False, disable_tt=True)
+            pvs = Minimax(3, None, Dijkstra(), False, disable_tt=True, mode='pvs')
+            _, alpha_beta_score = alpha_beta.alpha_beta_search(board.copy(), 3, color, HexBoard.get_opposite_color(color), -math.inf, math.inf, True)
+            _, pvs_score = pvs.pvs_search(board.copy(), 3, color, color, -math.inf, math.inf)
+            self.assertEqual(alpha_beta_score, pvs_score)
+
+        board = HexBoard(3)
+        board.place((0, 0), HexBoard.RED)
+        board.place((0, 1), HexBoard.RED)
+        board.place((1, 0), HexBoard.BLUE)
+        self.assertEqual(Minimax(3, None, Dijkstra(), False, mode='pvs').get_next_move(board, HexBoard.RED), (0, 2))
+        self.assertEqual(Minimax(None, 0.2, Dijkstra(), False, mode='pvs').get_next_move(board, HexBoard.RED), (0, 2))
+
+    def test_move_ordering(self):
+        """Checks that every move is ordered exactly once, the transposition table move first, then killer moves and history, and that the ordering does not change the scores"""
+        board = HexBoard(3)
+        board.place((0, 0), HexBoard.RED)
+        board.place((1, 1), HexBoard.BLUE)
+
+        move_ordering = MoveOrdering()
+        moves = [move for move, _ in move_ordering.order_moves(board, HexBoard.RED, (2, 2), 2)]
+        self.assertEqual(moves[0], (2, 2))
+        self.assertCountEqual(moves, board.get_possible_moves())
+
+        # The moves after the heuristics are in board order on both engines, whatever order the stones were placed in
+        for board_class in (HexBoard, BitBoard):
+            other_board = board_class(3)
+            for move in ((2, 1), (0, 1), (1, 2)): other_board.place(move, HexBoard.RED)
+            moves = [move for move, _ in MoveOrdering(heuristics=False, shortest_path=False).order_moves(other_board, HexBoard.BLUE, None, 2)]
+            self.assertEqual(moves, sorted(other_board.get_possible_moves()))
+
+        move_ordering.record_cutoff(board, (0, 2), HexBoard.RED, 2)
+        move_ordering.record_cutoff(board, (2, 0), HexBoard.BLUE, 3)
+        move_ordering.record_cutoff(board, (2, 2), HexBoard.BLUE, 1)
+        ordered = move_ordering.order_moves(board, HexBoard.RED, (2, 2), 2)
+        self.assertEqual(ordered[:2], [((2, 2), 'tt'), ((2, 0), 'killer')])
+        self.assertEqual(len(ordered), len(board.get_possible_moves()))
+        self.assertTrue(all(move in get_shortest_path_cells(board) for move, stage in ordered if stage == 'path'))
+
+        # Without killer moves, the history of the player to move decides the order
+        move_ordering.new_search()
+        self.assertEqual(move_ordering.killers, [])
+        self.assertEqual(move_ordering.history[HexBoard.BLUE][(2, 0)], 4)
+        self.assertEqual(move_ordering.order_moves(board, HexBoard.BLUE, None, 1)[0], ((2, 0), 'other'))
+        self.assertEqual(move_ordering.order_moves(board, HexBoard.RED, None, 1)[0], ((0, 2), 'other'))
+
+        random.seed(2)
+        for _ in range(5):
+            board, color = HexBoard(4), HexBoard.RED
+            for _ in range(random.randrange(6)):
+                board.place(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+
+            scores = set()
+            for ordering in ('none', 'history', 'path'):
+                minimax = Minimax(3, None, Dijkstra(), False, ordering=ordering)
+                scores.add(minimax.alpha_beta_search(board.copy(), 3, color, HexBoard.get_opposite_color(color), -math.inf, math.inf, True)[1])
+                self.assertEqual(sum(minimax.stats[stage + '_cutoffs'] for stage in ('tt', 'killer', 'path', 'other')), minimax.stats['cutoffs'])
+            self.assertEqual(len(scores), 1)
+
+    def test_lazy_smp(self):
+        """Checks that the shared transposition table is seen by every attached table and rejects torn entries, and that Lazy SMP finds the winning move"""
+        tp_table = SharedTranspositionTable(8)
+        other_table = SharedTranspositionTable(8, name=tp_table.name)
+        try:
+            tp_table.store((1 << 63) + 2, 3, 4, -1.5, LOWER)
+            self.assertEqual(other_table.probe((1 << 63) + 2), (3, 4, -1.5, LOWER))
+
+            other_table.score[other_table.get_slot((1 << 63) + 2)[0]] = 2.5 # as if another worker was halfway through overwriting it
+            self.assertIsNone(tp_table.probe((1 << 63) + 2))
+        finally:
+            other_table.close()
+            tp_table.close()
+
+        board = HexBoard(3)
+        board.place((0, 0), HexBoard.RED)
+        board.place((0, 1), HexBoard.RED)
+        board.place((1, 0), HexBoard.BLUE)
+
+        for depth, time_limit in ((3, None), (None, 0.5)):
+            minimax = Minimax(depth, time_limit, Dijkstra(), False, workers=2)
+            try:
+                self.assertEqual(minimax.get_next_move(board, HexBoard.RED), (0, 2))
+                self.assertGreater(minimax.stats['depth'], 0)
+                self.assertGreater(minimax.stats['nodes_searched'], 0)
+                self.assertGreater(len(minimax.tp_table), 0)
+            finally:
+                minimax.close()
+            self.assertIsNone(minimax.pool)
+            self.assertIsNone(minimax.tp_table)
+
+    def test_dead_cells(self):
+        """Checks that hexes enclosed by one color or by both edges are dead, that open hexes are not, and that both searches skip the dead hexes"""
+        self.assertEqual(get_dead_cells(HexBoard(4)), set())
+
+        board = HexBoard(4)
+        for coordinates in ((2, 1), (2, 0), (1, 0), (0, 1)): board.place(coordinates, HexBoard.BLUE)
+        board.place((2, 2), HexBoard.RED)
+        board.place((1, 3), HexBoard.RED)
+        self.assertIn((1, 1), get_dead_cells(board))
+        self.assertNotIn((1, 2), get_dead_cells(board))
+        self.assertEqual(len(get_live_moves(board)), 1) # blue captures (3, 0) and wins, so any move will do
+
+        # (0, 0) only touches blue stones, the blue edge and the red edge
+        self.assertIn((0, 0), get_dead_cells(board))
+
+        random.seed(3)
+        for _ in range(20):
+            board, color = HexBoard(4), HexBoard.RED
+            for _ in range(random.randrange(10)):
+                board.place(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+            if board.get_winner() is not None: continue
+
+            dead_cells = get_dead_cells(board)
+            if len(dead_cells) == len(board.get_empty_cells()): continue
+            self.assertNotIn(Minimax(2, None, Dijkstra(), False, prune_dead=True).get_next_move(board, color), dead_cells)
+
+            mcts = MCTS(50, None, 0.4, False, prune_dead=True, solver=False)
+            mcts.get_next_move(board, color)
+            self.assertFalse(dead_cells & set(mcts.get_root_statistics()))
+
+    def test_inferior_cells(self):
+        """Checks the captured and dominated hex patterns, and that leaving out the inferior hexes never changes who wins a small board"""
+        # Blue answers a red stone on (3, 1) or (3, 2) with the other one, next to the blue edge
+        board = HexBoard(4)
+        for coordinates, color in (((2, 0), HexBoard.BLUE), ((3, 0), HexBoard.BLUE), ((2, 3), HexBoard.RED), ((3, 3), HexBoard.RED)): board.place(coordinates, color)
+        self.assertEqual(get_dead_cells(board), set())
+        self.assertEqual(get_captured_cells(board), { (3, 1): HexBoard.BLUE, (3, 2): HexBoard.BLUE })
+        self.assertFalse({ (3, 1), (3, 2) } & set(get_live_moves(board)))
+
+        # A red stone on (2, 0) kills (1, 0), which would then only touch red stones, the red edge and two neighboring empty hexes
+        board = HexBoard(4)
+        board.place((0, 0), HexBoard.RED)
+        board.place((3, 3), HexBoard.BLUE)
+        self.assertEqual(get_captured_cells(board), {})
+        self.assertIn((1, 0), get_dominated_cells(board, HexBoard.RED))
+        self.assertNotIn((1, 0), get_live_moves(board, HexBoard.RED))
+        self.assertIn((1, 0), get_live_moves(board))
+
+        def wins(board, color, moves=None):
+            """Returns whether the provided color to move wins with perfect play, trying only the provided moves at the top"""
+            winner = board.get_winner()
+            if winner is not None: return winner == color
+
+            opposite_color = HexBoard.get_opposite_color(color)
+            return any(not wins(board.make_move(move, color), opposite_color) for move in (moves or board.get_possible_moves()))
+
+        random.seed(5)
+        for _ in range(100):
+            board, color = HexBoard(3), HexBoard.RED
+            for _ in range(random.randrange(7)):
+                board.place(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+            if board.get_winner() is not None: continue
+            self.assertEqual(wins(board, color, get_live_moves(board, color)), wins(board, color))
+
+    def test_bounded_tp_table(self):
+        """Checks that the fixed-size transposition table keeps the deepest entry of a bucket, and replaces entries of older searches"""
+        tp_table = TranspositionTable(4)
+        hash_code, other_hash_code = (1 << 63) + 2, 6 # both in bucket 0 of 2
+
+        tp_table.store(hash_code, 5, 3, 1.5, EXACT)
+        self.assertEqual(tp_table.probe(hash_code), (5, 3, 1.5, EXACT))
+        self.assertIsNone(tp_table.probe(other_hash_code))
+
+        tp_table.store(other_hash_code, 2, -1, -0.5, LOWER) # shallower, so it goes to the always-replace slot
+        self.assertEqual(tp_table.probe(hash_code)[0], 5)
+        self.assertEqual(tp_table.probe(other_hash_code), (2, -1, -0.5, LOWER))
+        self.assertEqual(len(tp_table), 2)
+
+        tp_table.new_search()
+        tp_table.store(other_hash_code + 4, 1, 0, 0.0, EXACT) # the deep entry is stale now
+        self.assertIsNone(tp_table.probe(hash_code))
+        self.assertEqual(len(tp_table), 2)
     
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,76 @@
+import time
+
+CHECK_INTERVAL = 64
+MIN_MOVES_LEFT = 4
+
+class TimeManager:
+    """
+    Decides when a search should stop. A search either runs a fixed amount of iterations, a fixed time per move, or a share of
+    the remaining game clock (total_time). The clock is reset when a board with fewer stones than the previous one comes in,
+    since that means a new game has started. The time is only checked every check_interval iterations. With early_stop a timed
+    search also stops once the second most visited root child can no longer catch up with the most visited one in the time left.
+    Searches by iterations always run all of them, so they stay comparable.
+    """
+
+    def __init__(self, num_iterations=None, time_limit=None, total_time=None, check_interval=CHECK_INTERVAL, early_stop=False):
+        """Creates a time manager with the provided limits, total_time is the clock for a whole game in seconds"""
+        self.num_iterations = num_iterations
+        self.time_limit = time_limit
+        self.total_time = total_time
+        self.check_interval = check_interval
+        self.early_stop = early_stop
+
+        self.remaining_time = total_time
+        self.num_stones = None
+        self.start_time = None
+        self.budget = None
+        self.stats = { 'moves': 0, 'time_checks': 0, 'early_stops': 0 }
+
+    def start_move(self, board):
+        """Starts the clock for a search on the provided board, returns its time budget in seconds, or None if it runs by iterations"""
+        num_stones = board.size ** 2 - len(board.get_empty_cells())
+        if self.num_stones is None or num_stones < self.num_stones: self.remaining_time = self.total_time
+        self.num_stones = num_stones
+
+        self.start_time = time.time()
+        self.budget = self.get_move_budget(board)
+        self.stats['moves'] += 1
+        return self.budget
+
+    def get_move_budget(self, board):
+        """
+        Returns the time budget for a move on the provided board. With a game clock the remaining time is split over the moves
+        we still expect to make, about a quarter of the empty hexes since most games end long before the board is full.
+        """
+        if self.total_time is None: return self.time_limit
+
+        moves_left = max(len(board.get_empty_cells()) // 4, MIN_MOVES_LEFT)
+        budget = self.remaining_time / moves_left
+        return budget if self.time_limit is None else min(budget, self.time_limit)
+
+    def should_stop(self, iteration, get_root_visits):
+        """
+        Returns whether the search should stop after the provided amount of iterations. The time and the visits of the root children,
+        returned by get_root_visits, are only checked every check_interval iterations.
+        """
+        if self.num_iterations: return iteration >= self.num_iterations
+        if iteration == 0 or iteration % self.check_interval: return False
+
+        self.stats['time_checks'] += 1
+        elapsed_time = time.time() - self.start_time
+        if self.budget is not None and elapsed_time >= self.budget: return True
+        if not self.early_stop: return False
+
+        # Assume the search keeps running at the same speed for the rest of its budget
+        iterations_left = iteration / elapsed_time * (self.budget - elapsed_time) if elapsed_time > 0 else float('inf')
+        visits = sorted(get_root_visits(), reverse=True) + [0, 0]
+        if visits[0] - visits[1] > iterations_left:
+            self.stats['early_stops'] += 1
+            return True
+        return False
+
+    def end_move(self):
+        """Stops the clock, subtracts the time of the search from the game clock and returns it"""
+        elapsed_time = time.time() - self.start_time
+        if self.remaining_time is not None: self.remaining_time = max(self.remaining_time - elapsed_time, 0.0)
+        return elapsed_time
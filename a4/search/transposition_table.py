@@ -0,0 +1,73 @@
+import numpy as np
+
+# The score of an entry is either exact, or a bound because the search of the position was cut off
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table, every field of every entry lives in a preallocated NumPy array, so memory stays flat however long it is used.
+    Entries are grouped in buckets of two, indexed by the low bits of the hash. The first slot of a bucket keeps the deepest search
+    (depth-preferred), unless it was stored during an older search (age stamp), the second slot is always replaced.
+    Moves are stored as hex indices (x * size + y), -1 if there is none.
+    """
+
+    # (name, dtype, initial value) of every per entry array, ordered by item size like ArrayTree.FIELDS
+    FIELDS = (
+        ('key', np.int64, 0), ('score', np.float64, 0),
+        ('move', np.int16, -1), ('depth', np.int16, -1), ('flag', np.int8, EXACT), ('age', np.uint8, 0)
+    )
+
+    def __init__(self, size=1 << 18):
+        """Creates an empty table with the provided amount of entries, rounded down to a power of two"""
+        self.num_buckets = max(size // 2, 1)
+        while self.num_buckets & (self.num_buckets - 1): self.num_buckets &= self.num_buckets - 1
+        self.create_arrays(2 * self.num_buckets)
+        self.current_age = 0
+
+    def create_arrays(self, capacity):
+        """Allocates all per entry arrays with the provided capacity"""
+        for name, dtype, fill in TranspositionTable.FIELDS:
+            setattr(self, name, np.full(capacity, fill, dtype=dtype))
+
+    def __len__(self):
+        """Returns the amount of entries in use"""
+        return int(np.count_nonzero(self.depth >= 0))
+
+    def get_bytes_per_entry(self):
+        """Returns the amount of bytes every entry takes up in the arrays"""
+        return sum(getattr(self, name).itemsize for name, _, _ in TranspositionTable.FIELDS)
+
+    def new_search(self):
+        """Starts a new search, entries of older searches are replaced first"""
+        self.current_age = (self.current_age + 1) & 0xFF
+
+    def get_slot(self, hash_code):
+        """Returns the first slot of the bucket of the provided hash, and the hash as a signed 64 bit key"""
+        key = hash_code - (1 << 64) if hash_code >= 1 << 63 else hash_code
+        return 2 * (hash_code & (self.num_buckets - 1)), key
+
+    def probe(self, hash_code):
+        """Returns the depth, the move index, the score and the flag of the entry of the provided hash, or None if it is not stored"""
+        slot, key = self.get_slot(hash_code)
+        for slot in (slot, slot + 1):
+            if self.depth[slot] >= 0 and int(self.key[slot]) == key:
+                return int(self.depth[slot]), int(self.move[slot]), float(self.score[slot]), int(self.flag[slot])
+        return None
+
+    def store(self, hash_code, depth, move, score, flag):
+        """Stores a search result in the depth-preferred slot if it is at least as deep, stale or the same position, otherwise in the other slot"""
+        slot, key = self.get_slot(hash_code)
+        if self.depth[slot] > depth and self.age[slot] == self.current_age and int(self.key[slot]) != key: slot += 1
+
+        self.key[slot] = key
+        self.depth[slot] = depth
+        self.move[slot] = move
+        self.score[slot] = score
+        self.flag[slot] = flag
+        self.age[slot] = self.current_age
+
+    def clear(self):
+        """Removes all entries"""
+        for name, _, fill in TranspositionTable.FIELDS:
+            getattr(self, name).fill(fill)
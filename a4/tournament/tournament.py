@@ -102,7 +102,13 @@ def run_matchup(matchup_input):
     r1_color, r2_color = HexBoard.RED, HexBoard.BLUE
     r1_first = bool(random.getrandbits(1))
     
-    winner, r1_first = simulate_single_game_winner(board_size, m1, m2, r1_first, r1_color, r2_color)
+    # The games run in daemonic pool workers, where a parallel search falls back to one worker (see HexSearchMethod.use_workers), so there
+    # is no worker pool to keep alive between games. On Windows the games run on threads instead, and a parallel search starts its pool per game
+    try:
+        winner, r1_first = simulate_single_game_winner(board_size, m1, m2, r1_first, r1_color, r2_color)
+    finally:
+        m1.close()
+        m2.close()
 
     if winner == HexBoard.EMPTY:
         return (-1, player['id'], opponent['id'])
@@ -0,0 +1,253 @@
+import random
+from collections.abc import Mapping
+from functools import lru_cache
+
+import numpy as np
+
+from util.hexboard import HexBoard
+
+
+class BitBoardView(Mapping):
+    """Read-only dict-like view on a BitBoard, so code that reads board.board[x, y] keeps working"""
+
+    def __init__(self, bitboard):
+        """Wraps the provided bitboard"""
+        self.bitboard = bitboard
+
+    def __getitem__(self, coordinates):
+        """Returns the color at the provided coordinate"""
+        return self.bitboard.get_color(coordinates)
+
+    def __iter__(self):
+        """Iterates over all coordinates in the same order as the dict based board"""
+        return iter(BitBoard.get_coordinates(self.bitboard.size))
+
+    def __len__(self):
+        """Returns the amount of hexes on the board"""
+        return self.bitboard.size ** 2
+
+
+class BitBoard(HexBoard):
+    """
+    Drop-in replacement for HexBoard that stores both colors as integer bitmasks.
+    Bit x * size + y is set in the mask of a color if that color occupies hex (x, y).
+    This makes copies a matter of copying two integers and win checks a handful of shifts.
+    Unlike HexBoard it keeps no list of empty hexes, which would make every copy O(size ** 2): the empty hexes are found
+    by a scan of the masks, so get_empty_cells() and get_random_empty_cell() take O(size ** 2) and return hexes in board order.
+    """
+
+    def __init__(self, board_size, source_coords=None, target_coords=None, moves_made=None, overwrite = False):
+        """Creates a new empty board with the provided size"""
+        self.size = board_size
+        self.moves_made = 0 if moves_made is None else moves_made
+        self.blue = 0
+        self.red = 0
+        self.zobrist = 0
+        self.move_stack = []
+
+        self.target_coords = HexBoard.get_target_coordinates(board_size) if target_coords is None else target_coords
+        self.source_coords = HexBoard.get_source_coordinates(board_size) if source_coords is None else source_coords
+
+    @property
+    def board(self):
+        """Dict-like view of the board, only meant for compatibility with code written for HexBoard"""
+        return BitBoardView(self)
+
+    def as_np(self):
+        """Returns the board as a (size, size) numpy array of colors"""
+        blue = BitBoard.unpack_mask(self.blue, self.size)
+        red = BitBoard.unpack_mask(self.red, self.size)
+
+        arr = np.full(self.size ** 2, HexBoard.EMPTY, dtype=np.float64)
+        arr[blue == 1] = HexBoard.BLUE
+        arr[red == 1] = HexBoard.RED
+        return arr.reshape((self.size, self.size))
+
+    def from_np(self, board_np, size, moves_made):
+        """Creates a new bitboard from a (size, size) numpy array of colors"""
+        bitboard = BitBoard(size)
+        for i, color in enumerate(np.asarray(board_np).flatten()):
+            if color == HexBoard.BLUE:
+                bitboard.blue |= 1 << i
+            elif color == HexBoard.RED:
+                bitboard.red |= 1 << i
+        bitboard.moves_made = moves_made
+        bitboard.zobrist = bitboard.compute_zobrist()
+
+        return bitboard
+
+    def is_empty(self, coordinates):
+        """Returns if the board is empty at the provided coordinate"""
+        bit = 1 << (coordinates[0] * self.size + coordinates[1])
+        return not (self.blue | self.red) & bit
+
+    def is_color(self, coordinates, color):
+        """Returns if the board is a certain color at the provided coordinate"""
+        return self.get_color(coordinates) == color
+
+    def switch_colors(self):
+        """Returns a copy of the board where blue and red are swapped"""
+        new_board = self.copy()
+        new_board.blue, new_board.red = self.red, self.blue
+        new_board.zobrist = new_board.compute_zobrist()
+        return new_board
+
+    def get_color(self, coordinates):
+        """Returns the color at the provided board coordinate"""
+        bit = 1 << (coordinates[0] * self.size + coordinates[1])
+        if self.blue & bit: return HexBoard.BLUE
+        elif self.red & bit: return HexBoard.RED
+        return HexBoard.EMPTY
+
+    def place(self, coordinates, color):
+        """Places the provided color at the provided coord"""
+        index = coordinates[0] * self.size + coordinates[1]
+        bit = 1 << index
+        previous_color = self.get_color(coordinates)
+        if previous_color == color: return
+        if previous_color == HexBoard.EMPTY:
+            self.moves_made += 1
+
+        zobrist_keys = HexBoard.get_zobrist_keys(self.size)
+        self.zobrist ^= zobrist_keys[previous_color][index] ^ zobrist_keys[color][index]
+
+        self.blue &= ~bit
+        self.red &= ~bit
+        if color == HexBoard.BLUE:
+            self.blue |= bit
+        elif color == HexBoard.RED:
+            self.red |= bit
+
+    def push(self, coordinates, color):
+        """Places a stone on an empty hex in a way that can be undone exactly with pop()"""
+        self.move_stack.append(coordinates)
+        self.place(coordinates, color)
+
+    def pop(self):
+        """Undoes the last push(), returns the move"""
+        coordinates = self.move_stack.pop()
+        self.place(coordinates, HexBoard.EMPTY)
+        self.moves_made -= 1
+        return coordinates
+
+    def copy(self):
+        """Returns an exact copy of itself, which only requires copying a few integers"""
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.size = self.size
+        new_board.moves_made = self.moves_made
+        new_board.blue = self.blue
+        new_board.red = self.red
+        new_board.zobrist = self.zobrist
+        new_board.move_stack = []
+        new_board.target_coords = self.target_coords
+        new_board.source_coords = self.source_coords
+        return new_board
+
+    def check_win(self, color):
+        """Check if we have made a snake from the source side to the opposing side for the provided color"""
+        return BitBoard.connects(self.get_stone_mask(color), color, self.size)
+
+    def get_stone_mask(self, color):
+        """Returns the bitmask of all stones of the provided color"""
+        return self.blue if color == HexBoard.BLUE else self.red
+
+    def get_possible_moves(self):
+        """Compiles a list of all empty hexes in the current hexboard"""
+        if self.get_winner() is not None: return []
+        return self.get_empty_cells()
+
+    def get_empty_cells(self):
+        """Returns a new list of all empty hexes in board order, regardless of whether the game has ended"""
+        coordinates = BitBoard.get_coordinates(self.size)
+        empty = BitBoard.get_full_mask(self.size) & ~(self.blue | self.red)
+        cells = []
+        while empty:
+            lowest = empty & -empty
+            cells.append(coordinates[lowest.bit_length() - 1])
+            empty ^= lowest
+        return cells
+
+    def get_random_empty_cell(self):
+        """Returns a random empty hex, in O(size ** 2) since the empty hexes are not kept in a list"""
+        return random.choice(self.get_empty_cells())
+
+    def get_move_between_boards(self, other_board):
+        """Tries to find the move that is made between the two provided boards."""
+        if self.size is not other_board.size:
+            print('Trying to get the move between two boards of different sizes.')
+            return (None, None)
+
+        if isinstance(other_board, BitBoard):
+            difference = (self.blue ^ other_board.blue) | (self.red ^ other_board.red)
+            if not difference: return (None, None)
+            return BitBoard.get_coordinates(self.size)[(difference & -difference).bit_length() - 1]
+
+        return HexBoard.get_move_between_boards(self, other_board)
+
+    @classmethod
+    def connects(cls, stones, color, size):
+        """Flood fills the provided stone mask from the source edge, and returns if it reaches the target edge of the color"""
+        source, target = BitBoard.get_edge_masks(color, size)
+
+        reached = stones & source
+        while reached:
+            if reached & target: return True
+
+            grown = BitBoard.grow(reached, size) & stones
+            if grown == reached: return False
+            reached = grown
+
+        return False
+
+    @classmethod
+    def grow(cls, mask, size):
+        """Returns the provided mask extended with all of its hex neighbors"""
+        full = BitBoard.get_full_mask(size)
+        not_first_col, not_last_col = BitBoard.get_column_masks(size)
+        return (
+            mask
+            | (mask << size) & full                       # (1, 0)
+            | mask >> size                                # (-1, 0)
+            | (mask & not_last_col) << 1                  # (0, 1)
+            | (mask & not_first_col) >> 1                 # (0, -1)
+            | (mask & not_last_col) >> (size - 1)         # (-1, 1)
+            | ((mask & not_first_col) << (size - 1)) & full # (1, -1)
+        )
+
+    @classmethod
+    def unpack_mask(cls, mask, size):
+        """Returns the provided mask as a flat uint8 array with a 1 at the index of every set bit"""
+        num_cells = size ** 2
+        num_bytes = (num_cells + 7) // 8
+        return np.unpackbits(np.frombuffer(mask.to_bytes(num_bytes, 'little'), dtype=np.uint8), bitorder='little')[:num_cells]
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_full_mask(cls, size):
+        """Returns a mask with a bit set for every hex on the board"""
+        return (1 << (size ** 2)) - 1
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_column_masks(cls, size):
+        """Returns the masks of all hexes with y != 0 and with y != size - 1, used to prevent shifts from wrapping around"""
+        not_first_col, not_last_col = 0, 0
+        for x in range(size):
+            for y in range(size):
+                if y != 0: not_first_col |= 1 << (x * size + y)
+                if y != size - 1: not_last_col |= 1 << (x * size + y)
+        return not_first_col, not_last_col
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_edge_masks(cls, color, size):
+        """Returns the (source, target) edge masks for the provided color"""
+        source = sum(1 << (x * size + y) for x, y in HexBoard.get_source_coordinates_for_color(color, size))
+        target = sum(1 << (x * size + y) for x, y in HexBoard.get_target_coordinates_for_color(color, size))
+        return source, target
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_coordinates(cls, size):
+        """Returns a tuple that maps every bit index to its (x, y) coordinate"""
+        return tuple((x, y) for x in range(size) for y in range(size))
@@ -29,9 +29,9 @@ class HexGame:
             eval_class = RandomEval()
 
         if args.search == 'minimax':
-            self.search = Minimax(args.depth, args.time_limit, eval_class, disable_tt=args.disable_tt)
+            self.search = Minimax(args.depth, args.time_limit, eval_class, disable_tt=args.disable_tt, mode=args.mode, ordering=args.ordering, workers=args.workers, prune_dead=args.prune_dead)
         elif args.search == 'mcts':
-            self.search = MCTS(args.num_iterations, args.time_limit, args.cp, True, args.rave_k)
+            self.search = MCTS(args.num_iterations, args.time_limit, args.cp, True, args.rave_k, playout=args.playout, playouts_per_leaf=args.playouts_per_leaf, tree=args.tree, reuse_tree=args.reuse_tree, workers=args.workers, parallel=args.parallel, max_nodes=args.max_nodes, solver=args.solver, prior=args.prior, widening=args.widening, total_time=args.total_time, early_stop=args.early_stop, prune_dead=args.prune_dead)
 
     def run_interactively(self, board):
         """Runs the game interactively, this starts a while loop that will only stop once the game is won or a draw is detected"""
@@ -58,6 +58,7 @@ class HexGame:
             board = board.make_move((char_to_row_idx[x], int(y)), HexBoard.BLUE)
             winner = board.get_winner()
 
+        self.search.close()
         if winner == HexBoard.RED:
             print('The AI won.')
         else:
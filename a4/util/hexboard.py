@@ -1,314 +1,494 @@
-import math
-from copy import deepcopy
-from functools import lru_cache
-
-import numpy as np
-
-
-class HexBoard:
-    """This class holds all the data for a single board state"""
-
-    BLUE = 1
-    RED = 2
-    EMPTY = 3
-    PLAYER_ID_TO_NAME = { 1: 'blue', 2: 'red', 3: 'empty' }
-    POSSIBLE_NEIGHBORS = ((-1, 0), (1, 0), (-1, 1), (1, -1), (0, 1), (0, -1))
-
-    def __init__(self, board_size, source_coords=None, target_coords=None, moves_made=None, overwrite = False):
-        """Creates a new empty board with the provided size"""
-        self.board = {}
-        self.size = board_size
-        self.useful_to_check_win = False
-        self.moves_made = 0 if moves_made is None else moves_made
-
-        self.target_coords = HexBoard.get_target_coordinates(board_size) if target_coords is None else target_coords
-        self.source_coords = HexBoard.get_source_coordinates(board_size) if source_coords is None else source_coords
-        
-        self.board = {k:v for k, v in HexBoard.get_empty_board(board_size).items()} if not overwrite else None
-    
-    def as_np(self):
-        arr = []
-        for x in range(self.size):
-            arr.append([])
-            for y in range(self.size):
-                arr[x].append(self.board[(x, y)])
-        
-        return np.array(arr).astype(np.float64)
-    
-    def from_np(self, board_np, size, moves_made):
-        board = {}
-        for x in range(len(board_np)):
-            for y in range(len(board_np[x])):
-                board[(x, y)] = board_np[x][y]
-        
-        hexboard = HexBoard(size)
-        hexboard.board = board
-        hexboard.moves_made = moves_made
-
-        return hexboard
-        
-    def is_empty(self, coordinates):
-        """Returns if the board is empty at the provided coordinate"""
-        return self.board[coordinates] == HexBoard.EMPTY
-
-    def is_color(self, coordinates, color):
-        """Returns if the board is a certain color at the provided coordinate"""
-        return self.board[coordinates] == color
-
-    def get_mirrored_board(self):
-        board = self.switch_colors()
-        new_board_np = np.fliplr(np.rot90(board.as_np(), axes=(1, 0)))
-        return self.from_np(new_board_np, board.size, board.moves_made)
-
-    def get_unmirrored_board(self):
-        board = self.switch_colors()
-        new_board_np = np.rot90(np.fliplr(board.as_np(), axes=(0, 1)))
-        return self.from_np(new_board_np, board.size, board.moves_made)
-
-    def switch_colors(self):
-        new_board = self.copy()
-        for x in range(self.size):
-            for y in range(self.size):
-                if new_board.board[(x, y)] != HexBoard.EMPTY:
-                    new_board.board[(x, y)] = self.get_opposite_color(new_board.board[(x, y)])
-
-        return new_board
-
-    def get_color(self, coordinates):
-        """Returns the color at the provided board coordinate"""
-        return self.board[coordinates]
-
-    def place(self, coordinates, color):
-        """Places the provided color at the provided coord"""
-        if self.board[coordinates] == HexBoard.EMPTY:
-            self.moves_made += 1
-        self.board[coordinates] = color
-
-    def make_move(self, coordinates, color):
-        """Should return the new board without modifying the existing board"""
-        new_board = self.copy()
-        new_board.place(coordinates, color)
-        return new_board
-    
-    def copy(self):
-        """Returns an exact deep copy of itself"""
-        new_board = HexBoard(self.size, target_coords=self.target_coords, source_coords=self.source_coords, overwrite = True)
-        new_board.moves_made = self.moves_made
-        new_board.board = {k:v for k,v in self.board.items()}
-        return new_board
-
-    @classmethod
-    @lru_cache(maxsize=512) # caching this to create lower lookup times, technically can't have more than board.size ** 2 options
-    def get_neighbors(cls, coordinates, size):
-        """Returns a list with the coordinates of every possible/valid neighbor."""
-        (cx, cy) = coordinates
-        neighbors = [(x + cx, y + cy) for x, y in HexBoard.POSSIBLE_NEIGHBORS if HexBoard.in_bounds(cx + x, cy + y, size)]
-        return neighbors
-
-    def traverse(self, color, move, visited):
-        """
-        Returns true if we can reach the end of the board using this move.
-        Returns false if the next move is already visited or the wrong color.
-        If we did not reach the end we recursively check each of the neighbors,
-        and if we reach the otherside that way we return true as well.
-        """
-        # if we have reached the border (target) for a specific color
-        if HexBoard.is_at_border(color, move, self.size):
-            return True
-
-        visited[move] = True
-        for n in HexBoard.get_neighbors(move, self.size):
-            if self.board[n] != color or n in visited: continue
-            if self.traverse(color, n, visited):
-                return True
-		
-        return False
-
-    def get_winner(self):
-        """Check if the game has ended, and returns the winner. If None is returned the game is ongoing"""
-        if self.moves_made < self.size: return None
-        elif self.check_win(HexBoard.RED): return HexBoard.RED
-        elif self.check_win(HexBoard.BLUE): return HexBoard.BLUE
-        elif self.check_draw(): return HexBoard.EMPTY
-        return None
-
-    def check_win(self, color):
-        """Check if we have made a snake from the source side to the opposing side for the provided color"""
-        if not self.useful_to_check_win:
-            for move in self.target_coords[color]:
-                if self.board[move] == color:
-                    self.useful_to_check_win = True
-                    break
-        if not self.useful_to_check_win: return False
-
-        for move in self.source_coords[color]:
-            if self.board[move] != color: continue
-            if self.traverse(color, move, {}):
-                return True        
-        return False
-
-    def check_draw(self):
-        """Checks if we have any empty hexes left on the board"""
-        return self.moves_made >= self.size ** 2
-
-    def get_possible_moves(self):
-        """Compiles a list of all empty hexes in the current hexboard"""
-        if self.get_winner() is not None: return []
-        return [coord for coord, color in self.board.items() if color == HexBoard.EMPTY]
-
-    def print(self):
-        """Outputs the board pieces to the console"""
-        print("   ", end="")
-
-        for y in range(self.size):
-            print(chr(y + ord('a')), "", end="")
-        print("")
-        print(" -----------------------")
-
-        for y in range(self.size):
-            print(y, "|", end="")
-			
-            for z in range(y):
-                print(" ", end="")
-
-            for x in range(self.size):
-                piece = self.board[x, y]
-                if piece == HexBoard.BLUE:
-                    print("\u001b[36m\u25CF\u001b[0m ", end="")
-                elif piece == HexBoard.RED:
-                    print("\u001b[31m\u25CF\u001b[0m ", end="")
-                else:
-                    if x == self.size:
-                        print("-", end="")
-                    else:
-                        print("- ", end="")
-            print("|")
-
-        print("   -----------------------")
-
-    def __str__(self):
-        """Outputs the board pieces to the console"""
-        output = "["
-
-        for y in range(self.size):
-            output += ""
-			
-            for x in range(self.size):
-                piece = self.board[x, y]
-                if piece == HexBoard.BLUE:
-                    output += "b"
-                elif piece == HexBoard.RED:
-                    output += "r"
-                else:
-                    output += "."
-            
-            if y is not self.size - 1: output += " "
-
-        output += "]"
-        return output
-
-    def hash_code(self, color=3):
-        """Generates a hash code that mirrors the current board state as seen by the provided player"""
-        multiplier = 10
-        code = color
-        for _, value in self.board.items():
-            code += value * multiplier
-            multiplier *= 10
-        return code
-    
-    @classmethod
-    @lru_cache(maxsize=16)
-    def get_reward(cls, color, winner):
-        """Returns the reward for the specified color, -1 if it loses, 1 if it wins, 0 on a draw"""
-        if color == winner:
-            return 1
-        elif winner == HexBoard.EMPTY:
-            return 0
-        else:
-            return -1
-
-    @classmethod
-    @lru_cache(maxsize=512)
-    def is_at_border(cls, color, move, size):
-        """Checks if the provided coordinate is at the border for the provided color""" 
-        return (color == HexBoard.BLUE and move[0] == size-1) or (color == HexBoard.RED and move[1] == size-1)
-
-    @classmethod          
-    @lru_cache(maxsize=32)
-    def get_target_coordinates_for_color(cls, color, size):
-        """Returns the coordinates of the right border (for blue) or the left border (for red)"""
-        if color == HexBoard.BLUE:
-            return [(size - 1, i) for i in range(size)]
-        else:
-            return [(i, size - 1) for i in range(size)] 
-
-    @classmethod          
-    @lru_cache(maxsize=32)
-    def get_target_coordinates(cls, size):
-        """Returns the target coordinates for both of the colors"""
-        return {HexBoard.BLUE: HexBoard.get_target_coordinates_for_color(HexBoard.BLUE, size), HexBoard.RED: HexBoard.get_target_coordinates_for_color(HexBoard.RED, size)}
-
-    @classmethod          
-    @lru_cache(maxsize=32)
-    def get_source_coordinates(cls, size):
-        """Returns the source coordinates for both of the colors"""
-        return {HexBoard.BLUE: HexBoard.get_source_coordinates_for_color(HexBoard.BLUE, size), HexBoard.RED: HexBoard.get_source_coordinates_for_color(HexBoard.RED, size)}
-
-    @classmethod
-    @lru_cache(maxsize=32)
-    def get_source_coordinates_for_color(cls, color, size):
-        """Returns the coordinates of the left border (for blue) or the top border (for red)"""
-        if color == HexBoard.BLUE:
-            return [(0, i) for i in range(size)]
-        else:
-            return [(i, 0) for i in range(size)]
-
-    @classmethod
-    def from_hash_code(cls, hash_code):
-        """Rebuilds a board based on the hash code. This basically makes the hash code more of a serialization"""
-        pos = str(hash_code)[:-1][::-1]
-        board_size = int(math.sqrt(len(pos)))
-        board = cls(board_size)
-
-        i = 0
-        for x in range(board_size):
-            for y in range(board_size):
-                board.place((x, y), int(pos[i]))
-                i += 1
-        
-        return board
-
-    @classmethod
-    @lru_cache(maxsize=2)
-    def get_opposite_color(cls, color):
-        """Returns the opposite color of the provided color. Returns BLUE if the color is not recognized"""
-        return HexBoard.RED if color == HexBoard.BLUE else HexBoard.BLUE
-    
-    def get_move_between_boards(self, other_board):
-        """Tries to find the move that is made between the two provided boards."""
-        if self.size is not other_board.size:
-            print('Trying to get the move between two boards of different sizes.')
-            return (None, None)
-
-        for x in range(self.size):
-            for y in range(self.size):
-                if self.board[x, y] != other_board.board[x, y]:
-                    return (x, y)
-        
-        return (None, None)
-
-    @classmethod
-    @lru_cache(maxsize=512)
-    def in_bounds(cls, numx, numy, size):
-        """Returns if a number is still within the required constraints for the board size"""
-        return numx >= 0 and numx < size and numy >= 0 and numy < size
-
-    @classmethod
-    @lru_cache(maxsize=128)
-    def get_empty_board(cls, size):
-        """Returns an empty board that we can use to create new HexBoard instances"""
-        board = {}
-        for x in range(size):
-            for y in range(size):
-                board[x, y] = HexBoard.EMPTY
-        return board
+import math
+import random
+from copy import deepcopy
+from functools import lru_cache
+
+import numpy as np
+
+
+class HexBoard:
+    """This class holds all the data for a single board state"""
+
+    BLUE = 1
+    RED = 2
+    EMPTY = 3
+    PLAYER_ID_TO_NAME = { 1: 'blue', 2: 'red', 3: 'empty' }
+    POSSIBLE_NEIGHBORS = ((-1, 0), (1, 0), (-1, 1), (1, -1), (0, 1), (0, -1))
+
+    def __init__(self, board_size, source_coords=None, target_coords=None, moves_made=None, overwrite = False):
+        """Creates a new empty board with the provided size"""
+        self.board = {}
+        self.size = board_size
+        self.moves_made = 0 if moves_made is None else moves_made
+
+        self.target_coords = HexBoard.get_target_coordinates(board_size) if target_coords is None else target_coords
+        self.source_coords = HexBoard.get_source_coordinates(board_size) if source_coords is None else source_coords
+        
+        self.board = {k:v for k, v in HexBoard.get_empty_board(board_size).items()} if not overwrite else None
+
+        # Disjoint-set over all hexes plus the four virtual edge nodes, used for incremental win detection
+        self.parents = list(range(board_size ** 2 + 4)) if not overwrite else None
+        self.set_sizes = [1] * (board_size ** 2 + 4) if not overwrite else None
+        self.union_log = []
+
+        # Zobrist hash of the stones on the board, updated in place()
+        self.zobrist = 0
+
+        # All empty hexes, and the position of every hex index in that list (-1 when occupied), so hexes can be removed in O(1)
+        self.empty_cells = list(HexBoard.get_empty_board(board_size)) if not overwrite else None
+        self.empty_positions = list(range(board_size ** 2)) if not overwrite else None
+
+        # Undo information of every move made with push(), so pop() can restore the board exactly
+        self.move_stack = []
+    
+    def as_np(self):
+        arr = []
+        for x in range(self.size):
+            arr.append([])
+            for y in range(self.size):
+                arr[x].append(self.board[(x, y)])
+        
+        return np.array(arr).astype(np.float64)
+    
+    def from_np(self, board_np, size, moves_made):
+        board = {}
+        for x in range(len(board_np)):
+            for y in range(len(board_np[x])):
+                board[(x, y)] = board_np[x][y]
+        
+        hexboard = HexBoard(size)
+        hexboard.board = board
+        hexboard.moves_made = moves_made
+        hexboard.refresh()
+
+        return hexboard
+        
+    def is_empty(self, coordinates):
+        """Returns if the board is empty at the provided coordinate"""
+        return self.board[coordinates] == HexBoard.EMPTY
+
+    def is_color(self, coordinates, color):
+        """Returns if the board is a certain color at the provided coordinate"""
+        return self.board[coordinates] == color
+
+    def get_mirrored_board(self):
+        board = self.switch_colors()
+        new_board_np = np.fliplr(np.rot90(board.as_np(), axes=(1, 0)))
+        return self.from_np(new_board_np, board.size, board.moves_made)
+
+    def get_unmirrored_board(self):
+        board = self.switch_colors()
+        new_board_np = np.rot90(np.fliplr(board.as_np(), axes=(0, 1)))
+        return self.from_np(new_board_np, board.size, board.moves_made)
+
+    def switch_colors(self):
+        new_board = self.copy()
+        for x in range(self.size):
+            for y in range(self.size):
+                if new_board.board[(x, y)] != HexBoard.EMPTY:
+                    new_board.board[(x, y)] = self.get_opposite_color(new_board.board[(x, y)])
+
+        new_board.refresh()
+        return new_board
+
+    def get_color(self, coordinates):
+        """Returns the color at the provided board coordinate"""
+        return self.board[coordinates]
+
+    def place(self, coordinates, color):
+        """Places the provided color at the provided coord, and keeps the disjoint-set and zobrist hash up to date"""
+        previous_color = self.board[coordinates]
+        if previous_color == color: return
+
+        zobrist_keys = HexBoard.get_zobrist_keys(self.size)
+        index = coordinates[0] * self.size + coordinates[1]
+        self.zobrist ^= zobrist_keys[previous_color][index] ^ zobrist_keys[color][index]
+
+        self.board[coordinates] = color
+        if previous_color == HexBoard.EMPTY:
+            self.moves_made += 1
+            self.remove_empty_cell(coordinates, index)
+            self.connect(coordinates, color)
+        elif color == HexBoard.EMPTY:
+            self.add_empty_cell(coordinates, index)
+            self.disconnect(coordinates)
+        else:
+            self.rebuild_unions()
+
+    def remove_empty_cell(self, coordinates, index):
+        """Removes a hex from the empty cell list by swapping it with the last one"""
+        position = self.empty_positions[index]
+        last_cell = self.empty_cells[-1]
+        self.empty_cells[position] = last_cell
+        self.empty_positions[last_cell[0] * self.size + last_cell[1]] = position
+        self.empty_cells.pop()
+        self.empty_positions[index] = -1
+
+    def restore_empty_cell(self, coordinates, index, position):
+        """Puts a hex back at the position it was removed from, which reverses remove_empty_cell exactly"""
+        if position < len(self.empty_cells):
+            displaced_cell = self.empty_cells[position]
+            self.empty_positions[displaced_cell[0] * self.size + displaced_cell[1]] = len(self.empty_cells)
+            self.empty_cells.append(displaced_cell)
+            self.empty_cells[position] = coordinates
+        else:
+            self.empty_cells.append(coordinates)
+        self.empty_positions[index] = position
+
+    def add_empty_cell(self, coordinates, index):
+        """Adds a hex back to the empty cell list"""
+        self.empty_positions[index] = len(self.empty_cells)
+        self.empty_cells.append(coordinates)
+
+    def push(self, coordinates, color):
+        """Places a stone on an empty hex in a way that can be undone exactly with pop()"""
+        index = coordinates[0] * self.size + coordinates[1]
+        self.move_stack.append((coordinates, self.empty_positions[index]))
+        self.place(coordinates, color)
+
+    def pop(self):
+        """Undoes the last push() and restores all derived state (move count, disjoint-set, hash and empty cells). Returns the move"""
+        coordinates, position = self.move_stack.pop()
+        index = coordinates[0] * self.size + coordinates[1]
+
+        self.zobrist ^= HexBoard.get_zobrist_keys(self.size)[self.board[coordinates]][index]
+        self.board[coordinates] = HexBoard.EMPTY
+        self.moves_made -= 1
+        self.restore_empty_cell(coordinates, index, position)
+        self.disconnect(coordinates)
+        return coordinates
+
+    def make_move(self, coordinates, color):
+        """Should return the new board without modifying the existing board"""
+        new_board = self.copy()
+        new_board.place(coordinates, color)
+        return new_board
+    
+    def copy(self):
+        """Returns an exact deep copy of itself"""
+        new_board = HexBoard(self.size, target_coords=self.target_coords, source_coords=self.source_coords, overwrite = True)
+        new_board.moves_made = self.moves_made
+        new_board.board = {k:v for k,v in self.board.items()}
+        new_board.zobrist = self.zobrist
+        new_board.empty_cells = self.empty_cells[:]
+        new_board.empty_positions = self.empty_positions[:]
+        new_board.parents = self.parents[:]
+        new_board.set_sizes = self.set_sizes[:] # the union log is not copied, so undoing older stones on the copy rebuilds the sets
+        return new_board
+
+    @classmethod
+    @lru_cache(maxsize=512) # caching this to create lower lookup times, technically can't have more than board.size ** 2 options
+    def get_neighbors(cls, coordinates, size):
+        """Returns a list with the coordinates of every possible/valid neighbor."""
+        (cx, cy) = coordinates
+        neighbors = [(x + cx, y + cy) for x, y in HexBoard.POSSIBLE_NEIGHBORS if HexBoard.in_bounds(cx + x, cy + y, size)]
+        return neighbors
+
+    def find(self, node):
+        """Returns the root of the set the provided node belongs to. No path compression, so every union can be undone"""
+        parents = self.parents
+        while parents[node] != node:
+            node = parents[node]
+        return node
+
+    def union(self, node_a, node_b, merges):
+        """Merges the sets of both nodes by size, and records the root that was attached so the merge can be undone"""
+        root_a, root_b = self.find(node_a), self.find(node_b)
+        if root_a == root_b: return
+
+        if self.set_sizes[root_a] < self.set_sizes[root_b]:
+            root_a, root_b = root_b, root_a
+
+        self.parents[root_b] = root_a
+        self.set_sizes[root_a] += self.set_sizes[root_b]
+        merges.append(root_b)
+
+    def connect(self, coordinates, color):
+        """Joins a newly placed stone with its same colored neighbors and the edges it touches"""
+        index = coordinates[0] * self.size + coordinates[1]
+        merges = []
+
+        for neighbor in HexBoard.get_neighbors(coordinates, self.size):
+            if self.board[neighbor] == color:
+                self.union(index, neighbor[0] * self.size + neighbor[1], merges)
+
+        for edge_node in HexBoard.get_edge_nodes(coordinates, color, self.size):
+            self.union(index, edge_node, merges)
+
+        self.union_log.append((index, merges))
+
+    def disconnect(self, coordinates):
+        """Removes a stone from the disjoint-set. Undoing the last placed stone is cheap, anything else rebuilds the sets"""
+        index = coordinates[0] * self.size + coordinates[1]
+        if not self.union_log or self.union_log[-1][0] != index:
+            self.rebuild_unions()
+            return
+
+        _, merges = self.union_log.pop()
+        for root_b in reversed(merges):
+            root_a = self.parents[root_b]
+            self.set_sizes[root_a] -= self.set_sizes[root_b]
+            self.parents[root_b] = root_b
+
+    def refresh(self):
+        """Recomputes all incrementally maintained state, needed after the board dict was edited directly"""
+        self.rebuild_unions()
+        self.zobrist = self.compute_zobrist()
+
+        self.empty_cells = []
+        self.empty_positions = [-1] * (self.size ** 2)
+        for (x, y), color in self.board.items():
+            if color == HexBoard.EMPTY: self.add_empty_cell((x, y), x * self.size + y)
+
+    def compute_zobrist(self):
+        """Computes the zobrist hash of the stones on the board from scratch"""
+        zobrist_keys = HexBoard.get_zobrist_keys(self.size)
+        zobrist = 0
+        for (x, y), color in self.board.items():
+            zobrist ^= zobrist_keys[color][x * self.size + y]
+        return zobrist
+
+    def rebuild_unions(self):
+        """Recreates the disjoint-set from scratch, used whenever the board is changed in a way that can not be undone"""
+        self.parents = list(range(self.size ** 2 + 4))
+        self.set_sizes = [1] * (self.size ** 2 + 4)
+        self.union_log = []
+
+        # Stones are put back one by one, so every stone is only joined with the stones that came before it
+        stones = [(coordinates, color) for coordinates, color in self.board.items() if color != HexBoard.EMPTY]
+        for coordinates, _ in stones:
+            self.board[coordinates] = HexBoard.EMPTY
+        for coordinates, color in stones:
+            self.board[coordinates] = color
+            self.connect(coordinates, color)
+
+    def get_winner(self):
+        """Check if the game has ended, and returns the winner. If None is returned the game is ongoing"""
+        if self.moves_made < self.size: return None
+        elif self.check_win(HexBoard.RED): return HexBoard.RED
+        elif self.check_win(HexBoard.BLUE): return HexBoard.BLUE
+        elif self.check_draw(): return HexBoard.EMPTY
+        return None
+
+    def check_win(self, color):
+        """Check if we have made a snake from the source side to the opposing side for the provided color"""
+        source_node, target_node = HexBoard.get_virtual_nodes(color, self.size)
+        return self.find(source_node) == self.find(target_node)
+
+    def get_stone_mask(self, color):
+        """Returns a bitmask with bit x * size + y set for every stone of the provided color, the BitBoard layout"""
+        mask = 0
+        for (x, y), value in self.board.items():
+            if value == color: mask |= 1 << (x * self.size + y)
+        return mask
+
+    def check_draw(self):
+        """Checks if we have any empty hexes left on the board"""
+        return self.moves_made >= self.size ** 2
+
+    def get_possible_moves(self):
+        """Compiles a list of all empty hexes in the current hexboard, in the order of the empty cell list, which is not board order"""
+        if self.get_winner() is not None: return []
+        return self.empty_cells[:]
+
+    def get_empty_cells(self):
+        """Returns the list of empty hexes, regardless of whether the game has ended. This list is owned by the board, do not modify it"""
+        return self.empty_cells
+
+    def get_random_empty_cell(self):
+        """Returns a random empty hex in O(1)"""
+        return random.choice(self.empty_cells)
+
+    def print(self):
+        """Outputs the board pieces to the console"""
+        print("   ", end="")
+
+        for y in range(self.size):
+            print(chr(y + ord('a')), "", end="")
+        print("")
+        print(" -----------------------")
+
+        for y in range(self.size):
+            print(y, "|", end="")
+			
+            for z in range(y):
+                print(" ", end="")
+
+            for x in range(self.size):
+                piece = self.board[x, y]
+                if piece == HexBoard.BLUE:
+                    print("\u001b[36m\u25CF\u001b[0m ", end="")
+                elif piece == HexBoard.RED:
+                    print("\u001b[31m\u25CF\u001b[0m ", end="")
+                else:
+                    if x == self.size:
+                        print("-", end="")
+                    else:
+                        print("- ", end="")
+            print("|")
+
+        print("   -----------------------")
+
+    def __str__(self):
+        """Outputs the board pieces to the console"""
+        output = "["
+
+        for y in range(self.size):
+            output += ""
+			
+            for x in range(self.size):
+                piece = self.board[x, y]
+                if piece == HexBoard.BLUE:
+                    output += "b"
+                elif piece == HexBoard.RED:
+                    output += "r"
+                else:
+                    output += "."
+            
+            if y is not self.size - 1: output += " "
+
+        output += "]"
+        return output
+
+    def hash_code(self, color=3):
+        """Returns the zobrist hash of the current board state as seen by the provided player (EMPTY for no player)"""
+        return self.zobrist ^ HexBoard.get_zobrist_color_keys()[color]
+
+    def serialize(self, color=3):
+        """Packs the board into an integer with 2 bits per hex, which can be turned back into a board using from_hash_code"""
+        code = 1 # leading marker bit, so the board size can be derived from the length of the code
+        for coordinates in HexBoard.get_empty_board(self.size):
+            code = (code << 2) | int(self.board[coordinates])
+        return (code << 2) | int(color)
+    
+    @classmethod
+    @lru_cache(maxsize=16)
+    def get_reward(cls, color, winner):
+        """Returns the reward for the specified color, -1 if it loses, 1 if it wins, 0 on a draw"""
+        if color == winner:
+            return 1
+        elif winner == HexBoard.EMPTY:
+            return 0
+        else:
+            return -1
+
+    @classmethod
+    @lru_cache(maxsize=512)
+    def is_at_border(cls, color, move, size):
+        """Checks if the provided coordinate is at the border for the provided color""" 
+        return (color == HexBoard.BLUE and move[0] == size-1) or (color == HexBoard.RED and move[1] == size-1)
+
+    @classmethod          
+    @lru_cache(maxsize=32)
+    def get_target_coordinates_for_color(cls, color, size):
+        """Returns the coordinates of the right border (for blue) or the left border (for red)"""
+        if color == HexBoard.BLUE:
+            return [(size - 1, i) for i in range(size)]
+        else:
+            return [(i, size - 1) for i in range(size)] 
+
+    @classmethod          
+    @lru_cache(maxsize=32)
+    def get_target_coordinates(cls, size):
+        """Returns the target coordinates for both of the colors"""
+        return {HexBoard.BLUE: HexBoard.get_target_coordinates_for_color(HexBoard.BLUE, size), HexBoard.RED: HexBoard.get_target_coordinates_for_color(HexBoard.RED, size)}
+
+    @classmethod          
+    @lru_cache(maxsize=32)
+    def get_source_coordinates(cls, size):
+        """Returns the source coordinates for both of the colors"""
+        return {HexBoard.BLUE: HexBoard.get_source_coordinates_for_color(HexBoard.BLUE, size), HexBoard.RED: HexBoard.get_source_coordinates_for_color(HexBoard.RED, size)}
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_source_coordinates_for_color(cls, color, size):
+        """Returns the coordinates of the left border (for blue) or the top border (for red)"""
+        if color == HexBoard.BLUE:
+            return [(0, i) for i in range(size)]
+        else:
+            return [(i, 0) for i in range(size)]
+
+    @classmethod
+    def from_hash_code(cls, hash_code):
+        """Rebuilds a board from the code generated by serialize(). Zobrist hashes can not be reversed, hence the separate serialization"""
+        num_cells = (hash_code.bit_length() - 3) // 2
+        board_size = math.isqrt(num_cells)
+        board = cls(board_size)
+
+        shift = 2 * num_cells
+        for coordinates in HexBoard.get_empty_board(board_size):
+            color = (hash_code >> shift) & 3
+            if color != HexBoard.EMPTY: board.place(coordinates, color)
+            shift -= 2
+        
+        return board
+
+    @classmethod
+    @lru_cache(maxsize=2)
+    def get_opposite_color(cls, color):
+        """Returns the opposite color of the provided color. Returns BLUE if the color is not recognized"""
+        return HexBoard.RED if color == HexBoard.BLUE else HexBoard.BLUE
+    
+    def get_move_between_boards(self, other_board):
+        """Tries to find the move that is made between the two provided boards."""
+        if self.size is not other_board.size:
+            print('Trying to get the move between two boards of different sizes.')
+            return (None, None)
+
+        for x in range(self.size):
+            for y in range(self.size):
+                if self.board[x, y] != other_board.board[x, y]:
+                    return (x, y)
+        
+        return (None, None)
+
+    @classmethod
+    @lru_cache(maxsize=512)
+    def in_bounds(cls, numx, numy, size):
+        """Returns if a number is still within the required constraints for the board size"""
+        return numx >= 0 and numx < size and numy >= 0 and numy < size
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_virtual_nodes(cls, color, size):
+        """Returns the disjoint-set indices of the virtual (source, target) edge nodes of the provided color"""
+        offset = size ** 2 if color == HexBoard.BLUE else size ** 2 + 2
+        return (offset, offset + 1)
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def get_edge_nodes(cls, coordinates, color, size):
+        """Returns the virtual edge nodes a stone of the provided color at the provided coordinate is connected to"""
+        source_node, target_node = HexBoard.get_virtual_nodes(color, size)
+        edge_nodes = []
+        if coordinates in HexBoard.get_source_coordinates_for_color(color, size): edge_nodes.append(source_node)
+        if coordinates in HexBoard.get_target_coordinates_for_color(color, size): edge_nodes.append(target_node)
+        return tuple(edge_nodes)
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_zobrist_keys(cls, size):
+        """Returns the random zobrist keys per color and hex. Seeded with the board size, so every process gets the same keys"""
+        rng = random.Random(size)
+        return {
+            HexBoard.BLUE: tuple(rng.getrandbits(64) for _ in range(size ** 2)),
+            HexBoard.RED: tuple(rng.getrandbits(64) for _ in range(size ** 2)),
+            HexBoard.EMPTY: (0,) * (size ** 2)
+        }
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def get_zobrist_color_keys(cls):
+        """Returns the zobrist keys for the player to move"""
+        rng = random.Random(-1)
+        return { HexBoard.BLUE: rng.getrandbits(64), HexBoard.RED: rng.getrandbits(64), HexBoard.EMPTY: 0 }
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def get_empty_board(cls, size):
+        """Returns an empty board that we can use to create new HexBoard instances"""
+        board = {}
+        for x in range(size):
+            for y in range(size):
+                board[x, y] = HexBoard.EMPTY
+        return board
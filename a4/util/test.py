@@ -3,6 +3,7 @@ import random
 import time
 
 from util.hexboard import HexBoard
+from util.bitboard import BitBoard
 from search.minimax import Minimax
 from evaluate.dijkstra import Dijkstra
 from evaluate.astar import AStar
@@ -16,9 +17,9 @@ class TestUtil(unittest.TestCase):
         board.place((1,1), HexBoard.BLUE)
         board.place((0,1), HexBoard.BLUE)
 
-        hash_code = board.hash_code()
+        code = board.serialize()
 
-        new_board = HexBoard.from_hash_code(hash_code)
+        new_board = HexBoard.from_hash_code(code)
         self.assertEqual(board.hash_code(), new_board.hash_code())
 
     def test_win_detection(self):
@@ -97,14 +98,21 @@ class TestUtil(unittest.TestCase):
             self.assertTrue(actual_target in target_coordinates)
 
     def test_hash_code(self):
-        """Makes sure the hashcode that we're generating is indeed what we expect it to be"""
+        """Makes sure the zobrist hash only depends on the position and the player to move, not on the move order"""
         board = HexBoard(3)
-
         board.place((0, 0), HexBoard.RED)
         board.place((1, 2), HexBoard.BLUE)
 
-        self.assertEqual(board.hash_code(HexBoard.BLUE), 3331333321)
-        self.assertEqual(board.hash_code(HexBoard.RED), 3331333322)
+        transposed_board = HexBoard(3)
+        transposed_board.place((1, 2), HexBoard.BLUE)
+        transposed_board.place((2, 2), HexBoard.RED)
+        transposed_board.place((0, 0), HexBoard.RED)
+        transposed_board.place((2, 2), HexBoard.EMPTY)
+
+        self.assertEqual(board.hash_code(HexBoard.BLUE), transposed_board.hash_code(HexBoard.BLUE))
+        self.assertEqual(board.hash_code(HexBoard.BLUE), board.compute_zobrist() ^ HexBoard.get_zobrist_color_keys()[HexBoard.BLUE])
+        self.assertNotEqual(board.hash_code(HexBoard.BLUE), board.hash_code(HexBoard.RED))
+        self.assertNotEqual(board.hash_code(), HexBoard(3).hash_code())
 
     def test_reward(self):
         """"Tests if our rewards are returning the expected results"""
@@ -124,10 +132,11 @@ class TestUtil(unittest.TestCase):
         board.place((0, 0), HexBoard.RED)
         board.place((1, 2), HexBoard.BLUE)
 
-        self.assertEqual(board.hash_code(HexBoard.BLUE), 3331333321)
+        self.assertEqual(board.serialize(HexBoard.BLUE), 0b1_10_11_11_11_11_01_11_11_11_01)
 
-        new_board = HexBoard.from_hash_code(3331333321)
-        self.assertEqual(new_board.hash_code(HexBoard.BLUE), 3331333321)
+        new_board = HexBoard.from_hash_code(board.serialize(HexBoard.BLUE))
+        self.assertEqual(str(new_board), str(board))
+        self.assertEqual(new_board.hash_code(HexBoard.BLUE), board.hash_code(HexBoard.BLUE))
 
     def get_move_between_boards(self):
         """"Test if the move between boards function can actually find the move that changed between two board states"""
@@ -140,6 +149,99 @@ class TestUtil(unittest.TestCase):
 
         self.assertEqual(board.get_move_between_boards(board2), (1, 2))
 
+    def test_win_detection_undo(self):
+        """Checks that removing stones again, like minimax does, also undoes the win"""
+        board = HexBoard(3)
+        board.place((0, 0), HexBoard.BLUE)
+        board.place((1, 0), HexBoard.BLUE)
+        board.place((2, 0), HexBoard.BLUE)
+        self.assertEqual(board.get_winner(), HexBoard.BLUE)
+
+        board.place((2, 0), HexBoard.EMPTY)
+        self.assertEqual(board.get_winner(), None)
+
+        board.place((0, 0), HexBoard.EMPTY)
+        board.place((2, 0), HexBoard.BLUE)
+        self.assertEqual(board.get_winner(), None)
+
+        board.place((0, 0), HexBoard.BLUE)
+        self.assertEqual(board.get_winner(), HexBoard.BLUE)
+
+    def test_win_detection_large_board(self):
+        """A long snake on a big board used to run into the recursion limit of the old depth first search"""
+        board_size = 41
+        board = HexBoard(board_size)
+        for y in range(board_size):
+            for x in range(board_size):
+                if (y % 4 == 0) or (y % 4 == 1 and x == board_size - 1) or (y % 4 == 2) or (y % 4 == 3 and x == 0):
+                    board.place((x, y), HexBoard.RED)
+
+        self.assertEqual(board.get_winner(), HexBoard.RED)
+
+    def test_empty_cells(self):
+        """Checks that the incrementally maintained empty cells stay in sync with the board"""
+        board = HexBoard(4)
+        for _ in range(200):
+            move = (random.randint(0, 3), random.randint(0, 3))
+            board.place(move, random.choice([HexBoard.RED, HexBoard.BLUE, HexBoard.EMPTY]))
+
+            empty_cells = [coordinates for coordinates, color in board.board.items() if color == HexBoard.EMPTY]
+            self.assertEqual(sorted(board.get_empty_cells()), empty_cells)
+            if empty_cells: self.assertTrue(board.is_empty(board.get_random_empty_cell()))
+
+        self.assertEqual(sorted(board.copy().get_empty_cells()), sorted(board.get_empty_cells()))
+        self.assertEqual(sorted(board.switch_colors().get_empty_cells()), sorted(board.get_empty_cells()))
+
+    def test_push_pop(self):
+        """Checks that pop() restores every piece of derived state that push() changed"""
+        for board_class in (HexBoard, BitBoard):
+            board = board_class(4)
+            board.place((0, 0), HexBoard.RED)
+            board.place((2, 1), HexBoard.BLUE)
+
+            snapshots = []
+            color = HexBoard.RED
+            while board.get_winner() is None:
+                snapshots.append((board.moves_made, board.hash_code(), list(board.get_empty_cells()), board.get_winner(), str(board)))
+                board.push(board.get_random_empty_cell(), color)
+                color = HexBoard.get_opposite_color(color)
+
+            while snapshots:
+                board.pop()
+                self.assertEqual((board.moves_made, board.hash_code(), list(board.get_empty_cells()), board.get_winner(), str(board)), snapshots.pop())
+
+    def test_bitboard_matches_hexboard(self):
+        """Plays random games on both board engines and checks that they agree on every observable property"""
+        for board_size in range(2, 8):
+            board, bitboard = HexBoard(board_size), BitBoard(board_size)
+            color = HexBoard.RED
+
+            while board.get_winner() is None:
+                self.assertEqual(sorted(board.get_possible_moves()), sorted(bitboard.get_possible_moves()))
+                self.assertEqual(board.hash_code(color), bitboard.hash_code(color))
+                self.assertTrue((board.as_np() == bitboard.as_np()).all())
+
+                move = random.choice(board.get_possible_moves())
+                board.place(move, color)
+                bitboard = bitboard.make_move(move, color)
+                color = HexBoard.get_opposite_color(color)
+
+            self.assertEqual(board.get_winner(), bitboard.get_winner())
+            self.assertEqual(str(board), str(bitboard))
+
+    def test_bitboard_win_detection(self):
+        """Checks that the bitboard flood fill does not wrap around the edges of the board"""
+        bitboard = BitBoard(3)
+        bitboard.place((0, 2), HexBoard.BLUE)
+        bitboard.place((1, 0), HexBoard.BLUE)
+        bitboard.place((2, 0), HexBoard.BLUE)
+        self.assertEqual(bitboard.get_winner(), None)
+
+        bitboard.place((1, 1), HexBoard.BLUE)
+        self.assertEqual(bitboard.get_winner(), HexBoard.BLUE)
+        self.assertEqual(bitboard.board[1, 1], HexBoard.BLUE)
+        self.assertEqual(bitboard.copy().get_color((0, 2)), HexBoard.BLUE)
+
 
 
 if __name__ == '__main__':